@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Benchmark Image Rendition generation
+
+Compares generating renditions by decoding the original for each rendition
+(:func:`superdesk.media.renditions._resize_image`) with :class:`sams.assets.images.RenditionSource`,
+which decodes the original once and cascades smaller renditions from larger ones.
+
+Each case runs in a new process, so the peak RSS of one case does not affect the others.
+
+Usage::
+
+    $ cd src/server
+    $ python ../../scripts/benchmark_renditions.py --megapixels 12 24 --repeat 3
+"""
+
+import argparse
+import importlib
+import multiprocessing
+import resource
+import time
+from io import BytesIO
+
+#: Renditions generated in each case, as ``(width, height, keep_proportions)``
+RENDITIONS = [
+    (1280, None, True),
+    (640, None, True),
+    (300, 300, False),
+    (220, None, True),
+]
+
+
+def create_image(megapixels: float) -> bytes:
+    from PIL import Image, ImageDraw
+
+    width = int((megapixels * 1000000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+
+    image = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(image)
+    for x in range(0, width, 32):
+        draw.line([(x, 0), (width - x, height)], fill=(x % 256, (x * 3) % 256, (x * 7) % 256), width=8)
+
+    out = BytesIO()
+    image.save(out, 'JPEG', quality=90)
+    return out.getvalue()
+
+
+def run_superdesk(content: bytes):
+    from superdesk.media.renditions import _resize_image
+
+    for width, height, keep_proportions in RENDITIONS:
+        _resize_image(BytesIO(content), (width, height), format='JPEG', keepProportions=keep_proportions)
+
+
+def run_rendition_source(content: bytes):
+    from sams.assets.images import RenditionSource
+
+    source = RenditionSource.open(BytesIO(content), renditions=RENDITIONS)
+    for width, height, keep_proportions in RENDITIONS:
+        source.resize(width, height, keep_proportions)
+
+
+CASES = {
+    'superdesk': run_superdesk,
+    'rendition_source': run_rendition_source,
+}
+
+#: Module imported by each case, before it is measured
+CASE_MODULES = {
+    'superdesk': 'superdesk.media.renditions',
+    'rendition_source': 'sams.assets.images',
+}
+
+
+def _measure(case: str, content: bytes, results):
+    # Import time and memory are not part of the measurement
+    importlib.import_module(CASE_MODULES[case])
+
+    # ``ru_maxrss`` is the peak for the whole process, so measure the increase from the baseline
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cpu_before = time.process_time()
+
+    CASES[case](content)
+
+    results.put((
+        time.process_time() - cpu_before,
+        (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    ))
+
+
+def measure(case: str, content: bytes):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(case, content, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Image Rendition generation')
+    parser.add_argument('--megapixels', '-m', type=float, nargs='+', default=[12.0])
+    parser.add_argument('--repeat', '-r', type=int, default=3)
+    args = parser.parse_args()
+
+    print('{:>10}  {:<18}{:>14}{:>16}'.format('megapixels', 'case', 'cpu s/MP', 'peak RSS MB/MP'))
+
+    for megapixels in args.megapixels:
+        content = create_image(megapixels)
+
+        for case in CASES:
+            runs = [measure(case, content) for _i in range(args.repeat)]
+            cpu = min(run[0] for run in runs)
+            rss = min(run[1] for run in runs)
+            print('{:>10.1f}  {:<18}{:>14.4f}{:>16.2f}'.format(
+                megapixels,
+                case,
+                cpu / megapixels,
+                rss / megapixels
+            ))
+
+
+if __name__ == '__main__':
+    main()
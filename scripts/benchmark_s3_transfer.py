@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Benchmark Amazon S3 upload and download throughput
+
+Uploads and downloads objects of several sizes using :class:`sams.storage.providers.amazon.AmazonS3Provider`,
+once for each set of transfer config attributes, against a local S3 compatible server (i.e. MinIO or moto).
+
+For example, to start a MinIO server and compare the default transfer config against larger, more concurrent parts::
+
+    $ docker run -p 9000:9000 minio/minio server /data
+    $ cd src/server
+    $ python ../../scripts/benchmark_s3_transfer.py --sizes 4 64 512 \\
+        --transfer '' 'multipart_chunksize=33554432,max_concurrency=20'
+
+Without docker, a moto server can be used instead (``pip install 'moto[s3,server]'`` and ``moto_server -p 9000``).
+The objects are then kept in the memory of the moto process, which competes with the benchmark for the CPU.
+
+A bucket named ``sams-benchmark`` is created, and removed again once the benchmark is complete.
+"""
+
+import argparse
+import time
+from tempfile import TemporaryFile
+from os import urandom
+
+MB = 1024 * 1024
+
+#: Size of each block of random data written to the source file
+BLOCK_SIZE = 4 * MB
+
+
+def create_source_file(size_mb: int):
+    source = TemporaryFile()
+    remaining = size_mb * MB
+    while remaining > 0:
+        block = urandom(min(BLOCK_SIZE, remaining))
+        source.write(block)
+        remaining -= len(block)
+
+    source.seek(0)
+    return source
+
+
+def create_provider(args, transfer: str):
+    from sams.storage.providers.amazon import AmazonS3Provider
+
+    config = 'AmazonS3,Benchmark,access={},secret={},region={},bucket={},endpoint={}'.format(
+        args.access,
+        args.secret,
+        args.region,
+        args.bucket,
+        args.endpoint
+    )
+    if transfer:
+        config += ',' + transfer
+
+    return AmazonS3Provider(config, args.max_pool_size)
+
+
+def measure(provider, source, size_mb: int):
+    source.seek(0)
+    start = time.perf_counter()
+    media_id = provider.put(source, 'benchmark.bin', 'application/octet-stream').media_id
+    upload = size_mb / (time.perf_counter() - start)
+
+    with TemporaryFile() as destination:
+        start = time.perf_counter()
+        provider.download(media_id, destination)
+        download = size_mb / (time.perf_counter() - start)
+
+    provider.delete(media_id)
+    return upload, download
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Amazon S3 upload and download throughput')
+    parser.add_argument('--endpoint', default='http://localhost:9000')
+    parser.add_argument('--access', default='minioadmin')
+    parser.add_argument('--secret', default='minioadmin')
+    parser.add_argument('--region', default='minio')
+    parser.add_argument('--bucket', default='sams-benchmark')
+    parser.add_argument('--max-pool-size', type=int, default=32)
+    parser.add_argument('--sizes', '-s', type=int, nargs='+', default=[4, 64, 256], help='Object sizes in MB')
+    parser.add_argument('--repeat', '-r', type=int, default=3)
+    parser.add_argument(
+        '--transfer',
+        '-t',
+        nargs='+',
+        default=['', 'multipart_chunksize=33554432,max_concurrency=20'],
+        help='Transfer config attributes to compare (an empty string uses the defaults)'
+    )
+    args = parser.parse_args()
+
+    providers = [(transfer or 'defaults', create_provider(args, transfer)) for transfer in args.transfer]
+    providers[0][1].create_bucket()
+
+    print('{:>8}  {:<50}{:>14}{:>16}'.format('size MB', 'transfer config', 'upload MB/s', 'download MB/s'))
+
+    try:
+        for size_mb in args.sizes:
+            with create_source_file(size_mb) as source:
+                for name, provider in providers:
+                    runs = [measure(provider, source, size_mb) for _i in range(args.repeat)]
+                    print('{:>8}  {:<50}{:>14.1f}{:>16.1f}'.format(
+                        size_mb,
+                        name,
+                        max(run[0] for run in runs),
+                        max(run[1] for run in runs)
+                    ))
+    finally:
+        providers[0][1].drop()
+
+
+if __name__ == '__main__':
+    main()
@@ -29,11 +29,130 @@ class SamsAssetEndpoint(Endpoint):
     _read_url = '/consume/assets'
     _read_binary_url = '/consume/assets/binary'
     _write_url = '/produce/assets'
+    _bulk_write_url = _write_url + '/bulk'
     _read_binary_zip_url = '/consume/assets/compressed_binary'
     _lock_asset_url = _write_url + '/lock'
     _unlock_asset_url = _write_url + '/unlock'
     _unlock_user_session_url = _write_url + '/unlock_user_session'
 
+    def create(
+        self,
+        docs: Dict[str, Any],
+        headers: Dict[str, Any] = None,
+        files=None,
+        external_user_id: str = None,
+        external_session_id: str = None,
+        callback: Callable[[requests.Response], requests.Response] = None
+    ) -> requests.Response:
+        """Helper method to create a new Asset
+
+        The ``set_id`` is also sent as a url argument, so the server can reject a binary
+        that is too big for the Set before it has been uploaded
+
+        :param dict docs: The metadata of the Asset to create
+        :param dict headers: Dictionary of headers to apply
+        :param files: The binary of the Asset
+        :param callback: A callback function to manipulate the response
+        :rtype: requests.Response
+        :return: The newly created Asset
+        """
+
+        if not self._write_url:
+            return self._return_405()
+
+        set_id = docs.get('set_id') if isinstance(docs, dict) else None
+
+        return self._client.post(
+            url=self._write_url,
+            params={'set_id': str(set_id)} if set_id else None,
+            headers=headers,
+            data=docs,
+            files=files,
+            external_user_id=external_user_id,
+            external_session_id=external_session_id,
+            callback=callback
+        )
+
+    def create_many(
+        self,
+        docs: List[Dict[str, Any]],
+        files: Dict[str, Any],
+        headers: Dict[str, Any] = None,
+        external_user_id: str = None,
+        external_session_id: str = None,
+        callback: Callable[[requests.Response], requests.Response] = None
+    ) -> requests.Response:
+        """Helper method to create many Assets with a single request
+
+        The ``binary`` attribute of each Asset is the name of its binary in ``files``,
+        which can only be used by one Asset.
+        For example::
+
+            client.assets.create_many(
+                docs=[{'set_id': str(set_id), 'filename': 'image.jpg', 'name': 'Image', 'binary': 'image'}],
+                files={'image': open('image.jpg', 'rb')}
+            )
+
+        :param list[dict] docs: The metadata of the Assets to create
+        :param dict files: The binaries of the Assets, by name
+        :param dict headers: Dictionary of headers to apply
+        :param callback: A callback function to manipulate the response
+        :rtype: requests.Response
+        :return: The result for each Asset, under ``_items``
+        """
+
+        if not self._bulk_write_url:
+            return self._return_405()
+
+        return self._client.post(
+            url=self._bulk_write_url,
+            headers=headers,
+            data={'items': docs},
+            files=files,
+            external_user_id=external_user_id,
+            external_session_id=external_session_id,
+            callback=callback
+        )
+
+    def update_many(
+        self,
+        updates: Dict[str, Any],
+        item_ids: Optional[List[Union[ObjectId, str]]] = None,
+        query: Optional[Dict[str, Any]] = None,
+        headers: Dict[str, Any] = None,
+        external_user_id: str = None,
+        external_session_id: str = None,
+        callback: Callable[[requests.Response], requests.Response] = None
+    ) -> requests.Response:
+        """Helper method to apply the same metadata updates to many Assets with a single request
+
+        :param dict updates: The metadata to update
+        :param list item_ids: The IDs of the Assets to update
+        :param dict query: A MongoDB query to select the Assets to update (instead of ``item_ids``)
+        :param dict headers: Dictionary of headers to apply
+        :param callback: A callback function to manipulate the response
+        :rtype: requests.Response
+        :return: The number of Assets updated, and the error for each Asset that was not
+        """
+
+        if not self._bulk_write_url:
+            return self._return_405()
+
+        data = {'updates': updates}
+        if item_ids is not None:
+            data['ids'] = [str(item_id) for item_id in item_ids]
+        else:
+            data['query'] = query
+
+        return self._client.patch(
+            url=self._bulk_write_url,
+            headers=headers,
+            data=data,
+            external_user_id=external_user_id,
+            external_session_id=external_session_id,
+            callback=callback
+        )
+
     def get_by_ids(
         self,
         item_ids: List[ObjectId],
@@ -300,7 +419,7 @@ class SamsAssetEndpoint(Endpoint):
         :param str external_session_id: External session id
         :param callback: A callback function to manipulate the response
         :rtype: requests.Response
-        :return: 200 status code if all assets unlocked
+        :return: 200 status code if all assets unlocked, with the number of Assets ``unlocked``
         """
 
         if not self._unlock_user_session_url:
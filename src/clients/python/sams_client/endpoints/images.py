@@ -134,7 +134,8 @@ class SamsImagesEndpoint:
         keep_proportions: Optional[bool] = True,
         name: Optional[str] = None,
         headers: Dict[str, Any] = None,
-        callback: Callable[[requests.Response], requests.Response] = None
+        callback: Callable[[requests.Response], requests.Response] = None,
+        asynchronous: bool = False
     ) -> requests.Response:
         r"""Generates an Image rendition
 
@@ -142,14 +143,20 @@ class SamsImagesEndpoint:
         :param int width: Desired image width (optional)
         :param int height: Desired image height (optional)
         :param bool keep_proportions: If `true`, keeps image width/height ratio
+        :param str name: Name of the rendition (optional)
         :param dict headers: Dictionary of headers to apply
         :param callback: A callback function to manipulate the response
+        :param bool asynchronous: If `true`, the rendition is generated in the background (optional)
         :rtype: requests.Response
-        :return: 200 status code if rendition generated successfully
+        :return: 200 status code if rendition generated successfully, or 202 status code
+            with the Rendition Job if ``asynchronous`` is `true`
         """
 
         params = {}
 
+        if asynchronous:
+            params['async'] = asynchronous
+
         if name:
             params['name'] = name
 
@@ -168,3 +175,26 @@ class SamsImagesEndpoint:
             headers=headers,
             callback=callback
         )
+
+    def get_rendition_job(
+        self,
+        job_id: Union[ObjectId, str],
+        headers: Dict[str, Any] = None,
+        callback: Callable[[requests.Response], requests.Response] = None
+    ) -> requests.Response:
+        r"""Get the status of an Image Rendition Job
+
+        .. versionadded:: 0.3.3
+
+        :param str job_id: The Rendition Job ID
+        :param dict headers: Dictionary of headers to apply
+        :param callback: A callback function to manipulate the response
+        :rtype: requests.Response
+        :return: The Rendition Job
+        """
+
+        return self._client.get(
+            url=f'{self._generate_image_rendition_url}/jobs/{job_id}',
+            headers=headers,
+            callback=callback
+        )
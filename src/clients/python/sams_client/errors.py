@@ -373,6 +373,16 @@ class SamsSetErrors:
         def __init__(self, set_id: ObjectId, exception: Exception = None):
             super().__init__({'set_id': str(set_id)}, exception)
 
+    class RenditionPresetDimensionsNotProvided(SamsException):
+        """Raised when a Set Rendition Preset is supplied without a width and/or height"""
+
+        app_code = '07007'
+        http_code = 400
+        description = 'Rendition preset "{name}" requires a width and/or height'
+
+        def __init__(self, name: str, exception: Exception = None):
+            super().__init__({'name': name}, exception)
+
 
 class SamsAssetErrors:
     class BinaryNotSupplied(SamsException):
@@ -454,6 +464,86 @@ class SamsAssetErrors:
         http_code = 400
         description = 'Can not Unlock asset which is already unlocked'
 
+    class UploadSessionNotFound(SamsException):
+        """Raised when attempting to use a non-existent or expired Upload Session"""
+
+        app_code = '08011'
+        http_code = 404
+        description = 'Upload Session with id "{session_id}" not found'
+
+        def __init__(self, session_id: Union[ObjectId, str], exception: Exception = None):
+            super().__init__({'session_id': str(session_id)}, exception)
+
+    class UploadSessionNotPending(SamsException):
+        """Raised when attempting to upload to, or finalize, an Upload Session that is no longer pending"""
+
+        app_code = '08012'
+        http_code = 409
+        description = 'Upload Session with id "{session_id}" is {state}'
+
+        def __init__(self, session_id: Union[ObjectId, str], state: str):
+            super().__init__({'session_id': str(session_id), 'state': state})
+
+    class DirectUploadNotSupported(SamsException):
+        """Raised when uploading to a StorageDestination using an upload method it does not support"""
+
+        app_code = '08013'
+        http_code = 400
+        description = 'StorageDestination "{destination_name}" does not support {method} uploads'
+
+        def __init__(self, destination_name: str, method: str = 'direct'):
+            super().__init__({'destination_name': destination_name, 'method': method})
+
+    class UploadSizeMismatch(SamsException):
+        """Raised when the size of an uploaded binary (or chunk) does not match the declared size"""
+
+        app_code = '08014'
+        http_code = 400
+        description = 'Uploaded size ({uploaded_size}) does not match the expected size ({expected_size})'
+
+        def __init__(self, uploaded_size: int, expected_size: int):
+            super().__init__({'uploaded_size': uploaded_size, 'expected_size': expected_size})
+
+    class UploadMimetypeMismatch(SamsException):
+        """Raised when the mimetype of an uploaded binary does not match the declared mimetype"""
+
+        app_code = '08015'
+        http_code = 400
+        description = 'Uploaded mimetype ({uploaded_mimetype}) does not match the declared mimetype ({mimetype})'
+
+        def __init__(self, uploaded_mimetype: str, mimetype: str):
+            super().__init__({'uploaded_mimetype': uploaded_mimetype, 'mimetype': mimetype})
+
+    class InvalidBulkUpload(SamsException):
+        """Raised when the body of a bulk Asset upload, or one of its items, cannot be parsed"""
+
+        app_code = '08016'
+        http_code = 400
+        description = 'Invalid bulk upload: {reason}'
+
+        def __init__(self, reason: str, exception: Exception = None):
+            super().__init__({'reason': reason}, exception)
+
+    class InvalidBulkUpdate(SamsException):
+        """Raised when the Assets or the updates of a bulk Asset update are invalid"""
+
+        app_code = '08017'
+        http_code = 400
+        description = 'Invalid bulk update: {reason}'
+
+        def __init__(self, reason: str):
+            super().__init__({'reason': reason})
+
+    class AssetUpdateConflict(SamsException):
+        """Raised when the Asset could not be updated in the background due to concurrent updates"""
+
+        app_code = '08018'
+        http_code = 409
+        description = 'Failed to update Asset "{asset_id}" due to concurrent updates'
+
+        def __init__(self, asset_id: Union[ObjectId, str]):
+            super().__init__({'asset_id': str(asset_id)})
+
 
 class SamsAmazonS3Errors:
     class InvalidAmazonEndpoint(SamsException):
@@ -545,3 +635,23 @@ class SamsAssetImageErrors:
         app_code = '10001'
         http_code = 400
         description = 'Image Rendition requested without supplying a width and/or height'
+
+    class RenditionUpdateConflict(SamsException):
+        """Raised when a generated Image Rendition could not be added to the Asset due to concurrent updates"""
+
+        app_code = '10002'
+        http_code = 409
+        description = 'Failed to add Image Rendition to Asset "{asset_id}" due to concurrent updates'
+
+        def __init__(self, asset_id: Union[ObjectId, str], exception: Exception = None):
+            super().__init__({'asset_id': str(asset_id)}, exception)
+
+    class RenditionJobNotFound(SamsException):
+        """Raised when requesting the status of a non-existent Image Rendition Job"""
+
+        app_code = '10003'
+        http_code = 404
+        description = 'Rendition Job with id "{job_id}" not found'
+
+        def __init__(self, job_id: Union[ObjectId, str], exception: Exception = None):
+            super().__init__({'job_id': str(job_id)}, exception)
@@ -12,3 +12,5 @@
 from .assets import ASSET_SCHEMA, ASSET_STATES # noqa
 from .destinations import destinationSchema # noqa
 from .sets import SET_SCHEMA, SET_STATES # noqa
+from .rendition_jobs import RENDITION_JOB_SCHEMA, RENDITION_JOB_STATES # noqa
+from .upload_sessions import UPLOAD_SESSION_SCHEMA, UPLOAD_SESSION_STATES # noqa
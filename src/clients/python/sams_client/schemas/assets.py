@@ -91,6 +91,11 @@ class IAssetRendition(TypedDict):
     #: Storage size of this rendition
     length: int
 
+    #: SHA-1 hex digest of the rendition binary (calculated by the service)
+    #:
+    #: .. versionadded:: 0.3.3
+    hash: str
+
 
 class IAsset(TypedDict):
     """Asset metadata"""
@@ -142,6 +147,11 @@ class IAsset(TypedDict):
     #: The mimetype of the Asset Binary (calculated by the service)
     mimetype: str
 
+    #: SHA-1 hex digest of the Asset Binary (calculated by the service)
+    #:
+    #: .. versionadded:: 0.3.3
+    hash: str
+
     #: A name to give to the Asset
     name: str
 
@@ -252,6 +262,10 @@ ASSET_SCHEMA = {
         'type': 'string',
         'mapping': not_analyzed
     },
+    'hash': {
+        'type': 'string',
+        'mapping': not_analyzed
+    },
     'name': {
         'type': 'string',
         'required': True,
@@ -326,6 +340,10 @@ ASSET_SCHEMA = {
                 'versioncreated': {'type': 'date'},
                 'filename': {'type': 'string'},
                 'length': {'type': 'long'},
+                'hash': {
+                    'type': 'string',
+                    'index': 'not_analyzed',
+                },
             }
         }
     },
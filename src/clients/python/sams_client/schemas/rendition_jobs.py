@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from typing import NamedTuple, Union, Optional
+from typing_extensions import TypedDict
+from datetime import datetime
+from bson import ObjectId
+
+from sams_client.utils import schema_relation
+from sams_client.schemas.assets import IAssetRendition, IAssetRenditionArgs
+
+
+class RenditionJobStates(NamedTuple):
+    """Named tuple for Rendition Job states
+
+    .. versionadded:: 0.3.3
+    """
+
+    #: The job is waiting for a worker to process it
+    QUEUED: str
+    #: A worker is generating the rendition
+    RUNNING: str
+    #: The rendition has been generated and added to the Asset
+    COMPLETED: str
+    #: The rendition could not be generated
+    FAILED: str
+
+
+#: Rendition Job states
+RENDITION_JOB_STATES: RenditionJobStates = RenditionJobStates('queued', 'running', 'completed', 'failed')
+
+
+class IRenditionJob(TypedDict):
+    """Image Rendition Job metadata, used to generate renditions in the background
+
+    .. versionadded:: 0.3.3
+    """
+
+    #: Globally unique id, generated automatically by the system
+    _id: Union[ObjectId, str]
+
+    #: The ID of the Asset to generate the rendition for
+    asset_id: Union[ObjectId, str]
+
+    #: Arguments used to generate the rendition
+    params: IAssetRenditionArgs
+
+    #: Optional name to give to the rendition
+    name: Optional[str]
+
+    #: If ``True``, generates all rendition presets of the Asset's Set (``params`` and ``name`` are not used)
+    presets: bool
+
+    #: If ``True``, calculates and stores the ``hash`` of the Asset's binary (``params`` and ``name`` are not used)
+    hash: bool
+
+    #: The state of the job. Can be one of ``queued``, ``running``, ``completed`` or ``failed``
+    state: str
+
+    #: The number of times a worker has started processing this job
+    attempts: int
+
+    #: Identifies the rendition while the job is queued or running, so the same rendition is not queued twice
+    active_key: Optional[str]
+
+    #: The ID of the worker processing this job
+    worker: str
+
+    #: Date/time after which another worker can take over this job
+    lease_expire: datetime
+
+    #: Date/time a worker last started processing this job
+    started: datetime
+
+    #: Date/time this job was completed or failed
+    finished: datetime
+
+    #: The rendition generated by this job, once completed
+    rendition: IAssetRendition
+
+    #: The error message, if the job failed
+    error: str
+
+
+RENDITION_JOB_SCHEMA = {
+    'asset_id': schema_relation('assets', required=True),
+    'params': {
+        'type': 'dict',
+        'schema': {
+            'width': {'type': 'integer', 'nullable': True},
+            'height': {'type': 'integer', 'nullable': True},
+            'keep_proportions': {'type': 'boolean'},
+        }
+    },
+    'name': {
+        'type': 'string',
+        'nullable': True
+    },
+    'presets': {
+        'type': 'boolean',
+        'default': False
+    },
+    'hash': {
+        'type': 'boolean',
+        'default': False
+    },
+    'state': {
+        'type': 'string',
+        'allowed': tuple(RENDITION_JOB_STATES),
+        'default': RENDITION_JOB_STATES.QUEUED,
+        'nullable': False
+    },
+    'attempts': {
+        'type': 'integer',
+        'default': 0
+    },
+    'active_key': {
+        'type': 'string',
+        'nullable': True
+    },
+    'worker': {
+        'type': 'string',
+        'nullable': True
+    },
+    'lease_expire': {
+        'type': 'datetime',
+        'nullable': True
+    },
+    'started': {
+        'type': 'datetime',
+        'nullable': True
+    },
+    'finished': {
+        'type': 'datetime',
+        'nullable': True
+    },
+    'rendition': {
+        'type': 'dict',
+        'nullable': True,
+        'allow_unknown': True
+    },
+    'error': {
+        'type': 'string',
+        'nullable': True
+    }
+}
@@ -93,6 +93,33 @@ SET_SCHEMA = {
             'type': 'long'
         }
     },
+    'rendition_presets': {
+        'type': 'list',
+        'schema': {
+            'type': 'dict',
+            'schema': {
+                'name': {
+                    'type': 'string',
+                    'required': True,
+                    'empty': False
+                },
+                'width': {
+                    'type': 'integer',
+                    'nullable': True,
+                    'min': 1
+                },
+                'height': {
+                    'type': 'integer',
+                    'nullable': True,
+                    'min': 1
+                },
+                'keep_proportions': {
+                    'type': 'boolean',
+                    'default': True
+                }
+            }
+        }
+    },
     'original_creator': {
         'type': 'string'
     },
@@ -122,6 +149,9 @@ SET_SCHEMA = {
         A dictionary containing the configuration options for the specific destination used
     ``maximum_asset_size`` *long*
         The maximum size of an Asset that can be uploaded to this Set (optional)
+    ``rendition_presets`` *list*
+        Image Renditions (``name``, ``width``, ``height`` and ``keep_proportions``) \
+        to generate when an image is uploaded to this Set (optional)
     ``original_creator`` *string*
         A field to store the id of the user who created the set
     ``version_creator`` *string*
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from typing import NamedTuple, Union, Optional, Dict, Any, List
+from typing_extensions import TypedDict
+from datetime import datetime
+from bson import ObjectId
+
+from sams_client.utils import schema_relation
+
+
+class UploadSessionStates(NamedTuple):
+    """Named tuple for Upload Session states
+
+    .. versionadded:: 0.3.3
+    """
+
+    #: Waiting for the client to upload the binary
+    PENDING: str
+    #: The uploaded binary is being validated
+    FINALIZING: str
+    #: The Asset has been created
+    COMPLETED: str
+    #: The uploaded binary failed validation, and has been deleted
+    FAILED: str
+
+
+#: Upload Session states
+UPLOAD_SESSION_STATES: UploadSessionStates = UploadSessionStates('pending', 'finalizing', 'completed', 'failed')
+
+
+class IUploadTarget(TypedDict):
+    """Where and how the client uploads the binary of an Upload Session
+
+    For Amazon S3 destinations this is a presigned ``POST``: the ``fields`` are sent as form fields,
+    followed by the binary as the ``file`` field. Binaries larger than 5GB use a multipart upload instead:
+    the binary is split into parts of ``chunk_size`` bytes (the last part has the remaining bytes),
+    each part sent as the body of a ``PUT`` request to its URL in ``parts``.
+
+    For MongoGridFS destinations the binary is uploaded to SAMS in chunks of ``chunk_size`` bytes,
+    each chunk as the body of a ``PUT`` request to the ``url``, with ``{index}`` replaced by the
+    zero based index of the chunk.
+
+    .. versionadded:: 0.3.3
+    """
+
+    #: The HTTP method used to upload the binary (or each chunk)
+    method: str
+
+    #: The URL to upload the binary (or each chunk) to
+    url: str
+
+    #: Form fields to send with the binary
+    fields: Dict[str, str]
+
+    #: The size of each chunk (or part), if the binary is uploaded in chunks
+    chunk_size: Optional[int]
+
+    #: The URLs to upload each part to, in order, if the parts are uploaded directly to the StorageDestination
+    parts: Optional[List[str]]
+
+
+class IUploadSession(TypedDict):
+    """Upload Session metadata, used to upload a binary directly to the StorageDestination
+
+    .. versionadded:: 0.3.3
+    """
+
+    #: Globally unique id, generated automatically by the system
+    _id: Union[ObjectId, str]
+
+    #: The ID of the Set the Asset will be created in
+    set_id: Union[ObjectId, str]
+
+    #: The filename of the Asset
+    filename: str
+
+    #: The declared mimetype of the binary
+    mimetype: str
+
+    #: The declared size of the binary, in bytes
+    length: int
+
+    #: Metadata of the Asset to create (i.e. ``name``, ``description``, ``state``, ``tags``, ``extra``)
+    metadata: Dict[str, Any]
+
+    #: The ID of the binary in the StorageDestination
+    _media_id: str
+
+    #: Where and how to upload the binary
+    upload: IUploadTarget
+
+    #: The state of the session. Can be one of ``pending``, ``finalizing``, ``completed`` or ``failed``
+    state: str
+
+    #: Date/time after which the session can no longer be used
+    expires: datetime
+
+    #: The ID of the Asset created when the session was finalized
+    asset_id: Union[ObjectId, str]
+
+    #: The error message, if the session failed
+    error: str
+
+
+UPLOAD_SESSION_SCHEMA = {
+    'set_id': schema_relation('sets', required=True),
+    'filename': {
+        'type': 'string',
+        'required': True
+    },
+    'mimetype': {
+        'type': 'string',
+        'nullable': True
+    },
+    'length': {
+        'type': 'integer',
+        'required': True,
+        'min': 0
+    },
+    'metadata': {
+        'type': 'dict',
+        'allow_unknown': True
+    },
+    '_media_id': {
+        'type': 'string'
+    },
+    'upload': {
+        'type': 'dict',
+        'allow_unknown': True
+    },
+    'state': {
+        'type': 'string',
+        'allowed': tuple(UPLOAD_SESSION_STATES),
+        'default': UPLOAD_SESSION_STATES.PENDING,
+        'nullable': False
+    },
+    'expires': {
+        'type': 'datetime'
+    },
+    'asset_id': schema_relation('assets', nullable=True),
+    'error': {
+        'type': 'string',
+        'nullable': True
+    }
+}
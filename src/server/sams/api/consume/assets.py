@@ -54,6 +54,10 @@ Download Asset Image Rendition
                         * :class:`bool`: ``keep_proportions`` [optional]
 =====================   ==================================================================
 
+If the Set's StorageDestination has redirects enabled (see the ``download_redirect`` attribute of
+:mod:`sams.storage.providers.amazon`), the binary and existing image renditions are not streamed through SAMS.
+Instead a ``302`` redirect to a short-lived URL is returned, once the Asset has been found.
+
 Download Multiple Asset Binaries
 ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 =====================   ==================================================================
@@ -164,12 +168,12 @@ Multiple Assets::
 
 """
 
-from io import BytesIO
-import zipfile
+from typing import Any, Dict, Iterator, List
+from collections import deque
 import hashlib
 
 from bson import ObjectId
-from flask import request, current_app as app
+from flask import request, current_app as app, stream_with_context
 
 from superdesk import Blueprint
 from superdesk.resource import Resource, build_custom_hateoas
@@ -177,8 +181,10 @@ from superdesk.resource import Resource, build_custom_hateoas
 from sams.api.service import SamsApiService
 from sams.assets import get_service as get_asset_service
 from sams.sets import get_service as get_set_service
+from sams.storage.executor import storage_executor
 from sams.default_settings import strtobool
-from sams.utils import construct_asset_download_response
+from sams.utils import construct_asset_download_response, construct_asset_not_modified_response, \
+    construct_asset_redirect_response, iter_zip_stream, is_compressed_mimetype, ZipStreamEntry
 
 from sams_client.schemas import SET_STATES, ASSET_STATES
 from sams_client.errors import SamsAssetErrors
@@ -195,6 +201,18 @@ def download_binary(asset_id: str):
 
     service = get_asset_service()
     asset = service.get_by_id(asset_id)
+
+    if not asset:
+        raise SamsAssetErrors.AssetNotFound(asset_id)
+
+    not_modified = construct_asset_not_modified_response(asset)
+    if not_modified:
+        return not_modified
+
+    url = service.get_download_url(asset, attachment=strtobool(request.args.get('download', 'False')))
+    if url:
+        return construct_asset_redirect_response(url)
+
     file = service.download_binary(asset_id)
 
     return construct_asset_download_response(asset, file)
@@ -215,10 +233,21 @@ def download_image(asset_id: str):
     if not asset:
         raise SamsAssetErrors.AssetNotFound(asset_id)
 
+    rendition = service.get_asset_rendition_metadata(asset, width, height, keep_proportions)
+    if rendition:
+        not_modified = construct_asset_not_modified_response(rendition)
+        if not_modified:
+            return not_modified
+
+        url = service.get_download_url(asset, rendition, strtobool(request.args.get('download', 'False')))
+        if url:
+            return construct_asset_redirect_response(url)
+
     file, rendition = service.download_rendition(asset_id, width, height, keep_proportions)
     asset['length'] = rendition['length']
     asset['filename'] = rendition['filename']
     asset['_updated'] = rendition['versioncreated']
+    asset['hash'] = rendition.get('hash')
 
     return construct_asset_download_response(asset, file)
 
@@ -228,28 +257,46 @@ def download_compressed_binary(asset_ids: str):
     """
     Uses asset_ids and returns the compressed
     asset binaries zip
+
+    The zip is streamed to the client while the binaries are read from storage,
+    so it is never held in memory. Binaries are fetched ahead of time, up to
+    ``COMPRESSED_BINARY_LOOKAHEAD`` at once (using the shared storage executor), and already compressed binaries
+    (i.e. images and videos) are stored without compressing them again.
     """
-    service = get_asset_service()
-    split_asset_ids = asset_ids.split(',')
 
-    file = [service.download_binary(ObjectId(asset_id)) for asset_id in split_asset_ids]
-    files = [(single_file.filename, single_file.read()) for single_file in file]
+    service = get_asset_service()
+    ids = []
+    for asset_id in asset_ids.split(','):
+        if not ObjectId.is_valid(asset_id):
+            raise SamsAssetErrors.AssetNotFound(asset_id)
+        ids.append(ObjectId(asset_id))
+
+    # Make sure all Assets exist before starting the response
+    found = {
+        asset['_id']: asset
+        for asset in service.get_from_mongo(req=None, lookup={'_id': {'$in': ids}})
+    }
+    for asset_id in ids:
+        if asset_id not in found:
+            raise SamsAssetErrors.AssetNotFound(asset_id)
+    assets = [found[asset_id] for asset_id in ids]
 
-    in_memory_zip = BytesIO()
-    with zipfile.ZipFile(in_memory_zip, mode='w') as temp_zip:
-        for f in files:
-            temp_zip.writestr(f[0], f[1])
-    data = in_memory_zip.getvalue()
     response = app.response_class(
-        data,
+        stream_with_context(_iter_compressed_binaries(assets)),
         content_type='application/zip',
         direct_passthrough=True
     )
 
-    response.content_length = len(data)
+    # The archive is generated from the Asset binaries, so its ETag is based on their hashes
     h = hashlib.sha1()
-    h.update(data)
+    for asset in assets:
+        h.update('{}:{}:{};'.format(
+            asset['filename'],
+            asset.get('hash') or asset.get('_etag'),
+            asset['_updated']
+        ).encode())
     response.set_etag(h.hexdigest())
+    response.make_conditional(request)
 
     if strtobool(request.args.get('download', 'False')):
         response.headers['Content-Disposition'] = 'Attachment'
@@ -258,6 +305,41 @@ def download_compressed_binary(asset_ids: str):
     return response
 
 
+def _iter_compressed_binaries(assets: List[Dict[str, Any]]) -> Iterator[bytes]:
+    service = get_asset_service()
+    current_app = app._get_current_object()
+    lookahead = max(app.config.get('COMPRESSED_BINARY_LOOKAHEAD') or 1, 1)
+
+    def fetch(asset):
+        with current_app.app_context():
+            return service.download_binary(asset['_id'], asset)
+
+    def close(future):
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+    def iter_entries():
+        futures = deque(storage_executor.submit(fetch, asset) for asset in assets[:lookahead])
+        try:
+            for index, asset in enumerate(assets):
+                file = futures.popleft().result()
+                if index + lookahead < len(assets):
+                    futures.append(storage_executor.submit(fetch, assets[index + lookahead]))
+
+                yield ZipStreamEntry(
+                    filename=asset['filename'],
+                    file=file,
+                    date_time=asset['_updated'],
+                    compress=not is_compressed_mimetype(asset.get('mimetype'))
+                )
+        finally:
+            # Close the binaries already fetched, if the client disconnected
+            for future in futures:
+                future.add_done_callback(close)
+
+    yield from iter_zip_stream(iter_entries())
+
+
 class ConsumeAssetResource(Resource):
     endpoint_name = 'consume_assets'
     resource_title = 'Asset'
@@ -10,7 +10,7 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 import superdesk
-from .assets import ProduceAssetResource, ProduceAssetService, assets_produce_bp
+from .assets import ProduceAssetResource, ProduceAssetService, assets_produce_bp, limit_asset_upload_size
 from sams.factory.app import SamsApp
 from sams.assets import get_service as get_assets_service
 from sams.auth.decorator import blueprint_auth
@@ -24,6 +24,7 @@ def init_app(app: SamsApp):
         app=app,
         service=service
     )
+    app.before_request(limit_asset_upload_size)
 
     @assets_produce_bp.before_request
     @blueprint_auth()
@@ -22,9 +22,59 @@ Asset Resource
 **resource title**      'Asset'
 **resource url**        [POST] '/produce/assets'
 **item url**            [PATCH, DELETE] '/produce/assets/<:class:`~bson.objectid.ObjectId`>'
+**url args**            * ``set_id``: <:class:`~bson.objectid.ObjectId`> [optional]
 **schema**              :class:`sams_client.schemas.assets.IAsset`
 =====================   =====================================================================
 
+Uploads that are too big for the Set are rejected before the binary is received, using the ``Content-Length``
+of the request. As the metadata is only available once the body has been received, send the ``set_id``
+as a url argument when creating an Asset for the limit of the Set to be used (otherwise only ``MAX_ASSET_SIZE``
+is applied early).
+
+Bulk Asset Upload
+^^^^^^^^^^^^^^^^^
+=====================   =====================================================================
+**endpoint name**       'produce/assets/bulk'
+**resource title**      'Bulk Asset Upload'
+**resource url**        [POST] '/produce/assets/bulk'
+**schema**              :class:`sams_client.schemas.assets.IAsset`
+=====================   =====================================================================
+
+Creates many Assets with one request (see :meth:`sams.assets.service.AssetsService.post_many`), using either:
+
+* ``multipart/form-data``: The ``items`` form field is a JSON array of Assets, where the ``binary`` attribute
+  of each Asset is the name of the file field containing its binary
+* ``application/x-ndjson``: One JSON Asset per line, where the ``binary`` attribute is the base64 encoded binary
+
+The Assets are created in batches of ``ASSETS_BULK_BATCH_SIZE``. The response contains the result of each Asset
+under ``_items``, in the same order as the request. Each result has a ``_status`` of ``OK`` with the ``_id``
+of the new Asset, or ``ERR`` with the ``_error``. The status code is ``201`` if all Assets were created,
+otherwise ``207``.
+
+Bulk Asset Update
+^^^^^^^^^^^^^^^^^
+=====================   =====================================================================
+**endpoint name**       'produce/assets/bulk'
+**resource title**      'Bulk Asset Update'
+**resource url**        [PATCH] '/produce/assets/bulk'
+=====================   =====================================================================
+
+Applies the same metadata ``updates`` to many Assets (see :meth:`sams.assets.service.AssetsService.patch_many`),
+selected using either an array of ``ids``, or a MongoDB ``query``. For example::
+
+    {
+        "query": {"set_id": "5f16394239d0077e02b09d85", "state": "draft"},
+        "updates": {"state": "public"}
+    }
+
+The binary (or attributes of the binary) cannot be updated. The Assets are updated in batches
+of ``ASSETS_BULK_BATCH_SIZE``. The response contains the ``total`` number of Assets matching,
+the number ``updated``, and the ``_error`` for each Asset that was not updated under ``_errors``.
+
+If the request accepts ``application/x-ndjson``, the progress is streamed after each batch
+(one JSON object per line, with the ``total``, ``processed``, ``updated`` and number of ``errors``),
+followed by the response.
+
 Lock Asset
 ^^^^^^^^^^
 =====================   =====================================================================
@@ -51,6 +101,10 @@ Unlock Assets by User Session
                         * ``external_session_id``: <:class:`str`>
 =====================   =====================================================================
 
+Unlocks all Assets locked by the user session with a single update
+(see :meth:`sams.assets.service.AssetsService.unlock_by_user_session`).
+The response contains the number of Assets ``unlocked``.
+
 Generate Rendition for Image Asset
 ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 =====================   =====================================================================
@@ -60,21 +114,64 @@ Generate Rendition for Image Asset
 **url args**            * :class:`str`: ``width`` [optional*]
                         * :class:`str`: ``height`` [optional*]
                         * :class:`bool`: ``keep_proportions`` [optional]
+                        * :class:`str`: ``name`` [optional]
+                        * :class:`bool`: ``async`` [optional]
 =====================   =====================================================================
 
 [*] Must supply at least a width and/or height in the url arguments
+
+If ``async`` is ``true``, the rendition is generated in the background by the rendition worker
+(see :class:`sams.commands.rendition_worker.RenditionWorker`). The response has a ``202`` status code,
+with the Rendition Job (:class:`sams_client.schemas.rendition_jobs.IRenditionJob`) as the body.
+
+Image Rendition Job Status
+^^^^^^^^^^^^^^^^^^^^^^^^^^
+=====================   =====================================================================
+**endpoint name**       'produce/assets/images/jobs'
+**resource title**      'Image Rendition Job'
+**item url**            [GET] '/produce/assets/images/jobs/<:class:`~bson.objectid.ObjectId`>'
+**schema**              :class:`sams_client.schemas.rendition_jobs.IRenditionJob`
+=====================   =====================================================================
+
+Direct Upload Sessions
+^^^^^^^^^^^^^^^^^^^^^^
+=====================   =====================================================================
+**endpoint name**       'produce/assets/upload_sessions'
+**resource title**      'Upload Session'
+**resource url**        [POST] '/produce/assets/upload_sessions'
+**item url**            [GET] '/produce/assets/upload_sessions/<:class:`~bson.objectid.ObjectId`>'
+**chunk url**           [PUT] '/produce/assets/upload_sessions/<:class:`~bson.objectid.ObjectId`>/chunks/<:class:`int`>'
+**finalize url**        [POST] '/produce/assets/upload_sessions/<:class:`~bson.objectid.ObjectId`>/finalize'
+**schema**              :class:`sams_client.schemas.upload_sessions.IUploadSession`
+=====================   =====================================================================
+
+Uploads a binary directly to the StorageDestination, instead of through ``POST /produce/assets``
+(see :mod:`sams.upload_sessions`). The JSON body used to create the session contains the ``set_id``,
+``filename``, ``length``, optional ``mimetype`` and the Asset ``metadata``.
+
+The client then uploads the binary using the ``upload`` target of the session, and finalizes the session,
+which responds with a ``201`` status code and the new Asset as the body. The ``hash`` of the Asset is
+added once the rendition worker has calculated it from the uploaded binary.
 """
 
-from bson import ObjectId
+from typing import Any, Dict, Iterator, List, Tuple
+from collections import Counter
+from base64 import b64decode
+
+from bson import ObjectId, json_util
+from eve.auth import resource_auth
+from eve.methods.common import serialize
 from flask import current_app as app, json
-from flask import request
+from flask import request, stream_with_context
 
 from sams.api.service import SamsApiService
 from sams.api.consume import ConsumeAssetResource
-from sams_client.schemas import SET_STATES
+from sams_client.schemas import SET_STATES, UPLOAD_SESSION_STATES
 from sams.sets import get_service as get_sets_service
 from sams.assets import get_service as get_asset_service
-from sams.storage.sams_media_storage import get_request_id
+from sams.rendition_jobs import get_service as get_rendition_jobs_service
+from sams.upload_sessions import get_service as get_upload_sessions_service
+from sams.storage.sams_media_storage import SpooledUpload, get_upload, limit_upload_size
 from superdesk.resource import Resource, build_custom_hateoas
 from sams_client.errors import SamsAssetErrors, SamsAssetImageErrors
 from sams.utils import get_external_user_id, get_external_session_id
@@ -85,6 +182,12 @@ from superdesk.utc import utcnow
 
 FIELDS_TO_JSON_PARSE = ('tags', 'extra')
 
+#: Asset fields that describe the binary, and cannot be changed with a bulk update
+BULK_UPDATE_READONLY_FIELDS = ('_id', 'binary', '_media_id', 'renditions', 'length', 'mimetype', 'hash')
+
+#: Asset fields in a bulk update query that are converted to an ObjectId
+BULK_UPDATE_OBJECTID_FIELDS = ('_id', 'set_id', 'parent_id')
+
 assets_produce_bp = Blueprint('assets_produce', __name__)
 
 
@@ -171,32 +274,20 @@ def unlock_asset_by_user():
 
     external_user_id = get_external_user_id()
     external_session_id = get_external_session_id()
-    service = get_asset_service()
 
-    assets = service.search({
-        'query': {
-            'bool': {
-                'must': [
-                    {'term': {'lock_user': external_user_id}},
-                    {'term': {'lock_session': external_session_id}}
-                ]
-            }
-        }
-    })
+    if not external_user_id:
+        raise SamsAssetErrors.ExternalUserIdNotFound()
 
-    for asset in assets:
-        updates = {}
-        updates['lock_action'] = None
-        updates['lock_user'] = None
-        updates['lock_session'] = None
-        updates['lock_time'] = None
+    if not external_session_id:
+        raise SamsAssetErrors.ExternalSessionIdNotFound()
 
-        service.patch(ObjectId(asset['_id']), updates)
+    unlocked = get_asset_service().unlock_by_user_session(external_user_id, external_session_id)
 
-    response = app.response_class(
+    return app.response_class(
+        json.dumps({'unlocked': unlocked}),
         status=200,
+        mimetype='application/json'
     )
-    return response
 
 
 @assets_produce_bp.route('/produce/assets/images/<asset_id>', methods=['POST'])
@@ -216,7 +307,17 @@ def generate_image_rendition(asset_id: str):
         raise SamsAssetErrors.AssetNotFound(asset_id)
 
     if not service.get_asset_rendition_metadata(asset, width, height, keep_proportions):
-        service.add_rendition(asset, width, height, keep_proportions, name)
+        if strtobool(request.args.get('async', 'False')):
+            job = get_rendition_jobs_service().queue_job(asset, width, height, keep_proportions, name)
+            response = app.response_class(
+                json.dumps(job),
+                status=202,
+                mimetype='application/json'
+            )
+            response.headers['Location'] = '/produce/assets/images/jobs/{}'.format(job['_id'])
+            return response
+
+        service.get_or_create_rendition(asset, width, height, keep_proportions, name)
 
     response = app.response_class(
         status=200,
@@ -224,6 +325,359 @@ def generate_image_rendition(asset_id: str):
     return response
 
 
+@assets_produce_bp.route('/produce/assets/images/jobs/<job_id>', methods=['GET'])
+def get_image_rendition_job(job_id: str):
+    job = get_rendition_jobs_service().get_by_id(ObjectId(job_id)) if ObjectId.is_valid(job_id) else None
+
+    if not job:
+        raise SamsAssetImageErrors.RenditionJobNotFound(job_id)
+
+    return app.response_class(
+        json.dumps(job),
+        status=200,
+        mimetype='application/json'
+    )
+
+
+def _upload_session_response(session, status: int):
+    upload = session['upload']
+    if session['state'] == UPLOAD_SESSION_STATES.PENDING and not upload.get('url') and not upload.get('parts'):
+        # Binaries uploaded in chunks are sent to SAMS
+        session['upload']['url'] = '/produce/assets/upload_sessions/{}/chunks/{{index}}'.format(session['_id'])
+
+    return app.response_class(
+        json.dumps(session),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+@assets_produce_bp.route('/produce/assets/upload_sessions', methods=['POST'])
+def create_upload_session():
+    session = get_upload_sessions_service().create_session(request.get_json(force=True) or {})
+    return _upload_session_response(session, 201)
+
+
+@assets_produce_bp.route('/produce/assets/upload_sessions/<session_id>', methods=['GET'])
+def get_upload_session(session_id: str):
+    service = get_upload_sessions_service()
+    session = service.get_by_id(ObjectId(session_id)) if ObjectId.is_valid(session_id) else None
+
+    if not session:
+        raise SamsAssetErrors.UploadSessionNotFound(session_id)
+
+    return _upload_session_response(session, 200)
+
+
+@assets_produce_bp.route('/produce/assets/upload_sessions/<session_id>/chunks/<int:index>', methods=['PUT'])
+def upload_session_chunk(session_id: str, index: int):
+    service = get_upload_sessions_service()
+    chunk_size = service.get_chunk_size(service.get_pending_session(session_id))
+
+    # Reject oversized chunks before reading the request body
+    if request.content_length and request.content_length > chunk_size:
+        raise SamsAssetErrors.UploadSizeMismatch(request.content_length, chunk_size)
+
+    service.upload_chunk(session_id, index, request.stream.read(chunk_size + 1))
+    return app.response_class(status=204)
+
+
+@assets_produce_bp.route('/produce/assets/upload_sessions/<session_id>/finalize', methods=['POST'])
+def finalize_upload_session(session_id: str):
+    asset_id = get_upload_sessions_service().finalize(session_id)
+
+    return app.response_class(
+        json.dumps(get_asset_service().get_by_id(asset_id)),
+        status=201,
+        mimetype='application/json'
+    )
+
+
+def _get_bulk_item(item: Dict[str, Any], binary) -> Dict[str, Any]:
+    """Converts an item of a bulk upload to the Asset document to create"""
+
+    if not isinstance(item, dict):
+        raise SamsAssetErrors.InvalidBulkUpload('each item must be an object')
+
+    doc = serialize(
+        {key: value for key, value in item.items() if key not in ('_id', '_created', '_updated', '_etag')},
+        resource='assets'
+    )
+    doc['binary'] = binary
+    return doc
+
+
+def _iter_multipart_bulk_items() -> Iterator[Dict[str, Any]]:
+    try:
+        items = json.loads(request.form.get('items') or '[]')
+    except ValueError as error:
+        raise SamsAssetErrors.InvalidBulkUpload('"items" is not valid JSON', error)
+
+    if not isinstance(items, list):
+        raise SamsAssetErrors.InvalidBulkUpload('"items" must be an array')
+
+    # Each file field can only be read once, so it cannot be used by more than one item.
+    # Checked before any item is created, so a rejected upload does not create some of its Assets
+    fields = [item['binary'] for item in items if isinstance(item, dict) and item.get('binary')]
+    if not all(isinstance(field, str) for field in fields):
+        raise SamsAssetErrors.InvalidBulkUpload('"binary" must be the name of a file field')
+
+    duplicates = sorted(field for field, count in Counter(fields).items() if count > 1)
+    if duplicates:
+        raise SamsAssetErrors.InvalidBulkUpload(
+            'binary file fields used by more than one item: {}'.format(', '.join(duplicates))
+        )
+
+    for item in items:
+        # The ``binary`` attribute is the name of the file field containing the binary
+        binary = request.files.get(item.get('binary') or '') if isinstance(item, dict) else None
+        yield _get_bulk_item(item, binary.stream if binary else None)
+
+
+def _iter_ndjson_bulk_items() -> Iterator[Dict[str, Any]]:
+    for line in request.stream:
+        if not line.strip():
+            continue
+
+        try:
+            item = json.loads(line)
+            content = b64decode(item.get('binary') or '', validate=True) if isinstance(item, dict) else b''
+        except ValueError as error:
+            raise SamsAssetErrors.InvalidBulkUpload('item is not valid JSON with a base64 binary', error)
+
+        binary = None
+        if content:
+            binary = SpooledUpload(max_size=app.config.get('UPLOAD_SPOOL_MAX_SIZE') or 0)
+            binary.write(content)
+            binary.seek(0)
+
+        yield _get_bulk_item(item, binary)
+
+
+def _create_bulk_batch(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    binaries = [doc['binary'] for doc in docs if doc.get('binary')]
+
+    try:
+        return get_asset_service().post_many(docs)
+    finally:
+        # Release the memory or temporary file of each binary once its batch is stored
+        for binary in binaries:
+            binary.close()
+
+
+def _create_bulk_assets(items: Iterator[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    batch_size = max(1, app.config.get('ASSETS_BULK_BATCH_SIZE') or 1)
+    results = []
+    batch = []
+
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            results.extend(_create_bulk_batch(batch))
+            batch = []
+
+    if batch:
+        results.extend(_create_bulk_batch(batch))
+
+    for result in results:
+        if result['_status'] == 'OK':
+            result['_id'] = str(result['_id'])
+
+    return results, len([result for result in results if result['_status'] == 'ERR'])
+
+
+@assets_produce_bp.route('/produce/assets/bulk', methods=['POST'])
+def create_bulk_assets():
+    if request.mimetype == 'application/x-ndjson':
+        items = _iter_ndjson_bulk_items()
+    else:
+        items = _iter_multipart_bulk_items()
+
+    results, errors = _create_bulk_assets(items)
+
+    return app.response_class(
+        json.dumps({
+            '_status': 'ERR' if errors else 'OK',
+            '_items': results,
+        }),
+        status=207 if errors else 201,
+        mimetype='application/json'
+    )
+
+
+def _check_bulk_update_query(query: Any):
+    blacklist = app.config.get('MONGO_QUERY_BLACKLIST') or []
+
+    if isinstance(query, dict):
+        for key, value in query.items():
+            if key in blacklist:
+                raise SamsAssetErrors.InvalidBulkUpdate('operator "{}" is not allowed'.format(key))
+
+            _check_bulk_update_query(value)
+    elif isinstance(query, list):
+        for value in query:
+            _check_bulk_update_query(value)
+
+
+def _to_object_ids(value: Any) -> Any:
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    elif isinstance(value, list):
+        return [_to_object_ids(item) for item in value]
+    elif isinstance(value, dict):
+        return {key: _to_object_ids(item) for key, item in value.items()}
+
+    return value
+
+
+def _get_bulk_update_lookup(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the MongoDB filter for the Assets to update, from either the ``ids`` or the ``query``"""
+
+    ids = body.get('ids')
+    query = body.get('query')
+
+    if (ids is None) == (query is None):
+        raise SamsAssetErrors.InvalidBulkUpdate('either "ids" or "query" must be provided')
+    elif ids is not None:
+        if not isinstance(ids, list) or not all(ObjectId.is_valid(str(item_id)) for item_id in ids):
+            raise SamsAssetErrors.InvalidBulkUpdate('"ids" must be an array of Asset IDs')
+
+        return {'_id': {'$in': [ObjectId(str(item_id)) for item_id in ids]}}
+    elif not isinstance(query, dict):
+        raise SamsAssetErrors.InvalidBulkUpdate('"query" must be an object')
+
+    # Supports MongoDB Extended JSON (i.e. ``{"$oid": "..."}``), as well as plain IDs for ObjectId fields
+    query = json_util.loads(json.dumps(query))
+    _check_bulk_update_query(query)
+
+    for field in BULK_UPDATE_OBJECTID_FIELDS:
+        if field in query:
+            query[field] = _to_object_ids(query[field])
+
+    return query
+
+
+def _get_bulk_updates(body: Dict[str, Any]) -> Dict[str, Any]:
+    updates = body.get('updates')
+
+    if not isinstance(updates, dict) or not updates:
+        raise SamsAssetErrors.InvalidBulkUpdate('"updates" must be a non-empty object')
+
+    for field in BULK_UPDATE_READONLY_FIELDS:
+        if field in updates:
+            raise SamsAssetErrors.InvalidBulkUpdate('"{}" cannot be updated'.format(field))
+
+    for field in ('_created', '_updated', '_etag'):
+        updates.pop(field, None)
+
+    return serialize(updates, resource='assets')
+
+
+def _bulk_update_response(progress: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        '_status': 'ERR' if progress['_errors'] else 'OK',
+        'total': progress['total'],
+        'updated': progress['updated'],
+        '_errors': [
+            {'_id': str(error['_id']), '_error': error['_error']}
+            for error in progress['_errors']
+        ],
+    }
+
+
+@assets_produce_bp.route('/produce/assets/bulk', methods=['PATCH'])
+def update_bulk_assets():
+    body = request.get_json(force=True) or {}
+    lookup = _get_bulk_update_lookup(body)
+    updates = _get_bulk_updates(body)
+    progress = get_asset_service().iter_patch_many(
+        lookup,
+        updates,
+        max(1, app.config.get('ASSETS_BULK_BATCH_SIZE') or 1)
+    )
+
+    if request.accept_mimetypes.best == 'application/x-ndjson':
+        def generate():
+            result = None
+            for result in progress:
+                yield json.dumps({
+                    'total': result['total'],
+                    'processed': result['processed'],
+                    'updated': result['updated'],
+                    'errors': len(result['_errors']),
+                }) + '\n'
+
+            yield json.dumps(_bulk_update_response(result)) + '\n'
+
+        return app.response_class(
+            stream_with_context(generate()),
+            status=200,
+            mimetype='application/x-ndjson'
+        )
+
+    result = {}
+    for result in progress:
+        pass
+
+    return app.response_class(
+        json.dumps(_bulk_update_response(result)),
+        status=200,
+        mimetype='application/json'
+    )
+
+
+def _is_upload_authorised(is_item: bool) -> bool:
+    """Applies the same authorisation as Eve's ``requires_auth`` for the produce Asset endpoints"""
+
+    resource_name = ProduceAssetResource.endpoint_name
+    resource = app.config['DOMAIN'][resource_name]
+    if is_item:
+        public = resource['public_item_methods']
+        roles = list(resource['allowed_item_roles']) + list(resource['allowed_item_write_roles'])
+    else:
+        public = resource['public_methods']
+        roles = list(resource['allowed_roles']) + list(resource['allowed_write_roles'])
+
+    auth = resource_auth(resource_name)
+    return not auth or request.method in public or bool(auth.authorized(roles, resource_name, request.method))
+
+
+def limit_asset_upload_size():
+    """Rejects an Asset upload that is too big for its Set, before the binary is received
+
+    The Set is taken from the Asset being updated, or from the ``set_id`` url argument when creating an Asset.
+    Otherwise only ``MAX_ASSET_SIZE`` is applied until the metadata has been received.
+
+    This runs before Eve authenticates the request, so the Asset and Set are only loaded for authorised requests.
+    """
+
+    if request.method not in ('POST', 'PATCH') or request.endpoint not in (
+        '{}|resource'.format(ProduceAssetResource.endpoint_name),
+        '{}|item_lookup'.format(ProduceAssetResource.endpoint_name)
+    ):
+        return
+
+    set_id = request.args.get('set_id')
+    item_id = (request.view_args or {}).get('_id')
+
+    if not _is_upload_authorised(bool(item_id)):
+        # Eve rejects the request once the hooks have run
+        limit_upload_size(app.config.get('MAX_ASSET_SIZE') or 0)
+        return
+
+    if item_id:
+        asset = get_asset_service().get_by_id(ObjectId(item_id)) if ObjectId.is_valid(item_id) else None
+        set_id = asset.get('set_id') if asset else None
+
+    sets_service = get_sets_service()
+    if set_id and ObjectId.is_valid(set_id) and sets_service.get_by_id(ObjectId(set_id)):
+        max_size = sets_service.get_max_asset_size(ObjectId(set_id))
+    else:
+        max_size = app.config.get('MAX_ASSET_SIZE') or 0
+
+    limit_upload_size(max_size)
+
+
 class ProduceAssetResource(Resource):
     endpoint_name = 'produce_assets'
     resource_title = 'Asset'
@@ -271,16 +725,12 @@ class ProduceAssetService(SamsApiService):
         if state in [SET_STATES.DRAFT, SET_STATES.DISABLED]:
             raise SamsAssetErrors.AssetUploadToInactiveSet()
 
-        request_id = get_request_id()
-        # Get the binary from storage media cache
-        try:
-            binary = app.media.cache[request_id]
-        except KeyError:
+        # Get the binary uploaded with this request
+        upload = get_upload()
+        if upload is None:
             raise SamsAssetErrors.BinaryNotSupplied()
 
-        # Clear the cache
-        app.media.cache.pop(request_id)
-        docs[0]['binary'] = binary
+        docs[0]['binary'] = upload.content
         return super().create(docs)
 
     def update(self, id, updates, original):
@@ -295,12 +745,8 @@ class ProduceAssetService(SamsApiService):
         if state in [SET_STATES.DRAFT, SET_STATES.DISABLED]:
             raise SamsAssetErrors.AssetUploadToInactiveSet()
 
-        request_id = get_request_id()
         # If binary is not to be updated pass
-        try:
-            binary = app.media.cache[request_id]
-            app.media.cache.pop(request_id)
-            updates['binary'] = binary
-        except KeyError:
-            pass
+        upload = get_upload()
+        if upload is not None:
+            updates['binary'] = upload.content
         return super().update(id, updates, original)
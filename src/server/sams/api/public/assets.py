@@ -32,21 +32,31 @@ The following validation occurs on this endpoint:
     * The ``Asset`` must have ``state == 'public'``
 
 If any of the above conditions are not met, a ``404 - Not Found`` error is returned.
+
+The Set and Asset metadata are cached (see ``SETS_CACHE_ENABLED`` and ``ASSETS_DOWNLOAD_CACHE_ENABLED``),
+so downloading a frequently requested Asset does not query the database.
+
+If the Set's StorageDestination has redirects enabled (see the ``download_redirect`` attribute of
+:mod:`sams.storage.providers.amazon`), a ``302`` redirect to a short-lived URL is returned instead of
+the binary, once the above validation has passed.
 """
 
 from typing import Union, Tuple
 
 from bson import ObjectId
-from flask import Response
+from flask import Response, request
 
 from superdesk import Blueprint
 
 from sams.sets import get_service as get_set_service
 from sams.assets import get_service as get_asset_service
 from sams.logger import logger
-from sams.utils import construct_asset_download_response
+from sams.default_settings import strtobool
+from sams.utils import construct_asset_download_response, construct_asset_not_modified_response, \
+    construct_asset_redirect_response
 
 from sams_client.schemas import SET_STATES, ASSET_STATES
+from sams_client.errors import SamsException
 
 
 asset_binary_bp = Blueprint('assets_binary', __name__)
@@ -75,7 +85,7 @@ def download_binary(set_id: str, asset_id: str) -> Union[Response, Tuple[str, in
         return '', 404
 
     try:
-        metadata = asset_service.get_by_id(asset_oid)
+        metadata = asset_service.get_download_metadata(asset_oid)
     except Exception as e:
         logger.exception(e)
         return '', 404
@@ -86,8 +96,21 @@ def download_binary(set_id: str, asset_id: str) -> Union[Response, Tuple[str, in
             metadata.get('state') != ASSET_STATES.PUBLIC:
         return '', 404
 
+    not_modified = construct_asset_not_modified_response(metadata)
+    if not_modified:
+        return not_modified
+
+    try:
+        url = asset_service.get_download_url(metadata, attachment=strtobool(request.args.get('download', 'False')))
+    except (Exception, SamsException) as e:
+        logger.exception(e)
+        return '', 404
+
+    if url:
+        return construct_asset_redirect_response(url)
+
     try:
-        binary = asset_service.download_binary(asset_oid)
+        binary = asset_service.download_binary(asset_oid, metadata)
     except Exception as e:
         logger.exception(e)
         return '', 404
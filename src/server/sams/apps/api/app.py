@@ -23,6 +23,7 @@ def get_app(import_name: Optional[str] = __package__, config: Optional[Dict[str,
             'sams.sets',
             'sams.storage',
             'sams.assets',
+            'sams.rendition_jobs',
             'sams.commands'
         ]
 
@@ -9,7 +9,7 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from sams.default_settings import env, urlparse
+from sams.default_settings import env, urlparse, strtobool
 
 HOST = env('SAMS_PUBLIC_HOST', 'localhost')
 PORT = int(env('SAMS_PUBLIC_PORT', '5750'))
@@ -38,5 +38,8 @@ SAMS_AUTH_TYPE = env('SAMS_PUBLIC_AUTH_TYPE', 'sams.auth.public')
 # Specify api keys for basic auth
 CLIENT_API_KEYS = env('SAMS_PUBLIC_API_KEYS', '')
 
+# Cache the metadata required to download Assets
+ASSETS_DOWNLOAD_CACHE_ENABLED = strtobool(env('SAMS_PUBLIC_ASSETS_DOWNLOAD_CACHE_ENABLED', 'true'))
+
 # Specify the location of the log config file
 LOG_CONFIG_FILE = env('SAMS_PUBLIC_LOG_CONFIG', 'logging_config.yml')
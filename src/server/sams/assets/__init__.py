@@ -54,6 +54,7 @@ Example usage of uploading Asset Metadata and Binary::
 
 from superdesk import get_backend
 from sams.factory.app import SamsApp
+from sams.cache import create_cache
 from .resource import AssetsResource
 from .service import AssetsService
 
@@ -71,6 +72,15 @@ def init_app(app: SamsApp):
         AssetsResource.endpoint_name,
         backend=get_backend()
     )
+    if app.config.get('ASSETS_DOWNLOAD_CACHE_ENABLED'):
+        _service.download_cache = create_cache(
+            app,
+            'asset_downloads',
+            ttl=app.config['ASSETS_DOWNLOAD_CACHE_TTL'],
+            max_size=app.config['ASSETS_DOWNLOAD_CACHE_MAX_SIZE'],
+            negative_ttl=app.config['ASSETS_DOWNLOAD_CACHE_NEGATIVE_TTL']
+        )
+
     AssetsResource(
         endpoint_name=AssetsResource.endpoint_name,
         app=app,
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Image processing used to generate Image Renditions
+
+Unlike :func:`superdesk.media.renditions._resize_image`, which fully decodes the original
+image for every rendition, a :class:`RenditionSource` decodes the image once and generates
+any number of renditions from it:
+
+* JPEG images are decoded at a reduced scale using :meth:`PIL.Image.Image.draft` (DCT scaling),
+  when the requested renditions are small enough
+* Large integer downscales are performed with :meth:`PIL.Image.Image.reduce`, before the final
+  resampling to the exact size
+* Renditions are generated from the smallest image already available (the decoded source, or
+  a previously generated rendition) that is at least ``min_scale`` times the requested size
+  (:data:`REDUCING_GAP` by default, configured using ``RENDITION_SOURCE_MIN_SCALE``)
+
+Usage::
+
+    from sams.assets.images import RenditionSource
+
+    source = RenditionSource.open(original_binary, renditions=[(640, None, True), (220, None, True)])
+    view_image, width, height = source.resize(640)
+    thumbnail, width, height = source.resize(220)
+"""
+
+from typing import BinaryIO, Optional, Tuple, List, Dict, Any
+from io import BytesIO
+
+from PIL import Image
+
+#: Minimum ratio between the source image and the rendition size, when choosing the source image
+#: or reducing an image by an integer factor. Larger values give better quality, but are slower.
+REDUCING_GAP = 2.0
+
+#: Image modes supported by :meth:`PIL.Image.Image.reduce`
+REDUCIBLE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'I', 'F')
+
+#: Default encoder settings for each image format, passed to :meth:`PIL.Image.Image.save`.
+#: These can be overridden using the ``RENDITION_ENCODER_SETTINGS`` config
+DEFAULT_ENCODER_SETTINGS: Dict[str, Dict[str, Any]] = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85, 'method': 4},
+    'GIF': {'optimize': True},
+}
+
+Size = Tuple[int, int]
+
+
+def get_rendition_size(
+    original_size: Size,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    keep_proportions: bool = True
+) -> Size:
+    """Calculates the size of a rendition (same as :func:`superdesk.media.renditions._resize_image`)
+
+    :param tuple original_size: The width and height of the original image
+    :param int width: The requested width
+    :param int height: The requested height
+    :param bool keep_proportions: If ``True``, keeps the aspect ratio of the original image
+    :return: The width and height of the rendition
+    :rtype: tuple[int, int]
+    """
+
+    original_width, original_height = original_size
+
+    if not keep_proportions:
+        return width or original_width, height or original_height
+    elif width and height:
+        x_ratio = original_width / width
+        y_ratio = original_height / height
+        if x_ratio > y_ratio:
+            return width, int(original_height / x_ratio)
+        return int(original_width / y_ratio), height
+    elif width:
+        return width, int(width / (original_width / original_height))
+
+    return int(height * (original_width / original_height)), height
+
+
+def get_encoder_settings(
+    image_format: Optional[str],
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Returns the encoder settings for an image format
+
+    :param str image_format: The image format, i.e. ``JPEG``
+    :param dict overrides: Settings per image format, overriding :data:`DEFAULT_ENCODER_SETTINGS`
+    :return: The keyword arguments to pass to :meth:`PIL.Image.Image.save`
+    :rtype: dict
+    """
+
+    image_format = (image_format or '').upper()
+    settings = dict(DEFAULT_ENCODER_SETTINGS.get(image_format) or {})
+    settings.update((overrides or {}).get(image_format) or {})
+    return settings
+
+
+def is_large_enough(image_size: Size, size: Size, min_scale: float = REDUCING_GAP) -> bool:
+    """Returns ``True`` if an image can be used as the source of a rendition without losing quality
+
+    :param tuple image_size: The width and height of the source image
+    :param tuple size: The width and height of the rendition
+    :param float min_scale: Minimum ratio between the source image and the rendition size
+    :rtype: bool
+    """
+
+    return image_size[0] >= size[0] * min_scale and image_size[1] >= size[1] * min_scale
+
+
+def downscale_image(image: Image.Image, size: Size, min_scale: float = REDUCING_GAP) -> Image.Image:
+    """Resizes an image to the exact size
+
+    If the image is at least ``min_scale`` times larger than the requested size,
+    it is first reduced by an integer factor, which is much faster than resampling the full image
+
+    :param PIL.Image.Image image: The source image
+    :param tuple size: The width and height to resize to
+    :param float min_scale: Minimum ratio kept between the reduced image and the requested size (0 to never reduce)
+    :return: The resized image
+    :rtype: PIL.Image.Image
+    """
+
+    if min_scale and image.mode in REDUCIBLE_MODES:
+        factor_x = max(int(image.width / size[0] / min_scale), 1)
+        factor_y = max(int(image.height / size[1] / min_scale), 1)
+
+        if factor_x > 1 or factor_y > 1:
+            image = image.reduce((factor_x, factor_y))
+
+    if image.size == size:
+        return image
+
+    return image.resize(size, Image.LANCZOS)
+
+
+def encode_image(
+    image: Image.Image,
+    image_format: str,
+    encoder_settings: Optional[Dict[str, Dict[str, Any]]] = None
+) -> BytesIO:
+    """Encodes an image
+
+    :param PIL.Image.Image image: The image to encode
+    :param str image_format: The format to encode the image in
+    :param dict encoder_settings: Settings per image format, overriding :data:`DEFAULT_ENCODER_SETTINGS`
+    :return: The encoded image
+    :rtype: io.BytesIO
+    """
+
+    settings = get_encoder_settings(image_format, encoder_settings)
+
+    out = BytesIO()
+    try:
+        image.save(out, image_format, **settings)
+    except IOError:
+        # i.e. images with an alpha channel cannot be saved as JPEG
+        out = BytesIO()
+        image.convert('RGB').save(out, image_format, **settings)
+
+    out.seek(0)
+    return out
+
+
+class RenditionSource:
+    """A decoded image used to generate one or more renditions
+
+    :var tuple original_size: The width and height of the original image, used to calculate rendition sizes
+    :var str image_format: The format renditions are encoded in
+    :var float min_scale: Minimum ratio between the image a rendition is generated from and the rendition size
+        (0 to always generate renditions from the decoded image)
+    """
+
+    def __init__(
+        self,
+        image: Image.Image,
+        original_size: Optional[Size] = None,
+        image_format: Optional[str] = None,
+        encoder_settings: Optional[Dict[str, Dict[str, Any]]] = None,
+        min_scale: float = REDUCING_GAP
+    ):
+        self.original_size: Size = original_size or image.size
+        self.image_format: str = image_format or image.format
+        self.encoder_settings = encoder_settings
+        self.min_scale: float = min_scale
+
+        # Images available to generate renditions from, all with the aspect ratio of the original
+        self._images: List[Image.Image] = [image]
+
+    @classmethod
+    def open(
+        cls,
+        content: BinaryIO,
+        original_size: Optional[Size] = None,
+        renditions: Optional[List[Tuple[Optional[int], Optional[int], bool]]] = None,
+        encoder_settings: Optional[Dict[str, Dict[str, Any]]] = None,
+        min_scale: float = REDUCING_GAP
+    ) -> 'RenditionSource':
+        """Opens and decodes an image
+
+        If ``renditions`` are provided, JPEG images are decoded at the smallest scale
+        that is still ``min_scale`` times larger than the largest of the requested renditions
+
+        :param io.BytesIO content: The binary stream of the image (the original or a larger rendition)
+        :param tuple original_size: The size of the original image (defaults to the size of ``content``)
+        :param list renditions: The ``(width, height, keep_proportions)`` of the renditions that will be generated
+        :param dict encoder_settings: Settings per image format, overriding :data:`DEFAULT_ENCODER_SETTINGS`
+        :param float min_scale: Minimum ratio between the image a rendition is generated from and the rendition size
+            (0 to decode the full image, and always generate renditions from it)
+        :return: The source to generate renditions from
+        :rtype: RenditionSource
+        """
+
+        image = Image.open(content)
+        image_format = image.format
+        original_size = original_size or image.size
+
+        if renditions and min_scale:
+            rendition_sizes = [
+                get_rendition_size(original_size, width, height, keep_proportions)
+                for width, height, keep_proportions in renditions
+            ]
+
+            draft_size = (
+                int(max(size[0] for size in rendition_sizes) * min_scale),
+                int(max(size[1] for size in rendition_sizes) * min_scale)
+            )
+
+            if draft_size[0] < image.width and draft_size[1] < image.height:
+                image.draft(None, draft_size)
+
+        image.load()
+        return cls(image, original_size, image_format, encoder_settings, min_scale)
+
+    def get_source_image(self, size: Size) -> Image.Image:
+        """Returns the smallest available image that is large enough to generate a rendition from
+
+        :param tuple size: The width and height of the rendition
+        :return: The image to generate the rendition from
+        :rtype: PIL.Image.Image
+        """
+
+        if not self.min_scale:
+            return self._images[0]
+
+        candidates = [image for image in self._images if is_large_enough(image.size, size, self.min_scale)]
+        if not candidates:
+            return self._images[0]
+
+        return min(candidates, key=lambda image: image.width * image.height)
+
+    def resize(
+        self,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        keep_proportions: bool = True
+    ) -> Tuple[BytesIO, int, int]:
+        """Generates and encodes a rendition
+
+        Renditions that keep the proportions of the original are kept in memory,
+        so smaller renditions can be generated from them
+
+        :param int width: The requested width
+        :param int height: The requested height
+        :param bool keep_proportions: If ``True``, keeps the aspect ratio of the original image
+        :return: The encoded rendition, and its width and height
+        :rtype: tuple[io.BytesIO, int, int]
+        """
+
+        size = get_rendition_size(self.original_size, width, height, keep_proportions)
+        resized = downscale_image(self.get_source_image(size), size, self.min_scale)
+
+        if keep_proportions and resized is not self._images[0]:
+            self._images.append(resized)
+
+        return encode_image(resized, self.image_format, self.encoder_settings), size[0], size[1]
+
+
+def get_nearest_larger_rendition(
+    renditions: List[Dict[str, Any]],
+    size: Size,
+    min_scale: float = REDUCING_GAP
+) -> Optional[Dict[str, Any]]:
+    """Returns the smallest existing rendition that is large enough to generate a new rendition from
+
+    Only renditions that keep the proportions of the original image, and are at least
+    ``min_scale`` times the size of the new rendition, are used. Generating from a rendition
+    that is barely larger than the new one would noticeably reduce its quality, as the rendition
+    has already been resampled and encoded once.
+
+    :param list renditions: The existing renditions of the Asset
+    :param tuple size: The width and height of the new rendition
+    :param float min_scale: Minimum ratio between the existing rendition and the new rendition size
+    :return: The rendition to use, or ``None`` if none are large enough
+    :rtype: dict
+    """
+
+    candidates = [
+        rendition
+        for rendition in renditions or []
+        if (
+            rendition.get('_media_id') and
+            rendition.get('width') and
+            rendition.get('height') and
+            (rendition.get('params') or {}).get('keep_proportions', True) and
+            is_large_enough((rendition['width'], rendition['height']), size, min_scale)
+        )
+    ]
+
+    if not candidates:
+        return None
+
+    return min(candidates, key=lambda rendition: rendition['width'] * rendition['height'])
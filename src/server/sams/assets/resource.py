@@ -24,5 +24,6 @@ class AssetsResource(Resource):
         'search_backend': 'elastic'
     }
     mongo_indexes = {
-        'media_ids': [('_media_id', 1)]
+        'media_ids': [('_media_id', 1)],
+        'lock_user_session': [('lock_user', 1), ('lock_session', 1)]
     }
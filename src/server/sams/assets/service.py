@@ -9,28 +9,58 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from typing import BinaryIO, Dict, Any, List, Union, Optional
+from typing import BinaryIO, Dict, Any, Iterator, List, Union, Optional, Tuple
 from os import path
 from bson import ObjectId
-from io import BytesIO
 from copy import deepcopy
-import PIL
+from collections import OrderedDict
+
+from flask import current_app as app
+from pymongo import ASCENDING, UpdateOne
+from eve.utils import config
+from eve.methods.common import resolve_document_etag
 
 from superdesk.services import Service
 from superdesk.storage.mimetype_mixin import MimetypeMixin
 from superdesk.storage.superdesk_file import SuperdeskFile
 from superdesk.utc import utcnow
-from superdesk.media.renditions import _resize_image
 
 from sams.factory.service import SamsService
 from sams.sets import get_service
-from sams.utils import get_binary_stream_size, get_external_user_id
+from sams.storage.disk_cache import disk_cache
+from sams.storage.ingest import BinaryIngest
+from sams.storage.executor import storage_executor
+from sams.storage.providers.base import SamsBaseStorageProvider
+from sams.utils import get_binary_stream_size, get_binary_stream_hash, get_external_user_id, \
+    get_content_disposition
+from sams.lock import single_flight
+from sams.cache import ReadThroughCache
+from sams.logger import logger
+from sams.assets.images import RenditionSource, get_rendition_size, get_nearest_larger_rendition
 
+from sams_client.schemas import SET_STATES
 from sams_client.schemas.assets import IAsset, IAssetRendition, IAssetRenditionArgs
-from sams_client.errors import SamsAssetErrors, SamsAssetImageErrors
+from sams_client.errors import SamsException, SamsAssetErrors, SamsAssetImageErrors, SamsResourceErrors
+from sams_client.errors import SamsSetErrors, SamsSystemErrors
+
+#: Number of times to retry adding a rendition to an Asset that is being modified concurrently
+MAX_RENDITION_UPDATE_ATTEMPTS = 10
+
+#: Asset fields required to serve its binary, kept in the download metadata cache
+DOWNLOAD_METADATA_FIELDS = ('set_id', 'state', '_media_id', 'mimetype', 'length', 'hash', '_updated', 'filename')
 
 
 class AssetsService(SamsService, MimetypeMixin):
+    """Assets Service
+
+    If ``ASSETS_DOWNLOAD_CACHE_ENABLED`` is ``True``, the metadata returned from :meth:`get_download_metadata`
+    is cached, and removed from the cache when the Asset is updated or deleted.
+
+    :var sams.cache.ReadThroughCache download_cache: The download metadata cache, or ``None`` if disabled
+    """
+
+    download_cache: Optional[ReadThroughCache] = None
+
     def post(self, docs: List[Dict[str, Any]], **kwargs) -> List[ObjectId]:
         """Uploads binary and stores metadata
 
@@ -40,47 +70,323 @@ class AssetsService(SamsService, MimetypeMixin):
         :rtype: list[bson.objectid.ObjectId]
         """
         for doc in docs:
-            doc['firstcreated'] = utcnow()
-            doc['versioncreated'] = utcnow()
-            external_user_id = get_external_user_id()
-
-            if external_user_id:
-                doc['original_creator'] = external_user_id
-                doc['version_creator'] = external_user_id
-
+            self._set_created_attributes(doc)
             content = doc.pop('binary', None)
 
             if not content:
                 raise SamsAssetErrors.BinaryNotSupplied()
 
             self.validate_post(doc)
+            content = BinaryIngest(content)
             file_meta = self.upload_binary(doc, content)
             doc.update(file_meta)
+            self._add_original_rendition(doc, content.image_size)
+
+        ids = super(Service, self).post(docs, **kwargs)
+
+        for doc in docs:
+            if doc.get('renditions'):
+                self._on_image_uploaded(doc)
+
+        return ids
+
+    def post_uploaded(self, doc: Dict[str, Any], image_size: Optional[Tuple[int, int]] = None) -> ObjectId:
+        """Stores the metadata of an Asset whose binary has already been stored in the StorageDestination
+
+        Used to finalize direct uploads (see :mod:`sams.upload_sessions`), where the client
+        uploads the binary to the StorageDestination instead of to SAMS. If the ``hash`` is not provided,
+        a Rendition Job is queued for the rendition worker to calculate it (see :meth:`store_binary_hash`).
+
+        :param dict doc: The Asset metadata, including the ``_media_id``, ``length``, ``mimetype`` and optional ``hash``
+        :param tuple image_size: The width and height of the binary, if it is an image
+        :return: The ID of the new Asset
+        :rtype: bson.objectid.ObjectId
+        """
 
+        self._set_created_attributes(doc)
+        self.validate_post(doc)
+        self._add_original_rendition(doc, image_size)
+
+        asset_id = super(Service, self).post([doc])[0]
+
+        if not doc.get('hash'):
             try:
-                # Add original rendition to the asset renditions
-                width, height = PIL.Image.open(content).size
-                renditions = []
-                rendition = IAssetRendition(
-                    name='original',
-                    _media_id=doc['_media_id'],
-                    width=width,
-                    height=height,
-                    params=IAssetRenditionArgs(
-                        width=width,
-                        height=height,
-                        keep_proportions=True,
-                    ),
-                    versioncreated=utcnow(),
-                    filename=doc['filename'],
-                    length=doc['length']
+                from sams.rendition_jobs import get_service as get_rendition_jobs_service
+                get_rendition_jobs_service().queue_hash_job(doc)
+            except (Exception, SamsException):
+                logger.exception('Failed to queue hash job for Asset "{}"'.format(asset_id))
+
+        if doc.get('renditions'):
+            self._on_image_uploaded(doc)
+
+        return asset_id
+
+    def store_binary_hash(self, asset: IAsset) -> str:
+        """Calculates and stores the hash of the Asset's binary, if the Asset does not have one yet
+
+        The original rendition shares the binary of the Asset, so it is given the same hash.
+
+        :param dict asset: The Asset to calculate the hash for
+        :return: The hash of the Asset's binary
+        :rtype: str
+        :raises sams_client.errors.SamsAssetErrors.AssetUpdateConflict: If the Asset kept changing
+        """
+
+        if asset.get('hash'):
+            return asset['hash']
+
+        binary = get_service().get_provider_instance(asset['set_id']).get(asset['_media_id'])
+        try:
+            binary_hash = get_binary_stream_hash(binary)
+        finally:
+            binary.close()
+
+        for _attempt in range(MAX_RENDITION_UPDATE_ATTEMPTS):
+            latest = self.get_by_id(asset['_id'])
+            if not latest:
+                raise SamsAssetErrors.AssetNotFound(asset['_id'])
+            elif latest.get('hash'):
+                return latest['hash']
+
+            renditions = deepcopy(latest.get('renditions') or [])
+            for rendition in renditions:
+                if rendition.get('_media_id') == latest['_media_id']:
+                    rendition['hash'] = binary_hash
+
+            if self._update_if_unchanged(latest, {'hash': binary_hash, 'renditions': renditions}):
+                return binary_hash
+
+        raise SamsAssetErrors.AssetUpdateConflict(asset['_id'])
+
+    def post_many(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Creates many Assets at once, returning the result for each Asset
+
+        Each Set is loaded and validated once, the binaries are stored concurrently using the
+        :data:`~sams.storage.executor.storage_executor`, and the metadata of all Assets is inserted
+        with a single bulk request to MongoDB and Elasticsearch.
+        An Asset that fails validation or fails to be stored does not fail the other Assets.
+
+        The result for each Asset is either ``{'_status': 'OK', '_id': <asset_id>}`` or
+        ``{'_status': 'ERR', '_error': <error>}``, where the error is from :meth:`SamsException.to_dict`
+
+        :param docs: An array of metadata & binaries to create
+        :return: The result for each Asset, in the same order as ``docs``
+        :rtype: list[dict]
+        """
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(docs)
+        validator = self._bulk_validator()
+        destinations: Dict[ObjectId, Any] = {}
+        uploads = []
+
+        def set_error(index: int, error: SamsException):
+            results[index] = {'_status': 'ERR', '_error': dict(error.to_dict(), code=error.http_code)}
+
+        for index, doc in enumerate(docs):
+            try:
+                content = doc.pop('binary', None)
+                if not content:
+                    raise SamsAssetErrors.BinaryNotSupplied()
+
+                self._set_created_attributes(doc)
+                validator.validate(doc)
+                if validator.errors:
+                    raise SamsResourceErrors.ValidationError(validator.errors)
+
+                provider, max_size = self._get_bulk_destination(destinations, doc['set_id'])
+                uploads.append((index, doc, provider, max_size, BinaryIngest(content)))
+            except SamsException as error:
+                set_error(index, error)
+
+        def store(upload) -> Tuple[Dict[str, Any], Optional[Tuple[int, int]]]:
+            index, doc, provider, max_size, content = upload
+            file_meta = self._store_binary(provider, max_size, doc, content)
+
+            # Parse the image header in the worker thread as well, while the binary is still open
+            return file_meta, content.image_size
+
+        futures = [storage_executor.submit(store, upload) for upload in uploads]
+        created = []
+
+        for upload, future in zip(uploads, futures):
+            index, doc = upload[0], upload[1]
+            error = future.exception()
+
+            if error is None:
+                file_meta, image_size = future.result()
+                doc.update(file_meta)
+                self._add_original_rendition(doc, image_size)
+                created.append(upload)
+            elif isinstance(error, SamsException):
+                set_error(index, error)
+            else:
+                logger.exception(error)
+                set_error(index, SamsSystemErrors.UnknownError(str(error), error))
+
+        if not created:
+            return results
+
+        try:
+            ids = super(Service, self).post([upload[1] for upload in created])
+        except (Exception, SamsException):
+            # Remove the stored binaries, as their metadata was not saved
+            self.delete_binaries([upload[1] for upload in created])
+            raise
+
+        for upload, asset_id in zip(created, ids):
+            index, doc = upload[0], upload[1]
+            results[index] = {'_status': 'OK', config.ID_FIELD: asset_id}
+
+            if doc.get('renditions'):
+                self._on_image_uploaded(doc)
+
+        return results
+
+    def _bulk_validator(self):
+        """Returns a validator used to validate many new Assets
+
+        The Set of each Asset is validated once per Set, instead of once per Asset
+        (see :meth:`_get_bulk_destination`), so the ``set_id`` relation is not looked up by the validator
+        """
+
+        resource_def = app.config['DOMAIN'][self.datasource]
+        schema = deepcopy(resource_def['schema'])
+        schema['set_id'].pop('data_relation', None)
+
+        return app.validator(schema, resource=self.datasource, allow_unknown=resource_def['allow_unknown'])
+
+    def _get_bulk_destination(
+        self,
+        destinations: Dict[ObjectId, Any],
+        set_id: ObjectId
+    ) -> Tuple[SamsBaseStorageProvider, int]:
+        """Returns the Storage Provider and maximum Asset size of a Set, loading and validating each Set once
+
+        :param dict destinations: The Sets already loaded, or the error they failed with
+        :param bson.objectid.ObjectId set_id: The ID of the Set
+        :return: The Storage Provider instance and maximum Asset size of the Set
+        :rtype: tuple
+        :raises sams_client.errors.SamsAssetErrors.AssetUploadToInactiveSet: If the Set is not usable
+        """
+
+        if set_id not in destinations:
+            set_service = get_service()
+            set_item = set_service.get_by_id(set_id)
+
+            if not set_item:
+                destinations[set_id] = SamsSetErrors.SetNotFound(set_id)
+            elif set_item.get('state') in [SET_STATES.DRAFT, SET_STATES.DISABLED]:
+                destinations[set_id] = SamsAssetErrors.AssetUploadToInactiveSet()
+            else:
+                destinations[set_id] = (
+                    set_service.get_provider_instance(set_id),
+                    set_service.get_max_asset_size(set_id)
                 )
-                renditions.append(rendition)
-                doc['renditions'] = renditions
-            except Exception:
-                pass
 
-        return super(Service, self).post(docs, **kwargs)
+        destination = destinations[set_id]
+        if isinstance(destination, SamsException):
+            raise destination
+
+        return destination
+
+    def _set_created_attributes(self, doc: Dict[str, Any]):
+        doc['firstcreated'] = utcnow()
+        doc['versioncreated'] = utcnow()
+        external_user_id = get_external_user_id()
+
+        if external_user_id:
+            doc['original_creator'] = external_user_id
+            doc['version_creator'] = external_user_id
+
+    def _add_original_rendition(self, doc: Dict[str, Any], image_size: Optional[Tuple[int, int]]):
+        """Adds the ``original`` rendition to the Asset, if the binary is an image"""
+
+        if not image_size:
+            return
+
+        width, height = image_size
+        doc['renditions'] = [IAssetRendition(
+            name='original',
+            _media_id=doc['_media_id'],
+            width=width,
+            height=height,
+            params=IAssetRenditionArgs(
+                width=width,
+                height=height,
+                keep_proportions=True,
+            ),
+            versioncreated=utcnow(),
+            filename=doc['filename'],
+            length=doc['length'],
+            hash=doc['hash']
+        )]
+
+    def _on_image_uploaded(self, asset: IAsset):
+        """Generates the rendition presets of the Set for a newly uploaded image
+
+        Depending on ``RENDITION_PRESETS_ASYNC``, the presets are either generated now,
+        or a Rendition Job is queued for the rendition worker.
+        A failure here does not fail the upload, the renditions are then generated on first download.
+
+        :param dict asset: The newly created Asset
+        """
+
+        try:
+            if not get_service().get_rendition_presets(asset['set_id']):
+                return
+            elif app.config.get('RENDITION_PRESETS_ASYNC'):
+                from sams.rendition_jobs import get_service as get_rendition_jobs_service
+                get_rendition_jobs_service().queue_presets_job(asset)
+            else:
+                self.generate_rendition_presets(asset)
+        except (Exception, SamsException):
+            logger.exception('Failed to generate rendition presets for Asset "{}"'.format(asset['_id']))
+
+    def generate_rendition_presets(self, asset: IAsset) -> List[IAssetRendition]:
+        """Generates the rendition presets of the Set that the Asset does not have yet
+
+        The source image is downloaded and decoded once, and all renditions
+        are generated from it, from the largest to the smallest.
+
+        :param dict asset: The Asset to generate the renditions for
+        :return: The list of renditions for the presets
+        :rtype: list[IAssetRendition]
+        """
+
+        presets = [
+            preset
+            for preset in get_service().get_rendition_presets(asset['set_id'])
+            if not self.get_asset_rendition_metadata(
+                asset,
+                preset.get('width'),
+                preset.get('height'),
+                preset.get('keep_proportions', True)
+            )
+        ]
+
+        if not presets:
+            return []
+
+        presets.sort(
+            key=lambda preset: (preset.get('width') or 0, preset.get('height') or 0),
+            reverse=True
+        )
+        source = self._open_rendition_source(asset, [
+            (preset.get('width'), preset.get('height'), preset.get('keep_proportions', True))
+            for preset in presets
+        ])
+
+        return [
+            self.get_or_create_rendition(
+                asset,
+                preset.get('width'),
+                preset.get('height'),
+                preset.get('keep_proportions', True),
+                preset.get('name'),
+                source=source
+            )
+            for preset in presets
+        ]
 
     def patch(self, item_id: ObjectId, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Updates the binary and/or metadata
@@ -116,21 +422,256 @@ class AssetsService(SamsService, MimetypeMixin):
 
         return super(Service, self).patch(item_id, updates)
 
+    def patch_many(self, lookup: Dict[str, Any], updates: Dict[str, Any], batch_size: int = 100) -> Dict[str, Any]:
+        """Applies the same metadata updates to all Assets matching the lookup
+
+        See :meth:`iter_patch_many`
+
+        :param dict lookup: MongoDB filter used to determine which Assets to update
+        :param dict updates: The metadata to update (binaries cannot be updated)
+        :param int batch_size: The number of Assets updated with each bulk request
+        :return: The result of the update
+        :rtype: dict
+        """
+
+        result = {}
+        for result in self.iter_patch_many(lookup, updates, batch_size):
+            pass
+
+        return result
+
+    def iter_patch_many(
+        self,
+        lookup: Dict[str, Any],
+        updates: Dict[str, Any],
+        batch_size: int = 100
+    ) -> Iterator[Dict[str, Any]]:
+        """Applies the same metadata updates to all Assets matching the lookup, reporting progress after each batch
+
+        The updates are validated once per Set (see :meth:`_validate_bulk_patch`), instead of once per Asset.
+        The Assets are then updated in batches of ``batch_size``, each with a single MongoDB ``bulk_write``
+        and a single Elasticsearch bulk request. Assets that fail validation are not updated,
+        and do not fail the other Assets.
+
+        The progress contains the ``total`` number of Assets matching the lookup, the number ``processed``
+        so far, the number ``updated`` and the ``_errors`` for each Asset not updated. The last progress
+        yielded is the result of the update.
+
+        :param dict lookup: MongoDB filter used to determine which Assets to update
+        :param dict updates: The metadata to update (binaries cannot be updated)
+        :param int batch_size: The number of Assets updated with each bulk request
+        :return: The progress after each batch
+        :rtype: collections.abc.Iterator[dict]
+        """
+
+        collection = app.data.get_mongo_collection(self.datasource)
+        progress = {
+            'total': collection.count_documents(lookup),
+            'processed': 0,
+            'updated': 0,
+            '_errors': [],
+        }
+        validated: Dict[ObjectId, Optional[SamsException]] = {}
+        batch = []
+
+        for original in collection.find(lookup, sort=[(config.ID_FIELD, ASCENDING)]):
+            batch.append(original)
+
+            if len(batch) >= batch_size:
+                self._patch_batch(batch, updates, validated, progress)
+                batch = []
+                yield dict(progress)
+
+        if batch or not progress['total']:
+            self._patch_batch(batch, updates, validated, progress)
+            yield dict(progress)
+
+    def _patch_batch(
+        self,
+        originals: List[IAsset],
+        updates: Dict[str, Any],
+        validated: Dict[ObjectId, Optional[SamsException]],
+        progress: Dict[str, Any]
+    ):
+        """Updates a batch of Assets for :meth:`iter_patch_many`, with one MongoDB and one Elasticsearch bulk request"""
+
+        requests = []
+        ids = []
+        external_user_id = get_external_user_id()
+        now = utcnow()
+
+        for original in originals:
+            error = self._validate_bulk_patch(validated, original, updates)
+
+            if error is not None:
+                progress['_errors'].append({
+                    config.ID_FIELD: original[config.ID_FIELD],
+                    '_error': dict(error.to_dict(), code=error.http_code)
+                })
+                continue
+
+            doc_updates = deepcopy(updates)
+            doc_updates['versioncreated'] = now
+            doc_updates[config.LAST_UPDATED] = now
+
+            if external_user_id:
+                doc_updates['version_creator'] = external_user_id
+
+            updated = deepcopy(original)
+            updated.update(doc_updates)
+            resolve_document_etag(updated, self.datasource)
+            doc_updates[config.ETAG] = updated[config.ETAG]
+
+            requests.append(UpdateOne({config.ID_FIELD: original[config.ID_FIELD]}, {'$set': doc_updates}))
+            ids.append(original[config.ID_FIELD])
+
+        if requests:
+            collection = app.data.get_mongo_collection(self.datasource)
+            collection.bulk_write(requests, ordered=False)
+
+            docs = list(collection.find({config.ID_FIELD: {'$in': ids}}))
+            success, failed = app.data._search_backend(self.datasource).bulk_insert(self.datasource, docs)
+
+            if failed:
+                logger.error('Failed to index {} updated Assets. Errors: {}'.format(len(failed), failed))
+
+            for doc in docs:
+                self._invalidate_download_cache(doc)
+
+            progress['updated'] += len(docs)
+
+        progress['processed'] += len(originals)
+
+    def _validate_bulk_patch(
+        self,
+        validated: Dict[ObjectId, Optional[SamsException]],
+        original: IAsset,
+        updates: Dict[str, Any]
+    ) -> Optional[SamsException]:
+        """Validates the updates for an Asset, only once per Set
+
+        The updates are the same for every Asset, so only the Set (its state, and the validation of
+        the updates against an Asset in that Set) can change the outcome.
+
+        :param dict validated: The outcome of the validation for each Set already validated
+        :param dict original: The Asset to be updated
+        :param dict updates: The metadata to update
+        :return: The error, if the updates are not valid for Assets in the Set of the Asset
+        :rtype: SamsException
+        """
+
+        set_id = original.get('set_id')
+
+        if set_id not in validated:
+            try:
+                set_item = get_service().get_by_id(set_id)
+
+                if not set_item:
+                    raise SamsSetErrors.SetNotFound(set_id)
+                elif set_item.get('state') in [SET_STATES.DRAFT, SET_STATES.DISABLED]:
+                    raise SamsAssetErrors.AssetUploadToInactiveSet()
+
+                self.validate_patch(original, deepcopy(updates))
+                validated[set_id] = None
+            except SamsException as error:
+                validated[set_id] = error
+
+        return validated[set_id]
+
+    def unlock_by_user_session(self, external_user_id: str, external_session_id: str) -> int:
+        """Unlocks all Assets locked by the user session
+
+        The Assets are unlocked with a single MongoDB bulk write (using the ``lock_user_session`` index),
+        and re-indexed with a single Elasticsearch bulk request, instead of being searched for and patched
+        one at a time. Each Asset is only unlocked if it is still locked by the user session, and only the
+        Assets unlocked here are re-indexed.
+
+        :param str external_user_id: The external user ID that locked the Assets
+        :param str external_session_id: The external session ID that locked the Assets
+        :return: The number of Assets unlocked
+        :rtype: int
+        """
+
+        lookup = {'lock_user': external_user_id, 'lock_session': external_session_id}
+        collection = app.data.get_mongo_collection(self.datasource)
+        docs = list(collection.find(lookup))
+
+        if not docs:
+            return 0
+
+        now = utcnow()
+        updates = {
+            'lock_action': None,
+            'lock_user': None,
+            'lock_session': None,
+            'lock_time': None,
+            'versioncreated': now,
+            'version_creator': external_user_id,
+            config.LAST_UPDATED: now,
+        }
+
+        requests = []
+        etags = []
+        for doc in docs:
+            updated = deepcopy(doc)
+            updated.update(updates)
+            resolve_document_etag(updated, self.datasource)
+            etags.append(updated[config.ETAG])
+
+            requests.append(UpdateOne(
+                dict(lookup, **{config.ID_FIELD: doc[config.ID_FIELD]}),
+                {'$set': dict(updates, **{config.ETAG: updated[config.ETAG]})}
+            ))
+
+        result = collection.bulk_write(requests, ordered=False)
+        if not result.modified_count:
+            return 0
+
+        # Assets unlocked (or modified) concurrently keep the changes of the other request, so are not re-indexed
+        unlocked = list(collection.find({
+            config.ID_FIELD: {'$in': [doc[config.ID_FIELD] for doc in docs]},
+            config.ETAG: {'$in': etags}
+        }))
+
+        for doc in unlocked:
+            self._invalidate_download_cache(doc)
+
+        success, failed = app.data._search_backend(self.datasource).bulk_insert(self.datasource, unlocked)
+        if failed:
+            logger.error('Failed to index {} unlocked Assets. Errors: {}'.format(len(failed), failed))
+
+        return result.modified_count
+
     def add_rendition(
         self,
         asset: IAsset,
         width: int,
         height: int = None,
         keep_proportions: bool = True,
-        name: Optional[str] = None
+        name: Optional[str] = None,
+        source: Optional[RenditionSource] = None
     ) -> IAssetRendition:
-        # Download the original image, then create the new rendition from it
-        original = self.download_binary(asset['_id'])
-        [rendition_binary, new_width, new_height] = _resize_image(
-            original,
-            (width, height),
-            keepProportions=keep_proportions
-        )
+        """Generates a new Image Rendition and adds it to the Asset
+
+        The rendition is added using an atomic update, conditional on the Asset not having changed.
+        If a matching rendition was added in the meantime, the new binary is deleted and
+        the existing rendition is returned instead, so duplicate renditions are never stored.
+
+        :param dict asset: The Asset to generate the rendition for
+        :param int width: The requested width of the rendition
+        :param int height: The requested height of the rendition
+        :param bool keep_proportions: If ``True``, keeps the aspect ratio of the original image
+        :param str name: Optional name of the rendition
+        :param RenditionSource source: Optional decoded source image (downloaded if not provided)
+        :return: The rendition metadata
+        :rtype: IAssetRendition
+        :raises sams_client.errors.SamsAssetImageErrors.RenditionUpdateConflict: If the Asset kept changing
+        """
+
+        if source is None:
+            source = self._open_rendition_source(asset, [(width, height, keep_proportions)])
+
+        [rendition_binary, new_width, new_height] = source.resize(width, height, keep_proportions)
 
         # Generate a new filename which includes the dimensions
         filename, extension = path.splitext(asset['filename'])
@@ -139,8 +680,6 @@ class AssetsService(SamsService, MimetypeMixin):
         # Upload the new rendition to the same StorageDestination as the original image
         upload_response = self.upload_binary(asset, rendition_binary, delete_original=False)
 
-        # Add the rendition details to the Asset document in the DB
-        renditions = asset.get('renditions') or []
         rendition = IAssetRendition(
             name=name,
             _media_id=upload_response['_media_id'],
@@ -153,12 +692,190 @@ class AssetsService(SamsService, MimetypeMixin):
             ),
             versioncreated=utcnow(),
             filename=asset['filename'],
-            length=upload_response['length']
+            length=upload_response['length'],
+            hash=upload_response['hash']
         )
-        renditions.append(rendition)
-        self.patch(ObjectId(asset['_id']), {'renditions': renditions})
 
-        return rendition
+        stored = False
+        try:
+            # Add the rendition details to the Asset document in the DB
+            for _attempt in range(MAX_RENDITION_UPDATE_ATTEMPTS):
+                latest = self.get_by_id(asset['_id'])
+                if not latest:
+                    raise SamsAssetErrors.AssetNotFound(asset['_id'])
+
+                existing = self.get_asset_rendition_metadata(latest, width, height, keep_proportions)
+                if existing:
+                    return existing
+                elif self._append_rendition(latest, rendition):
+                    stored = True
+                    return rendition
+
+            raise SamsAssetImageErrors.RenditionUpdateConflict(asset['_id'])
+        finally:
+            if not stored:
+                # Don't leave the new binary orphaned in the StorageDestination
+                self._delete_rendition_binary(asset, rendition)
+
+    def _open_rendition_source(
+        self,
+        asset: IAsset,
+        renditions: List[Tuple[Optional[int], Optional[int], bool]]
+    ) -> RenditionSource:
+        """Downloads and decodes the image to generate renditions from
+
+        Instead of the original, the smallest existing rendition that is at least
+        ``RENDITION_SOURCE_MIN_SCALE`` times the size of all the requested renditions
+        is used (if any). This avoids downloading and decoding a large original image
+        when a smaller rendition is good enough. The same scale is used by the
+        :class:`RenditionSource` when decoding and resizing the image.
+
+        :param dict asset: The Asset to generate renditions for
+        :param list renditions: The ``(width, height, keep_proportions)`` of the renditions to generate
+        :return: The decoded source image
+        :rtype: RenditionSource
+        """
+
+        original_size = next(
+            (
+                (rendition['width'], rendition['height'])
+                for rendition in asset.get('renditions') or []
+                if rendition.get('name') == 'original' and rendition.get('width') and rendition.get('height')
+            ),
+            None
+        )
+        min_scale = app.config.get('RENDITION_SOURCE_MIN_SCALE')
+        provider = get_service().get_provider_instance(asset.get('set_id'))
+        content = None
+
+        if original_size and min_scale:
+            sizes = [get_rendition_size(original_size, *rendition) for rendition in renditions]
+            nearest = get_nearest_larger_rendition(
+                asset.get('renditions'),
+                (max(size[0] for size in sizes), max(size[1] for size in sizes)),
+                min_scale
+            )
+
+            if nearest and nearest['_media_id'] != asset['_media_id']:
+                try:
+                    content = provider.get(nearest['_media_id'])
+                except SamsAssetErrors.AssetNotFound:
+                    logger.warning('Binary for rendition "{}" of Asset "{}" not found, using the original'.format(
+                        nearest.get('name'),
+                        asset[config.ID_FIELD]
+                    ))
+
+        if content is None:
+            content = provider.get(asset['_media_id'])
+
+        return RenditionSource.open(
+            content,
+            original_size=original_size,
+            renditions=renditions,
+            encoder_settings=app.config.get('RENDITION_ENCODER_SETTINGS'),
+            min_scale=min_scale or 0
+        )
+
+    def _append_rendition(self, asset: IAsset, rendition: IAssetRendition) -> bool:
+        """Appends the rendition to the Asset, only if the Asset has not changed since it was read
+
+        :param dict asset: The latest version of the Asset
+        :param dict rendition: The rendition to add
+        :return: ``True`` if the rendition was added, ``False`` if the Asset was modified concurrently
+        :rtype: bool
+        """
+
+        return self._update_if_unchanged(asset, {
+            'renditions': (asset.get('renditions') or []) + [rendition],
+            'versioncreated': utcnow(),
+        })
+
+    def _update_if_unchanged(self, asset: IAsset, updates: Dict[str, Any]) -> bool:
+        """Applies the updates to the Asset, only if the Asset has not changed since it was read
+
+        This bypasses ``on_updated``, so the Elasticsearch index and the download cache
+        are updated here instead.
+
+        :param dict asset: The latest version of the Asset
+        :param dict updates: The updates to apply
+        :return: ``True`` if the Asset was updated, ``False`` if the Asset was modified concurrently
+        :rtype: bool
+        """
+
+        updates[config.LAST_UPDATED] = utcnow()
+        external_user_id = get_external_user_id()
+        if external_user_id:
+            updates['version_creator'] = external_user_id
+
+        updated = deepcopy(asset)
+        updated.update(updates)
+        resolve_document_etag(updated, self.datasource)
+        updates[config.ETAG] = updated[config.ETAG]
+
+        doc = self.find_and_modify(
+            query={
+                config.ID_FIELD: ObjectId(asset[config.ID_FIELD]),
+                config.ETAG: asset.get(config.ETAG)
+            },
+            update={'$set': updates},
+            new=True
+        )
+
+        if not doc:
+            return False
+
+        app.data._search_backend(self.datasource).update(self.datasource, doc[config.ID_FIELD], doc)
+        self._invalidate_download_cache(doc)
+        return True
+
+    def _delete_rendition_binary(self, asset: IAsset, rendition: IAssetRendition):
+        set_service = get_service()
+        provider = set_service.get_provider_instance(asset.get('set_id'))
+        provider.delete(rendition['_media_id'])
+
+    def get_or_create_rendition(
+        self,
+        asset: IAsset,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        keep_proportions: Optional[bool] = True,
+        name: Optional[str] = None,
+        source: Optional[RenditionSource] = None
+    ) -> IAssetRendition:
+        """Returns the matching Image Rendition, generating it if it does not exist
+
+        Concurrent requests for the same rendition (from any thread or process) wait
+        for the first one to generate it, and then share that rendition.
+
+        :param dict asset: The Asset to get the rendition for
+        :param int width: The requested width of the rendition
+        :param int height: The requested height of the rendition
+        :param bool keep_proportions: If ``True``, keeps the aspect ratio of the original image
+        :param str name: Optional name of the rendition, if one is generated
+        :param RenditionSource source: Optional decoded source image (downloaded if not provided)
+        :return: The rendition metadata
+        :rtype: IAssetRendition
+        """
+
+        asset_id = asset['_id']
+
+        def get_rendition() -> Optional[IAssetRendition]:
+            latest = self.get_by_id(asset_id)
+            if not latest:
+                raise SamsAssetErrors.AssetNotFound(asset_id)
+
+            return self.get_asset_rendition_metadata(latest, width, height, keep_proportions)
+
+        def create_rendition() -> IAssetRendition:
+            return self.add_rendition(deepcopy(asset), width, height, keep_proportions, name, source)
+
+        return single_flight(
+            'asset_rendition:{}:{}:{}:{}'.format(asset_id, width, height, keep_proportions),
+            get_rendition,
+            create_rendition,
+            expire=app.config['RENDITION_LOCK_EXPIRE'],
+            timeout=app.config['RENDITION_LOCK_TIMEOUT']
+        )
 
     def get_asset_rendition_metadata(
         self,
@@ -199,40 +916,89 @@ class AssetsService(SamsService, MimetypeMixin):
 
         if not rendition:
             # If the rendition does not exist, then create it now
-            rendition = self.add_rendition(asset, width, height, keep_proportions)
+            rendition = self.get_or_create_rendition(asset, width, height, keep_proportions)
 
         set_service = get_service()
         provider = set_service.get_provider_instance(asset.get('set_id'))
-        asset_file = provider.get(rendition.get('_media_id'))
+        asset_file = disk_cache.get_file(
+            provider,
+            rendition.get('_media_id'),
+            rendition.get('hash'),
+            rendition.get('length')
+        )
         asset_file.filename = asset['filename']
         return asset_file, rendition
 
+    def on_updated(self, updates: Dict[str, Any], original: IAsset):
+        self._invalidate_download_cache(original)
+
+    def delete_action(self, lookup: Optional[Dict[str, Any]] = None):
+        """Deletes the Assets matching the lookup, and then their Binaries
+
+        The Binaries of all deleted Assets are removed using one
+        :meth:`~sams.storage.providers.base.SamsBaseStorageProvider.delete_many` call per Set,
+        so deleting many Assets (i.e. all Assets of a Set) does not send a request per Binary
+
+        :param dict lookup: Lookup used to determine which Assets to delete
+        :return: The response of the delete action
+        """
+
+        if lookup is None:
+            return super().delete_action(lookup)
+
+        docs = list(self.get_from_mongo(None, lookup))
+        for doc in docs:
+            self.on_delete(doc)
+
+        res = self.delete(lookup)
+
+        for doc in docs:
+            self.on_deleted(doc)
+
+        self.delete_binaries(docs)
+        return res
+
     def on_deleted(self, doc: IAsset):
-        """Delete the Asset Binary after the Metadata is deleted
+        """Remove the deleted Asset from the download cache
 
         :param dict doc: The Asset that was deleted
         """
 
-        if doc.get('_media_id'):
-            set_service = get_service()
-            provider = set_service.get_provider_instance(doc.get('set_id'))
-            provider.delete(doc['_media_id'])
+        self._invalidate_download_cache(doc)
+
+    def delete_binaries(self, docs: List[IAsset]):
+        """Delete the Binaries and Renditions of Assets, after the Metadata is deleted
+
+        :param list[dict] docs: The Assets that were deleted
+        """
+
+        # The media IDs of each Set, as the keys of an ordered dict so they are only deleted once
+        media_ids_by_set: Dict[ObjectId, Dict[Union[ObjectId, str], None]] = {}
+        for doc in docs:
+            if not doc.get('_media_id'):
+                continue
+
+            media_ids = media_ids_by_set.setdefault(doc.get('set_id'), OrderedDict())
+            media_ids[doc['_media_id']] = None
 
             # Make sure to also delete any renditions that were created
+            # (the ``original`` rendition shares the Asset's binary)
             for rendition in doc.get('renditions') or []:
                 if rendition.get('_media_id'):
-                    provider.delete(rendition['_media_id'])
+                    media_ids[rendition['_media_id']] = None
+
+        set_service = get_service()
+        for set_id, media_ids in media_ids_by_set.items():
+            set_service.get_provider_instance(set_id).delete_many(list(media_ids))
 
-    def _validate_upload_size(self, set_id: ObjectId, content: BinaryIO):
+    def _validate_upload_size(self, content: BinaryIO, max_size: int):
         """Validates the size of the upload against the Set or App config
 
-        :param bson.objectid.ObjectId set_id: The ID of the Set
         :param io.BytesIO content: The binary stream
+        :param int max_size: The maximum size for the Set (see :meth:`sams.sets.service.SetsService.get_max_asset_size`)
         :raises: sams_client.errors.SamsAssetErrors.AssetExceedsMaximumSizeForSet: If Asset size is too big
         """
 
-        max_size = get_service().get_max_asset_size(set_id)
-
         if max_size == 0:
             return
 
@@ -251,57 +1017,129 @@ class AssetsService(SamsService, MimetypeMixin):
         :param dict asset: The Asset Metadata used to store the binary for
         :param io.BytesIO content: The Asset Binary to upload
         :param bool delete_original: If ``True``, deletes the existing binary (if any)
-        :return: Returns the ``_media_id``, ``length`` and ``mimetype`` attributes of the binary
+        :return: Returns the ``_media_id``, ``length``, ``mimetype`` and ``hash`` attributes of the binary
         :rtype: dict
         """
 
         set_id = asset.get('set_id')
-        filename = asset.get('filename')
+        set_service = get_service()
+        provider = set_service.get_provider_instance(set_id)
+        file_meta = self._store_binary(provider, set_service.get_max_asset_size(set_id), asset, content)
 
-        # Seek the buffer to the beginning
-        # If `seek` is not available, then we have received an instance of `bytes`
-        # so convert it to an `io.BytesIO` instance
-        try:
-            content.seek(0)
-        except AttributeError:
-            content = BytesIO(content)
+        if delete_original and asset.get('_media_id'):
+            provider.delete(asset['_media_id'])
 
-        mimetype = self._get_mimetype(content, filename, asset.get('mimetype'))
+        return file_meta
 
-        content.seek(0)
+    def _store_binary(
+        self,
+        provider: SamsBaseStorageProvider,
+        max_size: int,
+        asset: Dict[str, Any],
+        content: Union[BinaryIO, bytes]
+    ) -> dict:
+        """Validates and stores a binary in the StorageDestination of the Set
 
-        self._validate_upload_size(set_id, content)
+        Does not require an application context, so it can be run by the
+        :data:`~sams.storage.executor.storage_executor`
+        """
 
-        set_service = get_service()
-        provider = set_service.get_provider_instance(set_id)
-        media_id = provider.put(content, filename, mimetype)
+        filename = asset.get('filename')
 
-        asset_binary = provider.get(media_id)
+        # The hash and size are calculated while the Storage Provider reads the binary,
+        # and only the start of the binary is used to detect the mimetype
+        if not isinstance(content, BinaryIngest):
+            content = BinaryIngest(content)
 
-        if delete_original and asset.get('_media_id'):
-            provider.delete(asset['_media_id'])
+        mimetype = self._get_mimetype(content.read_head(), filename, asset.get('mimetype'))
+
+        self._validate_upload_size(content, max_size)
+
+        stored_binary = provider.put(content, filename, mimetype)
 
         return {
-            'binary': media_id,
-            '_media_id': media_id,
-            'length': asset_binary.length,
-            'mimetype': mimetype
+            'binary': stored_binary.media_id,
+            '_media_id': stored_binary.media_id,
+            'length': stored_binary.length,
+            'mimetype': mimetype,
+            'hash': stored_binary.hash
         }
 
-    def download_binary(self, asset_id: Union[ObjectId, str]) -> SuperdeskFile:
+    def get_download_metadata(self, asset_id: Union[ObjectId, str]) -> Optional[Dict[str, Any]]:
+        """Returns the Asset fields required to serve its binary, from the cache if enabled
+
+        Only the ``_id`` and :data:`DOWNLOAD_METADATA_FIELDS` are returned. If the cache is enabled,
+        Assets that are not found are also cached, for ``ASSETS_DOWNLOAD_CACHE_NEGATIVE_TTL`` seconds.
+
+        :param bson.objectid.ObjectId asset_id: The ID of the Asset
+        :return: The download metadata, or ``None`` if the Asset is not found
+        :rtype: dict
+        """
+
+        def load():
+            asset = self.get_by_id(asset_id)
+            if not asset:
+                return None
+
+            metadata = {field: asset.get(field) for field in DOWNLOAD_METADATA_FIELDS}
+            metadata[config.ID_FIELD] = asset[config.ID_FIELD]
+            return metadata
+
+        if self.download_cache is None:
+            return load()
+
+        return self.download_cache.get(str(asset_id), load)
+
+    def _invalidate_download_cache(self, doc: IAsset):
+        if self.download_cache is not None:
+            self.download_cache.invalidate(str(doc[config.ID_FIELD]))
+
+    def get_download_url(
+        self,
+        asset: IAsset,
+        rendition: Optional[IAssetRendition] = None,
+        attachment: bool = False
+    ) -> Optional[str]:
+        """Returns a URL to download the Asset (or Rendition) binary directly from the StorageProvider
+
+        Only available if enabled for the StorageDestination of the Asset's Set
+        (i.e. the ``download_redirect`` attribute of :mod:`sams.storage.providers.amazon`)
+
+        :param dict asset: The Asset metadata, with ``set_id``, ``_media_id``, ``mimetype`` and ``filename``
+        :param dict rendition: Optional Rendition of the Asset to download
+        :param bool attachment: If ``True``, the client is asked to save the binary instead of displaying it
+        :return: The URL, or ``None`` if the binary must be downloaded through SAMS
+        :rtype: str
+        """
+
+        item = rendition or asset
+        provider = get_service().get_provider_instance(asset.get('set_id'))
+
+        return provider.get_download_url(
+            item.get('_media_id'),
+            asset.get('mimetype'),
+            get_content_disposition(item.get('filename') or asset.get('filename'), attachment)
+        )
+
+    def download_binary(self, asset_id: Union[ObjectId, str], asset: Optional[IAsset] = None) -> SuperdeskFile:
         """Downloads the Asset Binary
 
+        If ``DISK_CACHE_PATH`` is configured, the binary is served from the local disk cache
+
         :param bson.objectid.ObjectId asset_id: The ID of the Asset
+        :param dict asset: Optional Asset metadata (if already loaded), with ``set_id``, ``_media_id`` and ``filename``
         :return: The Binary Stream for the Asset Binary
         :rtype: superdesk.storage.superdesk_file.SuperdeskFile
         """
 
-        asset = self.get_by_id(asset_id)
+        if asset is None:
+            asset = self.get_by_id(asset_id)
+
         if not asset:
             raise SamsAssetErrors.AssetNotFound(asset_id)
 
         set_service = get_service()
         provider = set_service.get_provider_instance(asset.get('set_id'))
-        asset_file = provider.get(asset.get('_media_id'))
+        asset_file = disk_cache.get_file(provider, asset.get('_media_id'), asset.get('hash'), asset.get('length'))
         asset_file.filename = asset['filename']
         return asset_file
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Read-through caches for metadata that rarely changes
+
+A :class:`ReadThroughCache` keeps values in an in-process :class:`LocalCache` (LRU with a TTL),
+and optionally in a :class:`RedisCache` shared between processes, configured using ``CACHE_REDIS_URL``.
+
+Values that are not found can also be cached for a short time (``negative_ttl``), so repeated
+requests for a missing value do not reach the database.
+
+Invalidating a key removes it from the local and shared caches. The local caches of other processes
+are not notified, so they may return the old value until it expires. Caches created using :func:`create_cache`
+therefore keep values in the local cache for at most ``CACHE_LOCAL_MAX_TTL`` seconds, which bounds how long
+another process can serve a value after it was changed (i.e. an Asset that is no longer public).
+
+Usage::
+
+    from sams.cache import create_cache
+
+    cache = create_cache(app, 'sets', ttl=60, max_size=256)
+    set_item = cache.get(str(set_id), lambda: sets_service.find_one(req=None, _id=set_id))
+    cache.invalidate(str(set_id))
+"""
+
+from typing import Any, Callable, Dict, Optional, TypeVar
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+import pickle
+import time
+
+from sams.logger import logger
+
+T = TypeVar('T')
+
+#: Returned from :meth:`LocalCache.get` and :meth:`RedisCache.get` when the key is not cached
+MISSING = object()
+
+#: Stored in the local cache for values that were not found
+NOT_FOUND = object()
+
+#: All caches created using :func:`create_cache`, by name
+caches: Dict[str, 'ReadThroughCache'] = {}
+
+
+class LocalCache:
+    """An in-process, thread-safe LRU cache, where values expire after a number of seconds
+
+    :var int max_size: Maximum number of values to keep, the least recently used are removed first
+    :var float ttl: Seconds before a value expires
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self._lock = Lock()
+        self._items: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> Any:
+        """Returns the cached value, or :data:`MISSING` if it is not cached or has expired"""
+
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return MISSING
+
+            expires, value = item
+            if expires <= time.monotonic():
+                self._items.pop(key)
+                return MISSING
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Adds a value to the cache
+
+        :param str key: The key of the value
+        :param value: The value to cache
+        :param float ttl: Seconds before the value expires (defaults to the TTL of the cache)
+        """
+
+        with self._lock:
+            self._items[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class RedisCache:
+    """A cache stored in Redis, shared between processes
+
+    Values are pickled, and expire after a number of seconds.
+
+    :var redis.Redis client: The Redis client
+    :var str prefix: Prefix added to all keys of this cache
+    :var float ttl: Seconds before a value expires
+    """
+
+    def __init__(self, client, prefix: str, ttl: float):
+        self.client = client
+        self.prefix: str = prefix
+        self.ttl: float = ttl
+
+    def _get_key(self, key: str) -> str:
+        return '{}{}'.format(self.prefix, key)
+
+    def get(self, key: str) -> Any:
+        """Returns the cached value, or :data:`MISSING` if it is not cached or has expired"""
+
+        value = self.client.get(self._get_key(key))
+        return MISSING if value is None else pickle.loads(value)
+
+    def set(self, key: str, value: Any):
+        self.client.set(self._get_key(key), pickle.dumps(value), px=int(self.ttl * 1000))
+
+    def delete(self, key: str):
+        self.client.delete(self._get_key(key))
+
+    def clear(self):
+        for key in self.client.scan_iter(match='{}*'.format(self.prefix)):
+            self.client.delete(key)
+
+
+class ReadThroughCache:
+    """Loads values on a cache miss, and keeps them in the local and (optional) shared cache
+
+    ``None`` values are only cached in the local cache, and only if ``negative_ttl`` is set.
+    Errors from the shared cache are logged, and the value is loaded instead, so an unavailable
+    shared cache does not fail requests.
+
+    :var str name: The name of the cache
+    :var LocalCache local: The in-process cache
+    :var RedisCache shared: The cache shared between processes (if configured)
+    :var float negative_ttl: Seconds to cache values that were not found (``0`` to not cache them)
+    :var int hits: The number of values returned from the local or shared cache
+    :var int misses: The number of values loaded
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local: LocalCache,
+        shared: Optional[RedisCache] = None,
+        negative_ttl: float = 0
+    ):
+        self.name: str = name
+        self.local: LocalCache = local
+        self.shared: Optional[RedisCache] = shared
+        self.negative_ttl: float = negative_ttl
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: str, load: Callable[[], Optional[T]]) -> Optional[T]:
+        """Returns a copy of the cached value, calling ``load`` to get it on a cache miss
+
+        :param str key: The key of the value
+        :param load: Returns the value to cache, or ``None`` if it does not exist
+        :return: A copy of the value, so the caller can modify it
+        """
+
+        value = self.local.get(key)
+
+        if value is MISSING and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception:
+                logger.exception('Failed to get "{}" from the shared "{}" cache'.format(key, self.name))
+
+            if value is not MISSING:
+                self.local.set(key, value)
+
+        if value is not MISSING:
+            self.hits += 1
+            return None if value is NOT_FOUND else deepcopy(value)
+
+        self.misses += 1
+        value = load()
+        if value is None:
+            if self.negative_ttl:
+                self.local.set(key, NOT_FOUND, self.negative_ttl)
+            return None
+
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except Exception:
+                logger.exception('Failed to add "{}" to the shared "{}" cache'.format(key, self.name))
+
+        return deepcopy(value)
+
+    def invalidate(self, key: str):
+        """Removes a value from the local and shared cache
+
+        :param str key: The key of the value
+        """
+
+        self.local.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.delete(key)
+            except Exception:
+                logger.exception('Failed to remove "{}" from the shared "{}" cache'.format(key, self.name))
+
+    def clear(self):
+        """Removes all values from the local and shared cache"""
+
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the ``name``, ``hits``, ``misses`` and ``size`` (of the local cache) of this cache"""
+
+        return {
+            'name': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.local),
+        }
+
+
+def get_redis_client(app):
+    """Returns a Redis client for ``CACHE_REDIS_URL``, or ``None`` if it is not configured
+
+    The client is created once per application.
+    """
+
+    url = app.config.get('CACHE_REDIS_URL')
+    if not url:
+        return None
+
+    if getattr(app, 'sams_cache_redis', None) is None:
+        import redis
+        app.sams_cache_redis = redis.from_url(url)
+
+    return app.sams_cache_redis
+
+
+def create_cache(app, name: str, ttl: float, max_size: int, negative_ttl: float = 0) -> ReadThroughCache:
+    """Creates a cache, shared between processes if ``CACHE_REDIS_URL`` is configured
+
+    Values are kept in the in-process cache for at most ``CACHE_LOCAL_MAX_TTL`` seconds, as it is only
+    invalidated in the process that changed the value. The shared cache is invalidated for all processes,
+    so it keeps values for the full ``ttl``.
+
+    :param app: The application instance
+    :param str name: The name of the cache, used as the key prefix in the shared cache
+    :param float ttl: Seconds before a value expires
+    :param int max_size: Maximum number of values kept in the in-process cache
+    :param float negative_ttl: Seconds to cache values that were not found (``0`` to not cache them)
+    :return: The new cache
+    :rtype: ReadThroughCache
+    """
+
+    client = get_redis_client(app)
+    local_max_ttl = app.config.get('CACHE_LOCAL_MAX_TTL') or 0
+    local_ttl = min(ttl, local_max_ttl) if local_max_ttl else ttl
+
+    cache = ReadThroughCache(
+        name,
+        LocalCache(max_size, local_ttl),
+        RedisCache(client, 'sams:{}:'.format(name), ttl) if client is not None else None,
+        min(negative_ttl, local_ttl)
+    )
+    caches[name] = cache
+    return cache
@@ -10,6 +10,9 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 from .add_renditions_to_existing_assets import AddOriginalRenditions  # noqa
+from .add_hashes_to_existing_assets import AddAssetHashes  # noqa
 from .delete_elastic_index import DeleteElasticIndex  # noqa
 from .index_from_mongo import IndexFromMongo  # noqa
 from .flush_elastic_index import FlushElasticIndex  # noqa
+from .rendition_worker import RenditionWorker  # noqa
+from .purge_upload_sessions import PurgeUploadSessions  # noqa
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from flask import current_app as app
+
+from sams.assets import get_service as get_asset_service
+from sams.sets import get_service as get_set_service
+from sams.logger import logger
+from sams.utils import get_binary_stream_hash
+from sams_client.errors import SamsAssetErrors
+
+from superdesk import Command, command
+
+
+class AddAssetHashes(Command):
+    """Add Asset Hashes
+
+    It calculates and stores the ``hash`` of existing Assets and their Renditions
+    that were uploaded before the hash was stored with the metadata.
+    The hash is then used as the ``ETag`` when downloading the binaries.
+
+    Example:
+    ::
+
+        $ python -m sams.manage app:add_asset_hashes
+
+    """
+
+    def run(self):
+        logger.info('Add hashes to existing assets')
+        self.add_asset_hashes()
+
+    @classmethod
+    def add_asset_hashes(cls):
+        """Adds the binary hash to existing Assets and Renditions without one
+        """
+
+        asset_service = get_asset_service()
+        set_service = get_set_service()
+        db_assets = app.data.get_mongo_collection('assets').find({
+            '$or': [
+                {'hash': None},
+                {'renditions.hash': None}
+            ]
+        })
+
+        for asset in db_assets:
+            provider = set_service.get_provider_instance(asset['set_id'])
+
+            renditions = asset.get('renditions') or []
+            media_ids = [] if asset.get('hash') else [asset['_media_id']]
+            for rendition in renditions:
+                media_id = rendition.get('_media_id')
+                if not rendition.get('hash') and media_id != asset['_media_id'] and media_id not in media_ids:
+                    media_ids.append(media_id)
+
+            # Download the binaries of the Asset and its Renditions concurrently
+            try:
+                binaries = provider.get_many(media_ids)
+            except SamsAssetErrors.AssetNotFound as e:
+                logger.warning('Failed to add hash to asset "%s": %s', asset['_id'], e)
+                continue
+
+            hashes = {}
+            for media_id, binary in zip(media_ids, binaries):
+                try:
+                    hashes[media_id] = get_binary_stream_hash(binary)
+                finally:
+                    binary.close()
+
+            updates = {}
+            if not asset.get('hash'):
+                updates['hash'] = hashes[asset['_media_id']]
+
+            for rendition in renditions:
+                if not rendition.get('hash'):
+                    rendition['hash'] = hashes.get(rendition.get('_media_id')) or asset.get('hash')
+                    updates['renditions'] = renditions
+
+            if updates:
+                logger.info('Adding hash to asset "%s"', asset['_id'])
+                asset_service.system_update(asset['_id'], updates, asset)
+
+
+command('app:add_asset_hashes', AddAssetHashes())
@@ -9,9 +9,12 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+from typing import Any, Dict, Optional, Tuple
+
 from flask import current_app as app
 import PIL
 from sams.assets import get_service as get_asset_service
+from sams.storage.executor import storage_executor
 from sams_client.schemas.assets import IAssetRendition, IAssetRenditionArgs
 from sams.logger import logger
 
@@ -41,7 +44,6 @@ class AddOriginalRenditions(Command):
         """Adds original rendition to the existing assets
         """
 
-        service = get_asset_service()
         db_assets = app.data.get_mongo_collection('assets').find()
         assets_without_original_rendition = []
         for asset in db_assets:
@@ -51,14 +53,19 @@ class AddOriginalRenditions(Command):
                     assets_without_original_rendition.append(asset)
                     break
 
-        for asset in assets_without_original_rendition:
+        # Download the originals concurrently, as only their image size is required
+        current_app = app._get_current_object()
+        sizes = storage_executor.map(
+            lambda asset: cls.get_image_size(current_app, asset),
+            assets_without_original_rendition
+        )
+
+        for asset, size in zip(assets_without_original_rendition, sizes):
             updates = {}
             updates['renditions'] = []
 
-            original = service.download_binary(asset['_id'])
-
-            try:
-                width, height = PIL.Image.open(original).size
+            if size:
+                width, height = size
                 rendition = IAssetRendition(
                     name='original',
                     _media_id=asset['_media_id'],
@@ -71,11 +78,10 @@ class AddOriginalRenditions(Command):
                     ),
                     versioncreated=utcnow(),
                     filename=asset['filename'],
-                    length=asset['length']
+                    length=asset['length'],
+                    hash=asset.get('hash')
                 )
                 updates['renditions'].append(rendition)
-            except Exception:
-                pass
 
             for rendition in asset['renditions']:
                 if rendition['params']['width'] == 220:
@@ -88,5 +94,19 @@ class AddOriginalRenditions(Command):
 
             get_asset_service().system_update(asset['_id'], {'renditions': updates['renditions']}, asset)
 
+    @staticmethod
+    def get_image_size(current_app, asset: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """Returns the width and height of the Asset's image, or ``None`` if it is not an image"""
+
+        with current_app.app_context():
+            original = get_asset_service().download_binary(asset['_id'], asset)
+
+        try:
+            return PIL.Image.open(original).size
+        except Exception:
+            return None
+        finally:
+            original.close()
+
 
 command('app:add_original_renditions', AddOriginalRenditions())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from superdesk import Command, command
+
+from sams.upload_sessions import get_service as get_upload_sessions_service
+from sams.logger import logger
+
+
+class PurgeUploadSessions(Command):
+    """Remove expired Upload Sessions
+
+    Binaries uploaded to sessions that were never finalized are deleted from their StorageDestination.
+    Run this periodically (i.e. from cron) when direct uploads are used.
+
+    Example:
+    ::
+
+        $ python -m sams.manage app:purge_upload_sessions
+
+    """
+
+    def run(self):
+        logger.info('Purging expired Upload Sessions')
+        count = get_upload_sessions_service().purge_expired()
+        logger.info('Removed {} expired Upload Sessions'.format(count))
+
+
+command('app:purge_upload_sessions', PurgeUploadSessions())
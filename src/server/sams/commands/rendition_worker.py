@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import time
+import multiprocessing
+from os import getpid
+from socket import gethostname
+
+from flask import current_app as app
+
+from superdesk import Command, command, Option
+
+from sams.rendition_jobs import get_service as get_rendition_jobs_service
+from sams.logger import logger
+
+
+def process_rendition_jobs(poll_interval: float, once: bool = False):
+    """Processes Rendition Jobs from the queue until interrupted
+
+    Must be called inside an application context
+
+    :param float poll_interval: Seconds to wait before checking for new jobs, if the queue is empty
+    :param bool once: If ``True``, returns once the queue is empty
+    """
+
+    service = get_rendition_jobs_service()
+    worker = 'hostid:{} pid:{}'.format(gethostname(), getpid())
+    logger.info('Rendition worker "{}" started'.format(worker))
+
+    while True:
+        job = service.claim_next_job(worker)
+
+        if job:
+            service.process_job(job)
+        elif once:
+            break
+        else:
+            time.sleep(poll_interval)
+
+
+def _run_worker_process(poll_interval: float, once: bool):
+    # Each worker process creates its own application instance,
+    # so database and storage connections are not shared between processes
+    from sams.factory.app import SamsApp
+
+    worker_app = SamsApp()
+    with worker_app.app_context():
+        process_rendition_jobs(poll_interval, once)
+
+
+class RenditionWorker(Command):
+    """Generate Image Renditions from the Rendition Job queue
+
+    Jobs are added to the queue using ``POST /produce/assets/images/<asset_id>?async=true``.
+    When running more than one process, each process is started with its own application instance.
+
+    ===================    ======    =====================================================================
+    **--processes**        **-p**    Number of worker processes (defaults to ``RENDITION_WORKER_PROCESSES``)
+    **--poll-interval**    **-i**    Seconds to wait for new jobs (defaults to ``RENDITION_WORKER_POLL_INTERVAL``)
+    **--once**             **-o**    Exit once the queue is empty
+    ===================    ======    =====================================================================
+
+    Example:
+    ::
+
+        $ python -m sams.manage app:rendition_worker
+        $ python -m sams.manage app:rendition_worker --processes=4
+        $ python -m sams.manage app:rendition_worker --once
+
+    """
+
+    option_list = [
+        Option('--processes', '-p', type=int, dest='processes'),
+        Option('--poll-interval', '-i', type=float, dest='poll_interval'),
+        Option('--once', '-o', action='store_true', dest='once')
+    ]
+
+    def run(self, processes=None, poll_interval=None, once=False):
+        if not processes:
+            processes = app.config['RENDITION_WORKER_PROCESSES']
+
+        if poll_interval is None:
+            poll_interval = app.config['RENDITION_WORKER_POLL_INTERVAL']
+
+        if processes <= 1:
+            process_rendition_jobs(poll_interval, once)
+            return
+
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=_run_worker_process, args=(poll_interval, once))
+            for _i in range(processes)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+
+
+command('app:rendition_worker', RenditionWorker())
@@ -9,6 +9,8 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import json
+
 from superdesk.default_settings import strtobool, env, urlparse
 
 HOST = env('SAMS_HOST', 'localhost')
@@ -110,6 +112,8 @@ CORE_APPS = [
     'sams.sets',
     'sams.storage',
     'sams.assets',
+    'sams.rendition_jobs',
+    'sams.upload_sessions',
     'sams.commands',
 ]
 INSTALLED_APPS = [
@@ -124,6 +128,15 @@ STORAGE_PROVIDERS = [
     'sams.storage.providers.amazon.AmazonS3Provider',
 ]
 
+#: Maximum number of connections each Storage Provider instance keeps open (``0`` uses the provider default)
+STORAGE_MAX_POOL_SIZE = int(env('SAMS_STORAGE_MAX_POOL_SIZE', '0'))
+
+#: Maximum number of threads per process used to access Storage Providers concurrently in batch operations
+STORAGE_MAX_WORKERS = int(env('SAMS_STORAGE_MAX_WORKERS', '8'))
+
+#: Seconds between health checks of cached Storage Provider instances (``0`` disables health checks)
+STORAGE_HEALTH_CHECK_INTERVAL = int(env('SAMS_STORAGE_HEALTH_CHECK_INTERVAL', '60'))
+
 # Uncomment this next line and modify the config to add MongoGridFS storage destination
 # STORAGE_DESTINATION_1 = 'MongoGridFS,Default,mongodb://sams/sams'
 
@@ -136,6 +149,84 @@ CLIENT_API_KEYS = env('SAMS_CLIENT_API_KEYS', '')
 # Specify the maximum size of an Asset
 MAX_ASSET_SIZE = int(env('SAMS_MAX_ASSET_SIZE', '0'))
 
+#: Bytes of an uploaded binary kept in memory while the request is processed, before it is written to a temp file
+UPLOAD_SPOOL_MAX_SIZE = int(env('SAMS_UPLOAD_SPOOL_MAX_SIZE', str(1024 * 1024)))
+
+#: Seconds an Upload Session (used to upload a binary directly to the StorageDestination) can be used for
+UPLOAD_SESSION_EXPIRES = int(env('SAMS_UPLOAD_SESSION_EXPIRES', '3600'))
+
+#: Number of Assets from a bulk upload (or bulk update) that are stored and inserted (or updated) together
+ASSETS_BULK_BATCH_SIZE = int(env('SAMS_ASSETS_BULK_BATCH_SIZE', '100'))
+
+#: Seconds before the lock used while generating an Image Rendition expires
+RENDITION_LOCK_EXPIRE = int(env('SAMS_RENDITION_LOCK_EXPIRE', '60'))
+
+#: Seconds to wait for another request that is generating the same Image Rendition
+RENDITION_LOCK_TIMEOUT = int(env('SAMS_RENDITION_LOCK_TIMEOUT', '30'))
+
+#: If ``True``, the rendition presets of a Set are generated by the rendition worker,
+#: instead of during the upload request
+RENDITION_PRESETS_ASYNC = strtobool(env('SAMS_RENDITION_PRESETS_ASYNC', 'false'))
+
+#: Number of processes the rendition worker uses to process Rendition Jobs
+RENDITION_WORKER_PROCESSES = int(env('SAMS_RENDITION_WORKER_PROCESSES', '2'))
+
+#: Seconds the rendition worker waits before checking for new Rendition Jobs
+RENDITION_WORKER_POLL_INTERVAL = float(env('SAMS_RENDITION_WORKER_POLL_INTERVAL', '1'))
+
+#: Seconds a worker can process a Rendition Job before another worker can take it over
+RENDITION_JOB_TIMEOUT = int(env('SAMS_RENDITION_JOB_TIMEOUT', '300'))
+
+#: Number of times a Rendition Job is attempted before it is marked as failed
+RENDITION_JOB_MAX_ATTEMPTS = int(env('SAMS_RENDITION_JOB_MAX_ATTEMPTS', '3'))
+
+#: Minimum ratio between an existing Image Rendition and a new rendition, for the existing
+#: rendition to be used instead of the original image when generating the new one (0 to always use the original)
+RENDITION_SOURCE_MIN_SCALE = float(env('SAMS_RENDITION_SOURCE_MIN_SCALE', '2'))
+
+#: Encoder settings per image format used when saving Image Renditions, overriding the defaults
+#: in :data:`sams.assets.images.DEFAULT_ENCODER_SETTINGS`. i.e. ``{"JPEG": {"quality": 75}}``
+RENDITION_ENCODER_SETTINGS = json.loads(env('SAMS_RENDITION_ENCODER_SETTINGS', '{}'))
+
+#: Redis URL of a cache shared between processes, used in addition to the in-process caches (optional)
+CACHE_REDIS_URL = env('SAMS_CACHE_REDIS_URL', '')
+
+#: Maximum seconds a value is kept in an in-process cache, as other processes cannot invalidate it (0 for no limit)
+CACHE_LOCAL_MAX_TTL = float(env('SAMS_CACHE_LOCAL_MAX_TTL', '5'))
+
+#: If ``True``, Sets are cached, removing a database query from most requests
+SETS_CACHE_ENABLED = strtobool(env('SAMS_SETS_CACHE_ENABLED', 'true'))
+
+#: Seconds a Set is cached for
+SETS_CACHE_TTL = float(env('SAMS_SETS_CACHE_TTL', '60'))
+
+#: Maximum number of Sets kept in the in-process cache
+SETS_CACHE_MAX_SIZE = int(env('SAMS_SETS_CACHE_MAX_SIZE', '256'))
+
+#: If ``True``, the metadata required to download an Asset is cached (enabled in the File Server app)
+ASSETS_DOWNLOAD_CACHE_ENABLED = strtobool(env('SAMS_ASSETS_DOWNLOAD_CACHE_ENABLED', 'false'))
+
+#: Seconds the download metadata of an Asset is cached for
+ASSETS_DOWNLOAD_CACHE_TTL = float(env('SAMS_ASSETS_DOWNLOAD_CACHE_TTL', '30'))
+
+#: Seconds an Asset that was not found is cached for
+ASSETS_DOWNLOAD_CACHE_NEGATIVE_TTL = float(env('SAMS_ASSETS_DOWNLOAD_CACHE_NEGATIVE_TTL', '5'))
+
+#: Maximum number of Assets kept in the in-process download metadata cache
+ASSETS_DOWNLOAD_CACHE_MAX_SIZE = int(env('SAMS_ASSETS_DOWNLOAD_CACHE_MAX_SIZE', '10000'))
+
+#: Directory used to cache binaries downloaded from Storage Providers (disabled if empty)
+DISK_CACHE_PATH = env('SAMS_DISK_CACHE_PATH', '')
+
+#: Maximum size of all binaries in the disk cache, in bytes (defaults to 1GB)
+DISK_CACHE_MAX_SIZE = int(env('SAMS_DISK_CACHE_MAX_SIZE', str(1024 * 1024 * 1024)))
+
+#: Maximum size of a binary to add to the disk cache, in bytes (defaults to 10MB)
+DISK_CACHE_MAX_FILE_SIZE = int(env('SAMS_DISK_CACHE_MAX_FILE_SIZE', str(10 * 1024 * 1024)))
+
+#: Number of Asset binaries fetched from storage ahead of time, when streaming a compressed download
+COMPRESSED_BINARY_LOOKAHEAD = int(env('SAMS_COMPRESSED_BINARY_LOOKAHEAD', '4'))
+
 # Specify the location of the log config file
 LOG_CONFIG_FILE = env('SAMS_LOG_CONFIG', 'logging_config.yml')
 
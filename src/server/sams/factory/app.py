@@ -20,7 +20,7 @@ import superdesk
 from superdesk.datalayer import SuperdeskDataLayer
 from superdesk.validator import SuperdeskValidator
 
-from sams.storage.sams_media_storage import SamsMediaStorage
+from sams.storage.sams_media_storage import SamsMediaStorage, SamsRequest
 from sams.logger import configure_logging
 from sams.errors import setup_error_handlers
 from sams_client.errors import SamsConfigErrors
@@ -45,6 +45,8 @@ class SamsApp(Eve):
         app.run()
     """
 
+    request_class = SamsRequest
+
     def __init__(self, import_name=__package__, config=None, **kwargs):
         """Override __init__ to do SAMS specific config and still be able
         to create an instance using ``app = SamsApp()``
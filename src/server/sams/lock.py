@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Locks used to coordinate work between threads and processes
+
+:class:`KeyedLocks` provides an in-process lock per key, and :func:`single_flight`
+combines it with a lease stored in MongoDB (using :mod:`superdesk.lock`), so that
+only one thread across all processes performs the work for a given key.
+"""
+
+from typing import Callable, Dict, Optional, TypeVar
+from contextlib import contextmanager
+from threading import Lock, get_ident
+
+from superdesk.lock import lock, unlock, get_host
+
+from sams.logger import logger
+
+T = TypeVar('T')
+
+
+class KeyedLocks:
+    """A collection of in-process locks, one per key
+
+    Locks are created on demand and removed once no thread holds or waits for them.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._locks: Dict[str, Lock] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @contextmanager
+    def __call__(self, key: str, timeout: Optional[float] = None):
+        """Acquire the lock for ``key`` for the duration of the context
+
+        :param str key: The key to lock
+        :param float timeout: Seconds to wait for the lock (waits forever if ``None``)
+        :return: Yields ``True`` if the lock was acquired, ``False`` if the timeout was reached
+        """
+
+        with self._lock:
+            key_lock = self._locks.setdefault(key, Lock())
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+
+        acquired = key_lock.acquire(timeout=-1 if timeout is None else timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                key_lock.release()
+
+            with self._lock:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    self._waiters.pop(key)
+                    self._locks.pop(key)
+
+
+#: In-process locks used by :func:`single_flight`
+keyed_locks = KeyedLocks()
+
+
+def get_lock_owner() -> str:
+    """Returns the owner used for MongoDB leases, unique for the current thread"""
+
+    return '{} thread:{}'.format(get_host(), get_ident())
+
+
+def single_flight(
+    key: str,
+    get_result: Callable[[], Optional[T]],
+    create_result: Callable[[], T],
+    expire: int,
+    timeout: int
+) -> T:
+    """Makes sure only one caller creates the result for ``key``, and all others share it
+
+    The caller first acquires the in-process lock for ``key``, then a lease on ``key`` in MongoDB.
+    Once both are held, ``get_result`` is checked again in case another thread or process
+    created the result while this one was waiting. If no result exists, ``create_result`` is called.
+
+    If the lease could not be acquired within ``timeout`` seconds, the result is created
+    without it, so ``create_result`` must still be safe to run concurrently.
+
+    :param str key: The key used to identify the work
+    :param get_result: Returns the existing result, or ``None`` if it is not yet created
+    :param create_result: Creates and returns the result
+    :param int expire: Seconds after which the MongoDB lease expires (in case the owner dies)
+    :param int timeout: Seconds to wait for another owner to finish
+    :return: The existing or newly created result
+    """
+
+    with keyed_locks(key, timeout) as acquired_local:
+        result = get_result()
+        if result is not None:
+            return result
+
+        owner = get_lock_owner()
+        acquired_lease = acquired_local and lock(key, owner, expire=expire, timeout=timeout)
+        if not acquired_lease:
+            logger.warning('Timed out waiting for lock "{}", continuing without it'.format(key))
+
+        try:
+            result = get_result()
+            return result if result is not None else create_result()
+        finally:
+            if acquired_lease:
+                unlock(key, owner, remove=True)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Rendition Job service, used to generate Image Renditions in the background.
+
+Jobs are stored in the ``rendition_jobs`` MongoDB collection, and processed by the
+rendition worker (see :class:`sams.commands.rendition_worker.RenditionWorker`)::
+
+    $ python -m sams.manage app:rendition_worker
+
+Usage
+-----
+The Rendition Job service instance can be found under :data:`sams.rendition_jobs.get_service` and used::
+
+    from sams.assets import get_service as get_asset_service
+    from sams.rendition_jobs import get_service
+
+    def queue_rendition(asset_id):
+        asset = get_asset_service().get_by_id(asset_id)
+        job = get_service().queue_job(asset, width=640)
+
+        # Later, once a worker has processed the job
+        job = get_service().get_by_id(job['_id'])
+        if job['state'] == 'completed':
+            print(job['rendition'])
+
+This service instance can only be used after the application has bootstrapped.
+"""
+
+from superdesk import get_backend
+from sams.factory.app import SamsApp
+from .resource import RenditionJobsResource
+from .service import RenditionJobsService
+
+_service: RenditionJobsService
+
+
+def get_service() -> RenditionJobsService:
+    return _service
+
+
+def init_app(app: SamsApp):
+    global _service
+
+    _service = RenditionJobsService(
+        RenditionJobsResource.endpoint_name,
+        backend=get_backend()
+    )
+    RenditionJobsResource(
+        endpoint_name=RenditionJobsResource.endpoint_name,
+        app=app,
+        service=_service
+    )
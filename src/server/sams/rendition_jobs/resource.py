@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from superdesk.resource import Resource
+from sams_client.schemas import RENDITION_JOB_SCHEMA
+
+
+class RenditionJobsResource(Resource):
+    endpoint_name = resource_title = 'rendition_jobs'
+    url = '/internal/rendition_jobs'
+    internal_resource = True
+    schema = RENDITION_JOB_SCHEMA
+
+    datasource = {
+        'source': 'rendition_jobs'
+    }
+    mongo_indexes = {
+        'state_created': [('state', 1), ('_created', 1)],
+        'asset_state': [('asset_id', 1), ('state', 1)],
+        # Only queued and running jobs have an ``active_key``
+        'active_key': ([('active_key', 1)], {
+            'unique': True,
+            'partialFilterExpression': {'active_key': {'$type': 'string'}}
+        })
+    }
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from typing import Optional
+from datetime import timedelta
+
+from bson import ObjectId
+from flask import current_app as app
+from eve.utils import config
+from pymongo import ReturnDocument
+from werkzeug.exceptions import Conflict
+
+from superdesk.utc import utcnow
+
+from sams.factory.service import SamsService
+from sams.assets import get_service as get_asset_service
+from sams.logger import logger
+
+from sams_client.schemas import RENDITION_JOB_STATES
+from sams_client.schemas.assets import IAsset, IAssetRenditionArgs
+from sams_client.schemas.rendition_jobs import IRenditionJob
+from sams_client.errors import SamsException, SamsAssetErrors
+
+
+class RenditionJobsService(SamsService):
+    def queue_job(
+        self,
+        asset: IAsset,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        keep_proportions: bool = True,
+        name: Optional[str] = None
+    ) -> IRenditionJob:
+        """Adds a job to the queue to generate an Image Rendition in the background
+
+        If a job for the same rendition is already queued or running, that job is returned instead.
+
+        :param dict asset: The Asset to generate the rendition for
+        :param int width: The requested width of the rendition
+        :param int height: The requested height of the rendition
+        :param bool keep_proportions: If ``True``, keeps the aspect ratio of the original image
+        :param str name: Optional name of the rendition
+        :return: The queued (or existing) job
+        :rtype: IRenditionJob
+        """
+
+        params = IAssetRenditionArgs(width=width, height=height, keep_proportions=keep_proportions)
+
+        return self._queue_unique_job(IRenditionJob(
+            asset_id=asset[config.ID_FIELD],
+            params=params,
+            name=name,
+            state=RENDITION_JOB_STATES.QUEUED,
+            attempts=0,
+            active_key='{}:{}:{}:{}'.format(asset[config.ID_FIELD], width, height, bool(keep_proportions))
+        ))
+
+    def queue_presets_job(self, asset: IAsset) -> IRenditionJob:
+        """Adds a job to the queue to generate the rendition presets of the Asset's Set
+
+        If a presets job for the Asset is already queued or running, that job is returned instead.
+
+        :param dict asset: The Asset to generate the renditions for
+        :return: The queued (or existing) job
+        :rtype: IRenditionJob
+        """
+
+        return self._queue_unique_job(IRenditionJob(
+            asset_id=asset[config.ID_FIELD],
+            presets=True,
+            state=RENDITION_JOB_STATES.QUEUED,
+            attempts=0,
+            active_key='{}:presets'.format(asset[config.ID_FIELD])
+        ))
+
+    def queue_hash_job(self, asset: IAsset) -> IRenditionJob:
+        """Adds a job to the queue to calculate the hash of the Asset's binary
+
+        Used for binaries uploaded directly to the StorageDestination, which are not read by SAMS when uploaded.
+        If a hash job for the Asset is already queued or running, that job is returned instead.
+
+        :param dict asset: The Asset to calculate the hash for
+        :return: The queued (or existing) job
+        :rtype: IRenditionJob
+        """
+
+        return self._queue_unique_job(IRenditionJob(
+            asset_id=asset[config.ID_FIELD],
+            hash=True,
+            state=RENDITION_JOB_STATES.QUEUED,
+            attempts=0,
+            active_key='{}:hash'.format(asset[config.ID_FIELD])
+        ))
+
+    def _queue_unique_job(self, job: IRenditionJob) -> IRenditionJob:
+        """Adds the job, unless a queued or running job with the same ``active_key`` already exists
+
+        The ``active_key`` index is unique, so concurrent requests cannot queue the same job twice
+        """
+
+        existing = self.find_one(req=None, active_key=job['active_key'])
+        if existing:
+            return existing
+
+        try:
+            self.post([job])
+        except Conflict:
+            # Another request queued the same job since it was looked up
+            existing = self.find_one(req=None, active_key=job['active_key'])
+            if not existing:
+                raise
+            return existing
+
+        return job
+
+    def claim_next_job(self, worker: str) -> Optional[IRenditionJob]:
+        """Atomically assigns the oldest available job to a worker
+
+        A job is available if it is queued, or if it is running but the lease of its worker has expired
+        (i.e. the worker process died while processing it). Expired jobs that have already been attempted
+        ``RENDITION_JOB_MAX_ATTEMPTS`` times are marked as failed instead, as they may be killing their workers.
+
+        :param str worker: The ID of the worker claiming the job
+        :return: The claimed job, or ``None`` if there are no jobs available
+        :rtype: IRenditionJob
+        """
+
+        now = utcnow()
+        max_attempts = app.config['RENDITION_JOB_MAX_ATTEMPTS']
+        collection = app.data.get_mongo_collection(self.datasource)
+
+        collection.update_many(
+            {
+                'state': RENDITION_JOB_STATES.RUNNING,
+                'lease_expire': {'$lt': now},
+                'attempts': {'$gte': max_attempts}
+            },
+            {
+                '$set': {
+                    'state': RENDITION_JOB_STATES.FAILED,
+                    'error': 'The job did not finish before its lease expired',
+                    'worker': None,
+                    'lease_expire': None,
+                    'active_key': None,
+                    'finished': now,
+                    config.LAST_UPDATED: now
+                }
+            }
+        )
+
+        return collection.find_one_and_update(
+            {
+                '$or': [
+                    {'state': RENDITION_JOB_STATES.QUEUED},
+                    {
+                        'state': RENDITION_JOB_STATES.RUNNING,
+                        'lease_expire': {'$lt': now},
+                        'attempts': {'$lt': max_attempts}
+                    }
+                ]
+            },
+            {
+                '$set': {
+                    'state': RENDITION_JOB_STATES.RUNNING,
+                    'worker': worker,
+                    'started': now,
+                    'lease_expire': now + timedelta(seconds=app.config['RENDITION_JOB_TIMEOUT']),
+                    config.LAST_UPDATED: now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[(config.DATE_CREATED, 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def process_job(self, job: IRenditionJob):
+        """Generates the rendition for a claimed job, and stores the result on the job
+
+        Jobs with ``presets`` generate all rendition presets of the Asset's Set instead of a single rendition,
+        and jobs with ``hash`` calculate the hash of the Asset's binary.
+        Failed jobs are queued again until ``RENDITION_JOB_MAX_ATTEMPTS`` is reached.
+
+        :param dict job: The job returned from :meth:`claim_next_job`
+        """
+
+        asset_service = get_asset_service()
+        params = job.get('params') or {}
+
+        try:
+            asset = asset_service.get_by_id(job['asset_id'])
+            if not asset:
+                raise SamsAssetErrors.AssetNotFound(job['asset_id'])
+
+            if job.get('presets'):
+                asset_service.generate_rendition_presets(asset)
+                rendition = None
+            elif job.get('hash'):
+                asset_service.store_binary_hash(asset)
+                rendition = None
+            else:
+                rendition = asset_service.get_or_create_rendition(
+                    asset,
+                    params.get('width'),
+                    params.get('height'),
+                    params.get('keep_proportions'),
+                    job.get('name')
+                )
+        except (Exception, SamsException) as error:
+            logger.exception('Failed to process rendition job "{}"'.format(job[config.ID_FIELD]))
+            retry = not isinstance(error, SamsAssetErrors.AssetNotFound) and \
+                job.get('attempts', 0) < app.config['RENDITION_JOB_MAX_ATTEMPTS']
+            self._finish_job(
+                job,
+                state=RENDITION_JOB_STATES.QUEUED if retry else RENDITION_JOB_STATES.FAILED,
+                error=str(error)
+            )
+            return
+
+        self._finish_job(job, state=RENDITION_JOB_STATES.COMPLETED, rendition=rendition)
+
+    def _finish_job(self, job: IRenditionJob, **updates):
+        now = utcnow()
+        updates.update({
+            'worker': None,
+            'lease_expire': None,
+            config.LAST_UPDATED: now
+        })
+
+        if updates['state'] != RENDITION_JOB_STATES.QUEUED:
+            updates['finished'] = now
+            # Allow the same rendition to be queued again
+            updates['active_key'] = None
+
+        # Only update the job if it still belongs to this worker
+        app.data.get_mongo_collection(self.datasource).update_one(
+            {
+                config.ID_FIELD: ObjectId(job[config.ID_FIELD]),
+                'worker': job['worker'],
+                'state': RENDITION_JOB_STATES.RUNNING
+            },
+            {'$set': updates}
+        )
@@ -36,6 +36,7 @@ This service instance can only be used after the application has bootstrapped.
 """
 
 from superdesk import get_backend
+from sams.cache import create_cache
 from .resource import SetsResource
 from .service import SetsService
 
@@ -51,6 +52,14 @@ def init_app(app):
     global _service
 
     _service = SetsService(SetsResource.endpoint_name, backend=get_backend())
+    if app.config.get('SETS_CACHE_ENABLED'):
+        _service.cache = create_cache(
+            app,
+            'sets',
+            ttl=app.config['SETS_CACHE_TTL'],
+            max_size=app.config['SETS_CACHE_MAX_SIZE']
+        )
+
     SetsResource(
         endpoint_name=SetsResource.endpoint_name,
         app=app,
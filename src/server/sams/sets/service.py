@@ -9,11 +9,12 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 from copy import deepcopy
 from bson import ObjectId
 
 from flask import current_app as app
+from eve.utils import config
 
 from sams_client.schemas import SET_STATES
 
@@ -22,12 +23,37 @@ from sams.storage.destinations import Destination, destinations
 from sams.storage.providers.base import SamsBaseStorageProvider
 from sams_client.errors import SamsSetErrors
 from sams.utils import get_external_user_id
+from sams.cache import ReadThroughCache
 
 from superdesk.services import Service
 from superdesk.utc import utcnow
 
 
 class SetsService(SamsService):
+    """Sets Service
+
+    If ``SETS_CACHE_ENABLED`` is ``True``, Sets returned from :meth:`get_by_id` are cached,
+    and removed from the cache when the Set is updated, replaced or deleted.
+
+    :var sams.cache.ReadThroughCache cache: The Set cache, or ``None`` if disabled
+    """
+
+    cache: Optional[ReadThroughCache] = None
+
+    def get_by_id(self, item_id: Union[ObjectId, str], field=config.ID_FIELD) -> Optional[Dict[str, Any]]:
+        """Returns a Set by its ID, from the cache if enabled
+
+        :param bson.objectid.ObjectId item_id: ID for the Set
+        :param field: field to use when searching for the Set (defaults to '_id')
+        :return: A copy of the Set, or ``None`` if not found
+        :rtype: dict
+        """
+
+        if self.cache is None or field != config.ID_FIELD:
+            return super().get_by_id(item_id, field)
+
+        return self.cache.get(str(item_id), lambda: super(SetsService, self).get_by_id(item_id, field))
+
     def post(self, docs: List[Dict[str, Any]], **kwargs) -> List[ObjectId]:
         """Stores the metadata
 
@@ -69,11 +95,27 @@ class SetsService(SamsService):
 
         return super(Service, self).patch(item_id, updates)
 
+    def on_updated(self, updates: Dict[str, Any], original: Dict[str, Any]):
+        self._invalidate_cache(original)
+
+    def replace(self, id: ObjectId, document: Dict[str, Any], original: Dict[str, Any]) -> Dict[str, Any]:
+        res = super().replace(id, document, original)
+        self._invalidate_cache(original)
+        return res
+
+    def on_deleted(self, doc: Dict[str, Any]):
+        self._invalidate_cache(doc)
+
+    def _invalidate_cache(self, doc: Dict[str, Any]):
+        if self.cache is not None:
+            self.cache.invalidate(str(doc[config.ID_FIELD]))
+
     def validate_post(self, doc):
         """Validates the Set on creation
 
         The following additional validation is performed on Sets being created:
             * The ``destination_name`` must exist in a ``STORAGE_DESTINATION_`` config attribute
+            * Each of the ``rendition_presets`` must have a ``width`` and/or ``height``
 
         :param doc: The provided document to validate
         :raises Superdesk.validation.ValidationError: If there are validation errors
@@ -81,6 +123,7 @@ class SetsService(SamsService):
 
         super().validate_post(doc)
         self._validate_destination_name(doc)
+        self._validate_rendition_presets(doc)
 
     def validate_patch(self, original, updates):
         r"""Validates the Set on update
@@ -90,6 +133,7 @@ class SetsService(SamsService):
             * Once a set has changed from ``draft`` state, ``destination_name`` and \
                 ``destination_config`` cannot be changed
             * The ``destination_name`` must exist in a ``STORAGE_DESTINATION_`` config attribute
+            * Each of the ``rendition_presets`` must have a ``width`` and/or ``height``
 
         :param original: The original document from the database
         :param updates: A dictionary with the desired attributes to update
@@ -114,6 +158,7 @@ class SetsService(SamsService):
                 raise SamsSetErrors.DestinationConfigChangeNotAllowed()
 
         self._validate_destination_name(merged)
+        self._validate_rendition_presets(merged)
 
     def _validate_destination_name(self, doc):
         """Validates that the desired destination is configured in the system
@@ -125,6 +170,17 @@ class SetsService(SamsService):
         if not destinations.exists(doc.get('destination_name')):
             raise SamsSetErrors.DestinationNotFound(doc.get('destination_name'))
 
+    def _validate_rendition_presets(self, doc):
+        """Validates that each rendition preset has at least a width or height
+
+        :param doc: The provided document to validate
+        :raises sams_client.errors.SamsSetErrors.RenditionPresetDimensionsNotProvided: If a dimension is missing
+        """
+
+        for preset in doc.get('rendition_presets') or []:
+            if not preset.get('width') and not preset.get('height'):
+                raise SamsSetErrors.RenditionPresetDimensionsNotProvided(preset.get('name'))
+
     def on_delete(self, doc):
         """Validate state on delete
 
@@ -154,6 +210,21 @@ class SetsService(SamsService):
         response = service.get(req=None, lookup={'set_id': set_id})
         return response.count()
 
+    def get_rendition_presets(self, set_id: ObjectId) -> List[Dict[str, Any]]:
+        """Returns the Image Rendition presets to generate for Assets uploaded to a Set
+
+        :param bson.objectid.ObjectId set_id: The ID of the Set
+        :return: The list of presets, with ``name``, ``width``, ``height`` and ``keep_proportions``
+        :rtype: list[dict]
+        """
+
+        set_item = self.get_by_id(set_id)
+
+        if not set_item:
+            raise SamsSetErrors.SetNotFound(set_id)
+
+        return set_item.get('rendition_presets') or []
+
     def get_max_asset_size(self, set_id: ObjectId) -> int:
         """Returns the maximum allowed size of an Asset for a Set
 
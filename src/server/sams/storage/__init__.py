@@ -9,15 +9,28 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from .destinations import destinations
+from .destinations import destinations, provider_instances
+from .disk_cache import disk_cache
+from .executor import storage_executor
 from .providers import providers
 from sams.default_settings import env
-from .sams_media_storage import SamsMediaStorage  # noqa
+from .sams_media_storage import SamsMediaStorage, release_upload  # noqa
 
 
 def init_app(app):
+    app.teardown_request(release_upload)
     providers.clear()
     destinations.clear()
+    provider_instances.configure(
+        max_pool_size=app.config.get('STORAGE_MAX_POOL_SIZE'),
+        health_check_interval=app.config.get('STORAGE_HEALTH_CHECK_INTERVAL')
+    )
+    storage_executor.configure(max_workers=app.config.get('STORAGE_MAX_WORKERS'))
+    disk_cache.configure(
+        directory=app.config.get('DISK_CACHE_PATH'),
+        max_size=app.config.get('DISK_CACHE_MAX_SIZE'),
+        max_file_size=app.config.get('DISK_CACHE_MAX_FILE_SIZE')
+    )
 
     for provider in app.config.get('STORAGE_PROVIDERS') or []:
         providers.register(provider)
@@ -9,10 +9,29 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from typing import Dict, List
+"""Storage Destinations and the long-lived Storage Provider instances used to access them.
+
+Each destination holds on to a single provider instance per worker process, so the
+underlying connection pools (i.e. ``boto3.client`` or ``MongoClient``) are re-used
+between requests. The instance is created on first use and re-created after a fork::
+
+    from sams.storage.destinations import destinations
+
+    provider = destinations.get('internal').provider_instance()
+
+    # Rebuild the instance if the connection is known to be broken
+    provider = destinations.get('internal').reset_provider_instance()
+"""
+
+from typing import Dict, List, NamedTuple, Set, Tuple
+from os import getpid
+from threading import RLock
+from time import monotonic
+import atexit
 
 from sams_client.errors import SamsStorageDestinationErrors
 
+from sams.logger import logger
 from .providers import Provider, providers
 from .providers.base import SamsBaseStorageProvider
 
@@ -51,7 +70,18 @@ class Destination:
         :rtype: SamsBaseStorageProvider
         """
 
-        return self.provider.instance(self.config_string)
+        return provider_instances.get(self)
+
+    def reset_provider_instance(self) -> SamsBaseStorageProvider:
+        """Replaces the cached Storage instance for this destination with a new one
+
+        The previous instance is closed once requests still using it had the time to finish
+
+        :return: The newly created Storage Provider instance
+        :rtype: SamsBaseStorageProvider
+        """
+
+        return provider_instances.reset(self)
 
     def to_dict(self):
         """Return a dictionary containing name and provider
@@ -92,6 +122,7 @@ class Destinations:
         """
 
         destination = Destination(config_string)
+        provider_instances.remove(destination.name)
         self._destinations[destination.name] = destination
 
     def get(self, name: str) -> Destination:
@@ -123,9 +154,213 @@ class Destinations:
         return self._destinations
 
     def clear(self):
-        """Clears all of the registered storage destinations"""
+        """Clears all of the registered storage destinations
 
+        This also closes any Storage Provider instances created for them
+        """
+
+        provider_instances.clear()
         self._destinations = {}
 
 
+#: Seconds before a replaced (or removed) Storage Provider instance is closed,
+#: so that requests still using it (i.e. streaming a download) can finish first
+CLOSE_DELAY = 300
+
+
+class ProviderInstanceEntry(NamedTuple):
+    """A cached Storage Provider instance
+
+    :var SamsBaseStorageProvider instance: The Storage Provider instance
+    :var int pid: The ID of the process that created the instance
+    :var float last_checked: Monotonic time of the last successful health check
+    """
+
+    instance: SamsBaseStorageProvider
+    pid: int
+    last_checked: float
+
+
+class ProviderInstances:
+    """A thread-safe registry of long-lived Storage Provider instances, one per destination
+
+    Instances are created lazily, and are re-created when:
+        * the current process is not the one that created it (i.e. a forked worker)
+        * a health check fails (if ``health_check_interval`` is configured)
+        * :meth:`reset` is called
+
+    Only one thread at a time checks the health of an instance, other threads keep using the instance meanwhile.
+    Instances that are replaced or removed are not closed straight away, as other threads may still be using them.
+    They are closed ``close_delay`` seconds later instead (or by :meth:`clear`).
+
+    Usage::
+
+        from sams.storage.destinations import provider_instances
+
+        provider_instances.configure(...)
+        provider_instances.get(...)
+        provider_instances.reset(...)
+        provider_instances.remove(...)
+        provider_instances.clear(...)
+
+    :var int max_pool_size: Maximum number of connections per provider instance (``0`` to use provider default)
+    :var int health_check_interval: Seconds between health checks (``0`` to disable)
+    :var float close_delay: Seconds before a replaced or removed instance is closed
+    """
+
+    def __init__(self):
+        self._instances: Dict[str, ProviderInstanceEntry] = dict()
+        self._retired: List[Tuple[float, ProviderInstanceEntry]] = []
+        self._checking: Set[str] = set()
+        self._lock = RLock()
+        self.max_pool_size: int = 0
+        self.health_check_interval: int = 0
+        self.close_delay: float = CLOSE_DELAY
+
+    def configure(self, max_pool_size: int = 0, health_check_interval: int = 0):
+        """Configure the pool size and health check interval for new provider instances
+
+        :param int max_pool_size: Maximum number of connections per provider instance
+        :param int health_check_interval: Seconds between health checks
+        """
+
+        self.max_pool_size = max_pool_size or 0
+        self.health_check_interval = health_check_interval or 0
+
+    def get(self, destination: Destination) -> SamsBaseStorageProvider:
+        """Retrieve the cached Storage Provider instance for a destination, creating it if need be
+
+        :param Destination destination: The destination to get the provider instance for
+        :return: The Storage Provider instance
+        :rtype: SamsBaseStorageProvider
+        """
+
+        entry = self._instances.get(destination.name)
+
+        if entry is None or entry.pid != getpid():
+            with self._lock:
+                entry = self._instances.get(destination.name)
+                if entry is None or entry.pid != getpid():
+                    # Connections created in a parent process must not be closed or used
+                    # by a forked child, so simply drop the reference to the old instance
+                    entry = self._create(destination)
+        elif self._health_check_due(entry) and self._start_health_check(destination.name):
+            try:
+                entry = self._check_health(destination, entry)
+            finally:
+                with self._lock:
+                    self._checking.discard(destination.name)
+
+        if self._retired and self._retired[0][0] <= monotonic():
+            self._close_retired()
+
+        return entry.instance
+
+    def reset(self, destination: Destination) -> SamsBaseStorageProvider:
+        """Close the cached Storage Provider instance for a destination and create a new one
+
+        :param Destination destination: The destination to reset the provider instance for
+        :return: The new Storage Provider instance
+        :rtype: SamsBaseStorageProvider
+        """
+
+        with self._lock:
+            self.remove(destination.name)
+            return self._create(destination).instance
+
+    def remove(self, name: str):
+        """Remove the cached Storage Provider instance for a destination, closing it after ``close_delay``
+
+        :param str name: The name of the destination
+        """
+
+        with self._lock:
+            entry = self._instances.pop(name, None)
+            if entry is not None:
+                self._retire(entry)
+
+    def clear(self):
+        """Close and remove all cached Storage Provider instances, including those waiting to be closed"""
+
+        with self._lock:
+            entries = list(self._instances.values()) + [entry for _close_at, entry in self._retired]
+            self._instances = {}
+            self._retired = []
+
+        for entry in entries:
+            self._close(entry)
+
+    def _create(self, destination: Destination) -> ProviderInstanceEntry:
+        entry = ProviderInstanceEntry(
+            instance=destination.provider.instance(
+                destination.config_string,
+                max_pool_size=self.max_pool_size
+            ),
+            pid=getpid(),
+            last_checked=monotonic()
+        )
+        self._instances[destination.name] = entry
+        return entry
+
+    def _health_check_due(self, entry: ProviderInstanceEntry) -> bool:
+        return self.health_check_interval > 0 and \
+            monotonic() - entry.last_checked >= self.health_check_interval
+
+    def _start_health_check(self, name: str) -> bool:
+        """Returns ``True`` if no other thread is checking the health of the destination's instance"""
+
+        with self._lock:
+            if name in self._checking:
+                return False
+
+            self._checking.add(name)
+            return True
+
+    def _check_health(self, destination: Destination, entry: ProviderInstanceEntry) -> ProviderInstanceEntry:
+        if entry.instance.is_healthy():
+            entry = entry._replace(last_checked=monotonic())
+            with self._lock:
+                # Only update the entry checked, not one that replaced it while checking
+                current = self._instances.get(destination.name)
+                if current is not None and current.instance is entry.instance:
+                    self._instances[destination.name] = entry
+            return entry
+
+        logger.warning('Storage destination "%s" failed health check, reconnecting', destination.name)
+        with self._lock:
+            if self._instances.get(destination.name) is entry:
+                self._instances.pop(destination.name)
+                self._retire(entry)
+                return self._create(destination)
+
+            # Another thread has already replaced or removed this instance
+            return self._instances.get(destination.name) or self._create(destination)
+
+    def _retire(self, entry: ProviderInstanceEntry):
+        # Must be called while holding the lock
+        self._retired.append((monotonic() + self.close_delay, entry))
+
+    def _close_retired(self):
+        now = monotonic()
+        with self._lock:
+            due = [entry for close_at, entry in self._retired if close_at <= now]
+            self._retired = [(close_at, entry) for close_at, entry in self._retired if close_at > now]
+
+        for entry in due:
+            self._close(entry)
+
+    def _close(self, entry: ProviderInstanceEntry):
+        # Never close connections that were opened in a different process
+        if entry.pid != getpid():
+            return
+
+        try:
+            entry.instance.close()
+        except Exception as e:
+            logger.exception(e)
+
+
 destinations = Destinations()
+provider_instances = ProviderInstances()
+
+atexit.register(provider_instances.clear)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""A local disk cache for binaries downloaded from Storage Providers
+
+Binaries are immutable once stored (a new binary always gets a new ``_media_id``), so cached files
+are keyed by the ``_media_id`` and content hash, and never need to be invalidated.
+
+Files are written to a temporary file and then renamed into place, so a partially written file is never
+served, and multiple processes can share the same cache directory. The modification time of each file
+is updated when it is read, and the least recently used files are removed once the cache grows larger
+than ``DISK_CACHE_MAX_SIZE``.
+
+The number of hits and misses of each process are logged every ``stats_log_interval`` requests,
+along with the hit ratio and size of the cache (see :meth:`DiskCache.get_stats`).
+
+Cached files are served from an open file handle, which allows the WSGI server to use ``sendfile``
+(through ``wsgi.file_wrapper``) when sending the entire binary::
+
+    from sams.storage.disk_cache import disk_cache
+
+    file = disk_cache.get_file(provider, rendition['_media_id'], rendition['hash'], rendition['length'])
+"""
+
+from typing import Any, BinaryIO, Dict, Optional, List, Tuple, Union
+from os import path, makedirs, replace, remove, scandir, utime, SEEK_SET
+from tempfile import mkstemp
+from threading import Lock
+import hashlib
+
+from bson import ObjectId
+
+from superdesk.storage.superdesk_file import SuperdeskFile
+
+from sams.logger import logger
+from .providers.base import SamsBaseStorageProvider
+
+#: Suffix used for files that are still being written
+TEMP_SUFFIX = '.tmp'
+
+#: Default number of cacheable requests between logging the stats of the cache
+STATS_LOG_INTERVAL = 1000
+
+
+class CachedFile(SuperdeskFile):
+    """SuperdeskFile implementation for binaries in the disk cache
+
+    Reads are delegated to the open file, and :meth:`fileno` is provided
+    so the WSGI server can send the file using ``sendfile``.
+    """
+
+    def __init__(self, file: BinaryIO, length: int):
+        super().__init__()
+
+        self._file = file
+        self._name = file.name
+        self.length = length
+        self.filename = None
+        self.content_type = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(-1 if size is None else size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+    def readinto(self, buffer) -> int:
+        return self._file.readinto(buffer)
+
+    def seek(self, pos: int, whence: int = SEEK_SET) -> int:
+        return self._file.seek(pos, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def getvalue(self) -> bytes:
+        """Returns the entire binary, preserving the current read position"""
+
+        position = self.tell()
+        try:
+            self.seek(0)
+            return self.read()
+        finally:
+            self.seek(position)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class DiskCache:
+    """A size limited cache of binaries on the local disk
+
+    Usage::
+
+        from sams.storage.disk_cache import disk_cache
+
+        disk_cache.configure(...)
+        disk_cache.get_file(...)
+        disk_cache.get_stats()
+
+    :var str directory: The directory to store cached files in (caching is disabled if empty)
+    :var int max_size: Maximum size of all cached files, in bytes
+    :var int max_file_size: Maximum size of a single binary to cache, in bytes
+    :var int hits: The number of binaries served from the cache
+    :var int misses: The number of binaries downloaded from the Storage Provider
+    :var int stats_log_interval: The number of cacheable requests between logging the stats of the cache
+    """
+
+    def __init__(self):
+        self.directory: Optional[str] = None
+        self.max_size: int = 0
+        self.max_file_size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.stats_log_interval: int = STATS_LOG_INTERVAL
+        self._size: Optional[int] = None
+        self._lock = Lock()
+
+    def configure(self, directory: Optional[str] = None, max_size: int = 0, max_file_size: int = 0):
+        """Configure the location and size of the cache
+
+        :param str directory: The directory to store cached files in (caching is disabled if empty)
+        :param int max_size: Maximum size of all cached files, in bytes
+        :param int max_file_size: Maximum size of a single binary to cache, in bytes
+        """
+
+        self.directory = directory or None
+        self.max_size = max_size or 0
+        self.max_file_size = max_file_size or 0
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory and self.max_size)
+
+    def get_path(self, media_id: Union[ObjectId, str], content_hash: str) -> str:
+        """Returns the path of the cached file for a binary
+
+        :param media_id: The ID of the binary in the Storage Provider
+        :param str content_hash: The hash of the binary
+        :return: The path of the cached file
+        :rtype: str
+        """
+
+        key = hashlib.sha1('{}:{}'.format(media_id, content_hash).encode()).hexdigest()
+        return path.join(self.directory, key[:2], key)
+
+    def get_file(
+        self,
+        provider: SamsBaseStorageProvider,
+        media_id: Union[ObjectId, str],
+        content_hash: Optional[str] = None,
+        length: Optional[int] = None
+    ) -> SuperdeskFile:
+        """Returns a binary from the cache, downloading and caching it from the Storage Provider if not cached
+
+        Binaries without a hash, or larger than ``max_file_size``, are not cached
+        and are returned directly from the Storage Provider.
+
+        :param SamsBaseStorageProvider provider: The Storage Provider the binary is stored in
+        :param media_id: The ID of the binary in the Storage Provider
+        :param str content_hash: The hash of the binary
+        :param int length: The size of the binary in bytes
+        :return: The binary stream
+        :rtype: superdesk.storage.superdesk_file.SuperdeskFile
+        """
+
+        if not self.enabled or not content_hash or length is None or \
+                (self.max_file_size and length > self.max_file_size):
+            return provider.get(media_id)
+
+        file_path = self.get_path(media_id, content_hash)
+        cached = self._open(file_path, length)
+        self._count(hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        try:
+            self._write(file_path, provider, media_id, length)
+        except OSError:
+            logger.exception('Failed to add binary "{}" to the disk cache'.format(media_id))
+            return provider.get(media_id)
+
+        return self._open(file_path, length) or provider.get(media_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the ``hits``, ``misses``, ``hit_ratio`` and ``size`` (in bytes) of the cache"""
+
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, self._size
+
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+            'size': size or 0,
+        }
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+            log_stats = (self.hits + self.misses) % self.stats_log_interval == 0
+
+        if log_stats:
+            stats = self.get_stats()
+            logger.info('Disk cache: {hits} hits, {misses} misses, {ratio:.1%} hit ratio, {size} bytes'.format(
+                hits=stats['hits'],
+                misses=stats['misses'],
+                ratio=stats['hit_ratio'],
+                size=stats['size']
+            ))
+
+    def _open(self, file_path: str, length: int) -> Optional[CachedFile]:
+        try:
+            file = open(file_path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            # Mark the file as recently used
+            utime(file_path)
+        except OSError:
+            pass
+
+        return CachedFile(file, length)
+
+    def _write(self, file_path: str, provider: SamsBaseStorageProvider, media_id: Union[ObjectId, str], length: int):
+        directory = path.dirname(file_path)
+        makedirs(directory, exist_ok=True)
+
+        fd, temp_path = mkstemp(suffix=TEMP_SUFFIX, dir=directory)
+        try:
+            with open(fd, 'wb') as temp_file:
+                provider.download(media_id, temp_file)
+                size = temp_file.tell()
+
+            # Never cache a truncated binary, as it would be served until evicted
+            if size != length:
+                raise OSError('Downloaded {} of {} bytes'.format(size, length))
+
+            # Atomically move the file into place, so other readers never see a partial file
+            replace(temp_path, file_path)
+        except BaseException:
+            try:
+                remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry[2] for entry in self._list_files())
+            else:
+                self._size += size
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _list_files(self) -> List[Tuple[str, float, int]]:
+        files = []
+        for sub_directory in scandir(self.directory):
+            if not sub_directory.is_dir():
+                continue
+
+            for entry in scandir(sub_directory.path):
+                if entry.is_file() and not entry.name.endswith(TEMP_SUFFIX):
+                    stat = entry.stat()
+                    files.append((entry.path, stat.st_mtime, stat.st_size))
+
+        return files
+
+    def _evict(self):
+        """Removes the least recently used files, until the cache is 90% of ``max_size``
+
+        Other processes may be using the same directory, so the size is re-calculated from the files on disk
+        """
+
+        files = sorted(self._list_files(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in files)
+        target = self.max_size * 0.9
+
+        for file_path, _mtime, file_size in files:
+            if size <= target:
+                break
+
+            try:
+                # Files already opened for reading can still be read after being removed
+                remove(file_path)
+            except OSError:
+                continue
+
+            size -= file_size
+
+        self._size = size
+
+
+#: The disk cache, configured using ``DISK_CACHE_PATH``, ``DISK_CACHE_MAX_SIZE`` and ``DISK_CACHE_MAX_FILE_SIZE``
+disk_cache = DiskCache()
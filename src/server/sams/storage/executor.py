@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""A thread pool shared by all storage operations that run concurrently
+
+Batch operations (i.e. :meth:`~sams.storage.providers.base.SamsBaseStorageProvider.get_many`) submit their
+requests to the same bounded pool, so the latency of each request to the storage destination overlaps,
+while the number of concurrent requests per process stays limited to ``STORAGE_MAX_WORKERS``::
+
+    from sams.storage.executor import storage_executor
+
+    sizes = storage_executor.map(get_size, media_ids)
+
+Tasks that themselves use the executor run their nested tasks in the calling thread,
+so a saturated pool can never deadlock waiting for itself.
+"""
+
+from typing import Callable, Iterable, List, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor, Future
+from os import getpid
+from threading import Lock, local
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class _ImmediateFuture(Future):
+    """A future for a task run in the calling thread"""
+
+    def __init__(self, fn: Callable[..., T], *args, **kwargs):
+        super().__init__()
+        try:
+            self.set_result(fn(*args, **kwargs))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except BaseException as error:
+            # SAMS errors derive from ``BaseException``, these are raised from ``result()``
+            # the same as tasks that are run in the thread pool
+            self.set_exception(error)
+
+
+class StorageExecutor:
+    """A bounded thread pool, created on first use and re-created after a fork
+
+    :var int max_workers: Maximum number of threads (``0`` or ``1`` runs all tasks in the calling thread)
+    """
+
+    def __init__(self):
+        self.max_workers: int = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = Lock()
+        self._local = local()
+
+    def configure(self, max_workers: int = 0):
+        """Configure the maximum number of threads, shutting down the existing pool (if any)
+
+        :param int max_workers: Maximum number of threads
+        """
+
+        self.shutdown()
+        self.max_workers = max_workers or 0
+
+    def shutdown(self):
+        """Shut down the thread pool, waiting for running tasks to complete"""
+
+        with self._lock:
+            executor = self._executor if self._pid == getpid() else None
+            self._executor = None
+            self._pid = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        if self.max_workers <= 1 or getattr(self._local, 'in_worker', False):
+            return None
+
+        if self._executor is None or self._pid != getpid():
+            with self._lock:
+                if self._executor is None or self._pid != getpid():
+                    # Threads are not copied to a forked child, so a new pool is required
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='sams-storage'
+                    )
+                    self._pid = getpid()
+
+        return self._executor
+
+    def _run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        self._local.in_worker = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.in_worker = False
+
+    def submit(self, fn: Callable[..., T], *args, **kwargs) -> Future:
+        """Run a task in the thread pool
+
+        :param fn: The function to call
+        :return: The future for the result of the task
+        :rtype: concurrent.futures.Future
+        """
+
+        executor = self._get_executor()
+        if executor is None:
+            return _ImmediateFuture(fn, *args, **kwargs)
+
+        return executor.submit(self._run, fn, *args, **kwargs)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Calls ``fn`` for each item concurrently, and returns the results in the same order
+
+        All tasks are completed before returning. If any task fails, the first error is raised.
+
+        :param fn: The function to call for each item
+        :param items: The items to call ``fn`` with
+        :return: The result for each item
+        :rtype: list
+        """
+
+        futures = [self.submit(fn, item) for item in items]
+        errors = [future.exception() for future in futures]
+
+        for error in errors:
+            if error is not None:
+                raise error
+
+        return [future.result() for future in futures]
+
+
+#: The thread pool shared by storage operations, configured using ``STORAGE_MAX_WORKERS``
+storage_executor = StorageExecutor()
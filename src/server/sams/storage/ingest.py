@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Single pass ingest of uploaded binaries
+
+:class:`BinaryIngest` wraps the stream of an uploaded binary. As the Storage Provider reads the stream
+to store it, the bytes are passed through a SHA-1 hasher and a byte counter, and the start of the binary
+is kept for mimetype detection and to read the dimensions of images. The binary is therefore only read once,
+no matter how many of these attributes are used.
+"""
+
+from typing import BinaryIO, Optional, Tuple, Union
+from io import BytesIO
+from os import SEEK_SET, SEEK_CUR
+import hashlib
+
+from PIL import Image
+
+from sams.utils import get_binary_stream_size
+
+#: Number of bytes from the start of a binary kept to detect its mimetype and image dimensions
+HEAD_SIZE = 1024 * 1024
+
+#: The size of each block read when the remainder of a binary has to be read to complete the hash
+READ_BUFFER_SIZE = 1024 * 256
+
+
+class BinaryIngest:
+    """File-like wrapper that calculates the hash, size and start of a binary, while it is being read
+
+    Bytes are only counted the first time they are read, so the stream can be seeked back and read again
+    (i.e. by the Storage Provider retrying an upload). Reads from the start of the binary are served from
+    the kept :data:`HEAD_SIZE` bytes, and seeking is lazy, so the start is not read from the stream twice.
+    If the stream is not read to the end (or parts of it are skipped), the remainder is read when the
+    :meth:`hexdigest` is requested.
+
+    :param content: The binary stream (or bytes) to ingest
+    """
+
+    def __init__(self, content: Union[BinaryIO, bytes]):
+        self._stream = BytesIO(content) if isinstance(content, bytes) else content
+        self._stream_position = 0
+        self._position = 0
+        self._size = None
+        self._image_size = None
+        self._reset()
+
+    def _reset(self):
+        self._hash = hashlib.sha1()
+        self._head = bytearray()
+        self._ingested = 0
+        self._skipped = False
+        self._complete = False
+
+    def _ingest(self, data: bytes):
+        self._hash.update(data)
+        self._ingested += len(data)
+
+        if len(self._head) < HEAD_SIZE:
+            self._head.extend(data[:HEAD_SIZE - len(self._head)])
+
+    def _read_stream(self, size: int) -> bytes:
+        start = self._position
+
+        if self._stream_position != start:
+            self._stream.seek(start)
+
+        data = self._stream.read(size)
+        self._position += len(data)
+        self._stream_position = self._position
+
+        if start > self._ingested:
+            # Bytes have been skipped, the hash has to be calculated from the start again
+            self._skipped = True
+        elif self._position > self._ingested:
+            self._ingest(data[self._ingested - start:])
+        elif not data and size != 0 and start == self._ingested:
+            self._complete = True
+
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None:
+            size = -1
+
+        if self._position >= len(self._head):
+            return self._read_stream(size)
+
+        end = len(self._head) if size < 0 else min(len(self._head), self._position + size)
+        data = bytes(self._head[self._position:end])
+        self._position = end
+
+        if size < 0:
+            return data + self._read_stream(size)
+        elif len(data) < size:
+            return data + self._read_stream(size - len(data))
+
+        return data
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_SET:
+            self._position = offset
+        elif whence == SEEK_CUR:
+            self._position += offset
+        else:
+            self._position = self._stream_position = self._stream.seek(offset, whence)
+
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return hasattr(self._stream, 'seek')
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read_head(self) -> BytesIO:
+        """Returns the start of the binary, reading it from the stream if required
+
+        The position of the stream is not changed, so it can then be read by the Storage Provider
+
+        :return: Up to :data:`HEAD_SIZE` bytes from the start of the binary
+        :rtype: io.BytesIO
+        """
+
+        if len(self._head) < HEAD_SIZE and self._skipped:
+            # The head is no longer extended once bytes were skipped, so read it from the stream directly
+            self._stream.seek(0)
+            head = self._stream.read(HEAD_SIZE)
+            self._stream_position = len(head)
+            return BytesIO(head)
+        elif len(self._head) < HEAD_SIZE and not self._complete:
+            position = self._position
+            self.seek(self._ingested)
+            while len(self._head) < HEAD_SIZE and self._read_stream(min(READ_BUFFER_SIZE, HEAD_SIZE)):
+                pass
+
+            self.seek(position)
+
+        return BytesIO(bytes(self._head))
+
+    def read_all(self):
+        """Reads the remainder of the stream, so all attributes are known
+
+        The stream is left at the end, use this if the binary does not need to be read again
+        """
+
+        if self._skipped:
+            self._reset()
+            self.seek(0)
+        elif self._position != self._ingested:
+            self.seek(self._ingested)
+
+        while self.read(READ_BUFFER_SIZE):
+            pass
+
+    def hexdigest(self) -> str:
+        """Returns the SHA-1 hex digest of the binary
+
+        :return: The hash, reading the remainder of the stream if it has not been read yet
+        :rtype: str
+        """
+
+        if not self._complete:
+            position = self._position
+            self.read_all()
+
+            if self._position != position:
+                self.seek(position)
+
+        return self._hash.hexdigest()
+
+    @property
+    def size(self) -> int:
+        """The size of the binary, in bytes
+
+        Determined without reading the stream (see :func:`sams.utils.get_binary_stream_size`)
+        """
+
+        if self._complete:
+            return self._ingested
+        elif self._size is None:
+            self._size = get_binary_stream_size(self._stream)
+            self._stream_position = 0
+
+        return self._size
+
+    @property
+    def image_size(self) -> Optional[Tuple[int, int]]:
+        """The width and height of the image, or ``None`` if the binary is not an image
+
+        Only the image header is parsed, from the start of the binary. The pixel data is not decoded.
+        If the header is not within the first :data:`HEAD_SIZE` bytes, it is parsed from the stream instead.
+        """
+
+        if self._image_size is None:
+            self._image_size = self._read_image_size(self.read_head())
+
+            if not self._image_size and len(self._head) == HEAD_SIZE and self.seekable():
+                position = self._position
+                try:
+                    self.seek(0)
+                    self._image_size = self._read_image_size(self)
+                    self.seek(position)
+                except (OSError, ValueError):
+                    # The stream has already been closed
+                    pass
+
+        return self._image_size or None
+
+    @staticmethod
+    def _read_image_size(content: BinaryIO) -> Tuple[int, ...]:
+        try:
+            return Image.open(content).size
+        except Exception:
+            return ()
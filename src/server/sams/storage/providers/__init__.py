@@ -45,16 +45,17 @@ class Provider:
         self.klass: Type[SamsBaseStorageProvider] = getattr(self.module, self.class_name)
         self.type_name: str = getattr(self.klass, 'type_name')
 
-    def instance(self, config_string: str) -> SamsBaseStorageProvider:
+    def instance(self, config_string: str, **kwargs) -> SamsBaseStorageProvider:
         """Retrieve the StorageProvider instance for this provider
 
         :param str config_string: A string from any ``STORAGE_DESTINATION`` config attribute
+        :param kwargs: Extra keyword arguments to pass to the provider, i.e. ``max_pool_size``
         :return: A Storage Provider instance created from ``self.klass``,
          passing in the provided ``config_str``
         :rtype: SamsBaseStorageProvider
         """
 
-        return self.klass(config_string)
+        return self.klass(config_string, **kwargs)
 
 
 class Providers:
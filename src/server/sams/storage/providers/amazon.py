@@ -34,34 +34,96 @@ region*                 Amazon region to use
 bucket*                 The name of the bucket to use
 endpoint_url            The Amazon endpoint url
 folder                  An optional folder to use
+multipart_threshold     Binaries of this size (in bytes) or larger use multipart transfers
+multipart_chunksize     The size (in bytes) of each part of a multipart transfer
+max_concurrency         Maximum number of threads used for each multipart transfer
+use_threads             If ``false``, multipart transfers run in the calling thread only
+download_redirect       If ``true``, downloads redirect the client to a presigned S3 URL
+redirect_expires        Seconds before a presigned download URL expires (defaults to 300)
 =====================   ======================================================================
 
 [*] Indicates required config attributes
 
+The transfer attributes default to the ``boto3`` defaults (8MB threshold and parts, using 10 threads).
+For example, to upload large videos using 64MB parts, with 20 parts uploaded concurrently::
+
+    STORAGE_DESTINATION_1 = 'AmazonS3,Videos,access=access123,secret=secret456,region=eu-west-3,bucket=videos,' \
+        'multipart_threshold=67108864,multipart_chunksize=67108864,max_concurrency=20'
+
+Each thread uses a connection from the pool of the S3 client, so ``max_concurrency`` should not be
+larger than ``STORAGE_MAX_POOL_SIZE`` (``botocore`` defaults to 10 connections).
+
+With ``download_redirect=true``, the binary download endpoints respond with a ``302`` redirect to a
+short-lived presigned ``GetObject`` URL, instead of streaming the binary through SAMS. The metadata
+and permission checks are still performed by SAMS, and the ``Content-Type`` and ``Content-Disposition``
+headers of the S3 response are overridden to match the Asset. The ``endpoint`` (if configured) must be
+reachable by the clients of SAMS, as it is used in the presigned URLs.
+
+Direct uploads (see :mod:`sams.upload_sessions`) use a presigned ``POST`` for binaries up to
+:data:`MAX_POST_SIZE`. Larger binaries use a multipart upload, where the client uploads each part of
+``multipart_chunksize`` bytes (or larger, see :data:`MAX_UPLOAD_PARTS`) to its own presigned ``UploadPart`` URL.
+
 """
 
-from typing import Optional, BinaryIO, Union
+from typing import Optional, BinaryIO, Union, Dict, Any, Iterable, List
+from os import SEEK_SET, SEEK_CUR, SEEK_END
 from os.path import splitext
+from io import BytesIO
 from urllib.parse import urlparse
 
 import unidecode
 import logging
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from bson import ObjectId
 
 from superdesk.media.media_operations import guess_media_extension
-from superdesk.storage.amazon_media_storage import AmazonObjectWrapper
+from superdesk.storage.superdesk_file import SuperdeskFile
 
-from .base import SamsBaseStorageProvider
+from .base import SamsBaseStorageProvider, StoredBinary, DirectUpload
 from sams_client.errors import SamsAssetErrors, SamsAmazonS3Errors
+from sams.utils import get_binary_stream_size, get_binary_stream_hash
 
 logger = logging.getLogger(__name__)
 
+#: Maximum number of keys listed or deleted with a single request
 MAX_KEYS = 1000
 
+#: Default for the ``multipart_threshold`` config attribute. Binaries smaller than the threshold are
+#: uploaded with a single ``PutObject`` request, larger binaries use a multipart upload
+#: (same as the default ``boto3`` threshold)
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+#: Default for the ``multipart_chunksize`` config attribute (same as the default ``boto3`` chunk size)
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+
+#: Default for the ``max_concurrency`` config attribute (same as the default ``boto3`` concurrency)
+MAX_CONCURRENCY = 10
+
+#: Default for the ``redirect_expires`` config attribute, in seconds
+REDIRECT_EXPIRES = 300
+
+#: The maximum size of a binary uploaded with a single ``POST`` request
+MAX_POST_SIZE = 5 * 1024 * 1024 * 1024
+
+#: The minimum size of each part of a multipart upload (except for the last part)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+#: The maximum size of each part of a multipart upload
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+
+#: The maximum number of parts of a direct multipart upload. S3 allows up to 10,000 parts, the lower
+#: limit keeps the presigned part URLs stored with the Upload Session small. Larger parts are used if required
+MAX_UPLOAD_PARTS = 1000
+
+#: Number of bytes from the start of an object kept in memory, so that
+#: libraries that sniff the header and seek back to the start (i.e. PIL)
+#: don't cause another request to S3
+HEAD_BUFFER_SIZE = 64 * 1024
+
 
 class AmazonS3Config:
     """Utility class to store the AmazonS3 Config
@@ -72,6 +134,12 @@ class AmazonS3Config:
     :var str bucket: The name of the bucket to use
     :var str endpoint_url: Optional Amazon endpoint url
     :var str folder: Optional folder to use
+    :var int multipart_threshold: Binaries of this size or larger use multipart transfers
+    :var int multipart_chunksize: The size of each part of a multipart transfer
+    :var int max_concurrency: Maximum number of threads used for each multipart transfer
+    :var bool use_threads: If ``False``, multipart transfers run in the calling thread only
+    :var bool download_redirect: If ``True``, downloads redirect the client to a presigned S3 URL
+    :var int redirect_expires: Seconds before a presigned download URL expires
     """
 
     access_key: str = None
@@ -80,6 +148,12 @@ class AmazonS3Config:
     bucket: str = None
     endpoint_url: Optional[str] = None
     folder: Optional[str] = None
+    multipart_threshold: int = MULTIPART_THRESHOLD
+    multipart_chunksize: int = MULTIPART_CHUNKSIZE
+    max_concurrency: int = MAX_CONCURRENCY
+    use_threads: bool = True
+    download_redirect: bool = False
+    redirect_expires: int = REDIRECT_EXPIRES
 
     def __init__(self, config_string: str):
         """Convert config string to dictionary of key/value pairs
@@ -106,6 +180,16 @@ class AmazonS3Config:
             # Optional config attributes
             self.endpoint_url = options.get('endpoint', None)
             self.folder = options.get('folder', None)
+
+            # Optional transfer attributes
+            self.multipart_threshold = int(options.get('multipart_threshold', MULTIPART_THRESHOLD))
+            self.multipart_chunksize = int(options.get('multipart_chunksize', MULTIPART_CHUNKSIZE))
+            self.max_concurrency = int(options.get('max_concurrency', MAX_CONCURRENCY))
+            self.use_threads = options.get('use_threads', 'true').lower() in ('true', 'yes', '1')
+
+            # Optional download attributes
+            self.download_redirect = options.get('download_redirect', 'false').lower() in ('true', 'yes', '1')
+            self.redirect_expires = int(options.get('redirect_expires', REDIRECT_EXPIRES))
         except KeyError as ex:
             # Required config attribute is missing
             raise SamsAmazonS3Errors.MissingAmazonConfig(ex.args[0], ex)
@@ -113,21 +197,190 @@ class AmazonS3Config:
             # Unknown config error occurred
             raise SamsAmazonS3Errors.InvalidAmazonDestinationConfig(config_string, ex)
 
+    def get_transfer_config(self) -> TransferConfig:
+        """Returns the ``boto3`` transfer config used for multipart uploads and downloads
+
+        :rtype: boto3.s3.transfer.TransferConfig
+        """
+
+        return TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_chunksize,
+            max_concurrency=self.max_concurrency,
+            use_threads=self.use_threads
+        )
+
+
+class AmazonObjectWrapper(SuperdeskFile):
+    """SuperdeskFile implementation for S3 objects
+
+    The object body is streamed from S3 as it is read, instead of being copied into memory.
+    Seeking is lazy: if the next read is not at the current position of the body stream,
+    the stream is closed and a new ``GetObject`` request is sent with a ``Range`` header
+    starting at the requested position. If the end of the bytes to read is known (see :meth:`set_read_end`),
+    the ``Range`` also ends there, so S3 does not send the rest of the object.
+    """
+
+    def __init__(self, provider: 'AmazonS3Provider', media_id: str, s3_object: Dict[str, Any]):
+        super().__init__()
+
+        self._provider = provider
+        self._media_id = media_id
+        self._body = s3_object['Body']
+        self._body_position = 0
+        self._body_end: Optional[int] = None
+        self._read_end: Optional[int] = None
+        self._position = 0
+        self._head = b''
+
+        self.content_type = s3_object['ContentType']
+        self.length = int(s3_object['ContentLength'])
+        self._name = media_id
+        self.filename = media_id
+        self.metadata = {}
+        self.upload_date = s3_object['LastModified']
+        self.md5 = s3_object['ETag'][1:-1]
+        self._id = media_id
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes from the current position
+
+        :param int size: The number of bytes to read (``-1`` or ``None`` to read until the end)
+        :return: The bytes read
+        :rtype: bytes
+        """
+
+        if size is None or size < 0:
+            size = self.length - self._position
+
+        data = b''
+
+        # Serve what we can from the bytes already read from the start of the object
+        if self._position < len(self._head):
+            data = self._head[self._position:self._position + size]
+            self._position += len(data)
+
+        remaining = size - len(data)
+        while remaining > 0 and self._position < self.length:
+            if self._body is None or self._body_position != self._position or \
+                    (self._body_end is not None and self._body_position >= self._body_end):
+                self._open_body()
+
+            chunk = self._body.read(remaining)
+            if not chunk:
+                break
+
+            if self._body_position == len(self._head) and len(self._head) < HEAD_BUFFER_SIZE:
+                self._head += chunk[:HEAD_BUFFER_SIZE - len(self._head)]
+
+            self._body_position += len(chunk)
+            self._position += len(chunk)
+            remaining -= len(chunk)
+            data += chunk
+
+        return data
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, pos: int, whence: int = SEEK_SET) -> int:
+        """Move the read position, without sending a request to S3
+
+        :param int pos: The offset to seek to
+        :param int whence: One of ``os.SEEK_SET``, ``os.SEEK_CUR`` or ``os.SEEK_END``
+        :return: The new read position
+        :rtype: int
+        """
+
+        if whence == SEEK_CUR:
+            pos += self._position
+        elif whence == SEEK_END:
+            pos += self.length
+
+        if pos < 0:
+            raise ValueError('Negative seek position {}'.format(pos))
+
+        self._position = pos
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def set_read_end(self, stop: Optional[int]):
+        """Sets the position reads are expected to stop at, i.e. the end of a requested byte range
+
+        Bodies opened afterwards only request the bytes up to ``stop`` from S3. Reading past ``stop``
+        is still possible, and sends a new request for the rest of the object.
+
+        :param int stop: The byte to stop reading at (exclusive), or ``None`` to read until the end
+        """
+
+        self._read_end = stop
+
+        if stop is not None and self._body is not None and (self._body_end is None or self._body_end > stop):
+            # Don't keep streaming bytes that will not be read
+            self._close_body()
+
+    def getvalue(self) -> bytes:
+        """Returns the entire binary, preserving the current read position"""
+
+        position = self.tell()
+        try:
+            self.seek(0)
+            return self.read()
+        finally:
+            self.seek(position)
+
+    def close(self):
+        self._close_body()
+        super().close()
+
+    def _open_body(self):
+        self._close_body()
+
+        end = self._read_end if self._read_end is not None and self._read_end > self._position else None
+        self._body = self._provider.get_object(
+            self._media_id,
+            start=self._position,
+            end=end - 1 if end is not None else None
+        )['Body']
+        self._body_position = self._position
+        self._body_end = end
+
+    def _close_body(self):
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+            self._body_end = None
+
 
 class AmazonS3Provider(SamsBaseStorageProvider):
     """Provides storage to/from Amazon S3
 
     :var AmazonS3Config _config: The S3 config
     :var boto3.client _client: The Amazon client instance
+    :var boto3.s3.transfer.TransferConfig _transfer_config: The config used for multipart transfers
     :var str type_name: The type name used to identify this provider - ``AmazonS3``
     """
 
     type_name = 'AmazonS3'
 
-    def __init__(self, config_str: str):
-        super(AmazonS3Provider, self).__init__(config_str)
+    def __init__(self, config_str: str, max_pool_size: int = None):
+        super(AmazonS3Provider, self).__init__(config_str, max_pool_size)
 
         self._config = AmazonS3Config(self.config_string)
+        self._transfer_config = self._config.get_transfer_config()
         self._client = self._connect_client()
 
     def _connect_client(self):
@@ -137,18 +390,43 @@ class AmazonS3Provider(SamsBaseStorageProvider):
         :rtype: boto3.client
         """
 
+        client_config = dict(signature_version='s3v4')
+        if self.max_pool_size:
+            client_config['max_pool_connections'] = self.max_pool_size
+
         try:
             return boto3.client(
                 's3',
                 aws_access_key_id=self._config.access_key,
                 aws_secret_access_key=self._config.secret,
                 region_name=self._config.region,
-                config=Config(signature_version='s3v4'),
+                config=Config(**client_config),
                 endpoint_url=self._config.endpoint_url,
             )
         except Exception as ex:
             self._raise_amazon_exception(ex)
 
+    def is_healthy(self) -> bool:
+        """Checks that the configured bucket can be reached
+
+        :return: ``True`` if the bucket responded, ``False`` otherwise
+        :rtype: bool
+        """
+
+        try:
+            self._client.head_bucket(Bucket=self._config.bucket)
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        """Closes the connection pool of the S3 client"""
+
+        # ``close`` is only available in newer versions of botocore
+        close = getattr(self._client, 'close', None)
+        if callable(close):
+            close()
+
     def _get_key(self, media_id: str):
         """Prefix the media id with the folder, if used
 
@@ -266,47 +544,361 @@ class AmazonS3Provider(SamsBaseStorageProvider):
             except SamsAssetErrors.AssetNotFound:
                 return False
 
-    def put(self, content: Union[BinaryIO, bytes], filename: str, mimetype: str = None) -> str:
+    def put(self, content: Union[BinaryIO, bytes], filename: str, mimetype: str = None) -> StoredBinary:
         """Upload a file to S3
 
+        Binaries smaller than the ``multipart_threshold`` are uploaded using ``PutObject``,
+        which provides the ``ETag`` of the object. Larger binaries are uploaded in parts concurrently,
+        as configured by the transfer config attributes. Multipart uploads don't provide an ``ETag``.
+
         :param bytes content: The data to be uploaded
         :param str filename: The filename
-        :param str mimetype: The mimetype of the content (not used here)
-        :return: The ``"key"`` of the S3 object (excluding folder prefix)
-        :rtype: str
+        :param str mimetype: The mimetype of the content (used to generate the key)
+        :return: The metadata of the S3 object, with the ``"key"`` (excluding folder prefix) as the ``media_id``
+        :rtype: StoredBinary
         """
 
+        if isinstance(content, bytes):
+            content = BytesIO(content)
+
+        length = get_binary_stream_size(content)
+        etag = None
+
         try:
             _id = self._generate_key(filename, mimetype)
-            self._client.upload_fileobj(
-                content,
-                self._config.bucket,
-                self._get_key(_id)
+            key = self._get_key(_id)
+
+            if length < self._config.multipart_threshold:
+                response = self._client.put_object(
+                    Bucket=self._config.bucket,
+                    Key=key,
+                    Body=content
+                )
+                etag = response['ETag'].strip('"')
+            else:
+                self._client.upload_fileobj(
+                    content,
+                    self._config.bucket,
+                    key,
+                    Config=self._transfer_config
+                )
+
+            # Hashed after the upload, so streams that hash themselves as they are read are only read once
+            return StoredBinary(
+                media_id=_id,
+                length=length,
+                hash=get_binary_stream_hash(content),
+                key=key,
+                etag=etag
             )
-            return _id
         except Exception as ex:
             self._raise_amazon_exception(ex)
 
+    def get_length(self, media_id: str) -> int:
+        """Returns the size of a file in S3, using a ``HeadObject`` request
+
+        :param str media_id: The media_id of the Asset
+        :return: The size of the object, in bytes
+        :rtype: int
+        """
+
+        try:
+            response = self._client.head_object(
+                Bucket=self._config.bucket,
+                Key=self._get_key(media_id)
+            )
+        except Exception as ex:
+            self._raise_amazon_exception(ex, media_id=media_id)
+            raise
+
+        return int(response['ContentLength'])
+
+    def read_head(self, media_id: str, size: int) -> bytes:
+        """Reads the start of a file from S3, using a ranged ``GetObject`` request
+
+        :param str media_id: The media_id of the Asset
+        :param int size: The number of bytes to read
+        :return: Up to ``size`` bytes from the start of the object
+        :rtype: bytes
+        """
+
+        if size <= 0:
+            return b''
+
+        body = self.get_object(media_id, start=0, end=size - 1)['Body']
+        try:
+            return body.read()
+        finally:
+            body.close()
+
+    def create_upload(
+        self,
+        filename: str,
+        mimetype: Optional[str],
+        length: int,
+        expires: int
+    ) -> Optional[DirectUpload]:
+        """Prepare a direct upload, where the client uploads the binary using a presigned ``POST``
+
+        S3 rejects the upload if the size of the binary is not ``length``, or the ``Content-Type`` is not ``mimetype``.
+        Binaries larger than :data:`MAX_POST_SIZE` use a multipart upload instead
+        (see :meth:`_create_multipart_upload`).
+
+        :param str filename: The filename (used to generate the key)
+        :param str mimetype: The declared mimetype of the binary
+        :param int length: The declared size of the binary, in bytes
+        :param int expires: Seconds before the presigned ``POST`` (or part URLs) expire
+        :return: The presigned ``POST`` URL and form fields, or the presigned part URLs,
+            or ``None`` if too large for a multipart upload
+        :rtype: DirectUpload
+        """
+
+        _id = self._generate_key(filename, mimetype)
+
+        if length > MAX_POST_SIZE:
+            return self._create_multipart_upload(_id, mimetype, length, expires)
+
+        fields = {}
+        conditions = [['content-length-range', length, length]]
+
+        if mimetype:
+            fields['Content-Type'] = mimetype
+            conditions.append({'Content-Type': mimetype})
+
+        try:
+            post = self._client.generate_presigned_post(
+                Bucket=self._config.bucket,
+                Key=self._get_key(_id),
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=expires
+            )
+        except Exception as ex:
+            self._raise_amazon_exception(ex)
+
+        return DirectUpload(
+            media_id=_id,
+            method='POST',
+            url=post['url'],
+            fields=post['fields']
+        )
+
+    def _create_multipart_upload(
+        self,
+        media_id: str,
+        mimetype: Optional[str],
+        length: int,
+        expires: int
+    ) -> Optional[DirectUpload]:
+        """Starts a multipart upload, and presigns an ``UploadPart`` URL for each part
+
+        Parts are ``multipart_chunksize`` bytes, or larger if required to upload the binary
+        in :data:`MAX_UPLOAD_PARTS` parts. The client sends each part as the body of a ``PUT`` request
+        to its URL, and the parts are combined into the object by :meth:`complete_upload`
+        """
+
+        part_size = max(self._config.multipart_chunksize, MIN_PART_SIZE, -(-length // MAX_UPLOAD_PARTS))
+        if part_size > MAX_PART_SIZE:
+            return None
+
+        key = self._get_key(media_id)
+        kwargs = dict(
+            Bucket=self._config.bucket,
+            Key=key
+        )
+        if mimetype:
+            kwargs['ContentType'] = mimetype
+
+        try:
+            upload_id = self._client.create_multipart_upload(**kwargs)['UploadId']
+            parts = [
+                self._client.generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': self._config.bucket,
+                        'Key': key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number,
+                    },
+                    ExpiresIn=expires
+                )
+                for part_number in range(1, -(-length // part_size) + 1)
+            ]
+        except Exception as ex:
+            self._raise_amazon_exception(ex)
+
+        return DirectUpload(
+            media_id=media_id,
+            method='PUT',
+            url=None,
+            fields={},
+            chunk_size=part_size,
+            parts=parts
+        )
+
+    def complete_upload(self, media_id: str, filename: str, length: int, chunk_size: Optional[int]):
+        """Completes a multipart upload, once the client has uploaded all of its parts
+
+        Binaries uploaded with a presigned ``POST`` are already complete, as are multipart
+        uploads that were completed before (i.e. if finalizing the Upload Session is retried)
+
+        :param str media_id: The media_id of the binary, from :meth:`create_upload`
+        :param str filename: The filename (not used here)
+        :param int length: The declared size of the binary, in bytes
+        :param int chunk_size: The size of each part, if uploaded using a multipart upload
+        :raises sams_client.errors.SamsAssetErrors.BinaryNotSupplied: If any of the parts have not been uploaded
+        """
+
+        if not chunk_size:
+            return
+
+        key = self._get_key(media_id)
+
+        try:
+            upload_ids = self._get_multipart_upload_ids(key)
+            if not upload_ids:
+                return
+
+            parts = []
+            for page in self._client.get_paginator('list_parts').paginate(
+                Bucket=self._config.bucket,
+                Key=key,
+                UploadId=upload_ids[0]
+            ):
+                parts.extend(
+                    {'PartNumber': part['PartNumber'], 'ETag': part['ETag']}
+                    for part in page.get('Parts') or []
+                )
+
+            if len(parts) != -(-length // chunk_size):
+                raise SamsAssetErrors.BinaryNotSupplied()
+
+            self._client.complete_multipart_upload(
+                Bucket=self._config.bucket,
+                Key=key,
+                UploadId=upload_ids[0],
+                MultipartUpload={'Parts': sorted(parts, key=lambda part: part['PartNumber'])}
+            )
+        except Exception as ex:
+            self._raise_amazon_exception(ex, media_id=media_id)
+
+    def abort_upload(self, media_id: str):
+        """Aborts a multipart upload that was not completed, so S3 deletes its parts
+
+        :param str media_id: The media_id of the binary, from :meth:`create_upload`
+        """
+
+        key = self._get_key(media_id)
+
+        try:
+            for upload_id in self._get_multipart_upload_ids(key):
+                self._client.abort_multipart_upload(
+                    Bucket=self._config.bucket,
+                    Key=key,
+                    UploadId=upload_id
+                )
+        except Exception as ex:
+            self._raise_amazon_exception(ex)
+
+    def _get_multipart_upload_ids(self, key: str) -> List[str]:
+        """Returns the IDs of the multipart uploads in progress for the key"""
+
+        response = self._client.list_multipart_uploads(
+            Bucket=self._config.bucket,
+            Prefix=key
+        )
+
+        return [upload['UploadId'] for upload in response.get('Uploads') or [] if upload['Key'] == key]
+
     def get(self, media_id: str) -> AmazonObjectWrapper:
         """Get Asset binary from S3
 
         :param str media_id: The media_id of the Asset
-        :return: A file-like object providing a :meth:`read` method
+        :return: A file-like object providing a :meth:`read` method, that streams the object from S3
         :rtype: AmazonObjectWrapper
         """
 
+        return AmazonObjectWrapper(self, media_id, self.get_object(media_id))
+
+    def download(self, media_id: str, file: BinaryIO):
+        """Write an Asset binary from S3 into a file
+
+        Objects of ``multipart_threshold`` size or larger are downloaded using concurrent ranged requests,
+        as configured by the transfer config attributes
+
+        :param str media_id: The media_id of the Asset
+        :param file: A writable file-like object to copy the object into
+        """
+
         try:
-            obj = self._client.get_object(
-                Bucket=self._config.bucket,
-                Key=self._get_key(media_id)
+            self._client.download_fileobj(
+                self._config.bucket,
+                self._get_key(media_id),
+                file,
+                Config=self._transfer_config
             )
+        except Exception as ex:
+            self._raise_amazon_exception(ex, media_id=media_id)
+
+            # Not every ``ClientError`` is converted to a SAMS error, the download must still fail
+            raise
+
+    def get_download_url(
+        self,
+        media_id: str,
+        mimetype: str,
+        content_disposition: str
+    ) -> Optional[str]:
+        """Returns a presigned ``GetObject`` URL, if ``download_redirect`` is enabled for this destination
+
+        The URL expires after ``redirect_expires`` seconds. Generating the URL does not send a request to S3
+
+        :param str media_id: The media_id of the Asset
+        :param str mimetype: The ``Content-Type`` S3 responds with
+        :param str content_disposition: The ``Content-Disposition`` S3 responds with
+        :return: The presigned URL, or ``None`` if ``download_redirect`` is disabled
+        :rtype: str
+        """
+
+        if not self._config.download_redirect:
+            return None
+
+        try:
+            return self._client.generate_presigned_url(
+                'get_object',
+                Params={
+                    'Bucket': self._config.bucket,
+                    'Key': self._get_key(media_id),
+                    'ResponseContentType': mimetype,
+                    'ResponseContentDisposition': content_disposition,
+                },
+                ExpiresIn=self._config.redirect_expires
+            )
+        except Exception as ex:
+            self._raise_amazon_exception(ex, media_id=media_id)
+
+    def get_object(self, media_id: str, start: int = None, end: int = None) -> Dict[str, Any]:
+        """Sends a ``GetObject`` request to S3, optionally for a byte range
+
+        :param str media_id: The media_id of the Asset
+        :param int start: Optional first byte of the range
+        :param int end: Optional last byte of the range (inclusive)
+        :return: The ``GetObject`` response, with the ``Body`` not yet read
+        :rtype: dict
+        """
+
+        kwargs = dict(
+            Bucket=self._config.bucket,
+            Key=self._get_key(media_id)
+        )
+        if start is not None or end is not None:
+            kwargs['Range'] = 'bytes={}-{}'.format(start or 0, '' if end is None else end)
+
+        try:
+            obj = self._client.get_object(**kwargs)
 
             if obj:
-                return AmazonObjectWrapper(
-                    obj,
-                    media_id,
-                    {}
-                )
+                return obj
         except Exception as ex:
             self._raise_amazon_exception(ex, media_id=media_id)
 
@@ -326,6 +918,56 @@ class AmazonS3Provider(SamsBaseStorageProvider):
         except Exception as ex:
             self._raise_amazon_exception(ex)
 
+    def delete_many(self, media_ids: Iterable[str]):
+        """Delete multiple files from S3
+
+        Files are deleted using ``DeleteObjects``, with up to :data:`MAX_KEYS` files per request.
+        All batches are attempted before an error is raised. If a request failed, the error of the
+        first failed request is raised, otherwise an error is raised for any files that failed to delete
+
+        :param media_ids: The media_ids of the Assets
+        """
+
+        keys = [self._get_key(media_id) for media_id in media_ids]
+        errors: List[Dict[str, Any]] = []
+        exceptions: List[Exception] = []
+
+        for start in range(0, len(keys), MAX_KEYS):
+            batch = keys[start:start + MAX_KEYS]
+            try:
+                response = self._client.delete_objects(
+                    Bucket=self._config.bucket,
+                    Delete={
+                        'Objects': [{'Key': key} for key in batch],
+                        'Quiet': True
+                    }
+                )
+            except Exception as ex:
+                logger.error('Failed to delete {} objects from S3: {}'.format(len(batch), ex))
+                exceptions.append(ex)
+                continue
+
+            errors.extend(response.get('Errors') or [])
+
+        for error in errors:
+            logger.error('Failed to delete "{}" from S3: {} {}'.format(
+                error.get('Key'),
+                error.get('Code'),
+                error.get('Message')
+            ))
+
+        if exceptions:
+            # ``_raise_amazon_exception`` re-raises the active exception if it is not converted to a SAMS error
+            try:
+                raise exceptions[0]
+            except Exception as ex:
+                self._raise_amazon_exception(ex)
+                raise
+        elif errors:
+            raise SamsAmazonS3Errors.UnknownAmazonException(Exception(
+                'Failed to delete {} of {} objects'.format(len(errors), len(keys))
+            ))
+
     def drop(self):
         """Deletes all assets from the S3 bucket/folder"""
 
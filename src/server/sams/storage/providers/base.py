@@ -15,13 +15,51 @@ The :mod:`sams.storage.providers.base` package provides storage io implementatio
 
 """
 
-from typing import Union, BinaryIO
+from typing import Union, BinaryIO, NamedTuple, Optional, List, Iterable, Dict
+import shutil
 
 from bson import ObjectId
 
 from superdesk.storage.superdesk_file import SuperdeskFile
 
 from sams_client.errors import SamsConfigErrors
+from sams.storage.executor import storage_executor
+
+
+class StoredBinary(NamedTuple):
+    """Metadata about a binary, as returned from :meth:`SamsBaseStorageProvider.put`
+
+    :var str media_id: The ID used to reference the binary in the storage destination
+    :var int length: The size of the binary in bytes
+    :var str hash: The SHA-1 hex digest of the binary
+    :var str key: The key (or ID) of the binary inside the storage destination
+    :var str etag: The checksum provided by the storage destination (if any)
+    """
+
+    media_id: str
+    length: int
+    hash: str
+    key: str
+    etag: Optional[str] = None
+
+
+class DirectUpload(NamedTuple):
+    """Where and how a client uploads a binary directly, as returned from :meth:`SamsBaseStorageProvider.create_upload`
+
+    :var str media_id: The ID the binary will be stored under in the storage destination
+    :var str method: The HTTP method used to upload the binary (or each chunk)
+    :var str url: The URL to upload to, or ``None`` if chunks are uploaded through SAMS
+    :var dict fields: Form fields the client must send with the binary
+    :var int chunk_size: The size of each chunk (or part), if the binary is uploaded in chunks
+    :var list parts: The URLs to upload each part to, if the parts are uploaded directly to the storage destination
+    """
+
+    media_id: str
+    method: str
+    url: Optional[str]
+    fields: Dict[str, str]
+    chunk_size: Optional[int] = None
+    parts: Optional[List[str]] = None
 
 
 class SamsBaseStorageProvider(object):
@@ -31,15 +69,18 @@ class SamsBaseStorageProvider(object):
     type_name: str = None
     name: str = None
     config_string: str = None
+    max_pool_size: int = None
 
-    def __init__(self, config_string: str):
+    def __init__(self, config_string: str, max_pool_size: int = None):
         """Creates a new instance of :class:`SamsBaseStorageProvider`.
 
         This is the base class that storage implementations must inherit from.
 
         :param str config_string: A string from any ``STORAGE_DESTINATION`` config attribute
+        :param int max_pool_size: Optional maximum number of connections to keep open
         """
 
+        self.max_pool_size = max_pool_size or None
         self.process_config_string(config_string)
 
     def process_config_string(self, config_string: str):
@@ -75,18 +116,20 @@ class SamsBaseStorageProvider(object):
 
         raise NotImplementedError()
 
-    def put(self, content: Union[BinaryIO, str], filename: str, mimetype: str = None) -> str:
+    def put(self, content: Union[BinaryIO, bytes], filename: str, mimetype: str = None) -> StoredBinary:
         """Upload a file to the storage destination
 
         `content` must be an instance of :class:`bytes` or a file-like object
         providing a :meth:`read` method.
 
-        This method *must* be defined in the derived class
+        This method *must* be defined in the derived class, and must return the
+        metadata of the stored binary without reading it back from the storage destination
 
         :param bytes content: The data to be uploaded
         :param str filename: The filename
         :param str mimetype: The mimetype of the content
-        :return: The ``"id"`` of the created file
+        :return: The metadata of the created file
+        :rtype: StoredBinary
         :raises NotImplementedError: If not defined in derived class
         """
 
@@ -97,6 +140,9 @@ class SamsBaseStorageProvider(object):
 
         This method *must* be defined in the derived class
 
+        The returned file must support seeking without reading the entire binary,
+        so that byte range requests only read the requested bytes from the storage
+
         :param media_id: The ID of the asset
         :return:
         :raises NotImplementedError: If not defined in derived class
@@ -104,6 +150,41 @@ class SamsBaseStorageProvider(object):
 
         raise NotImplementedError()
 
+    def get_length(self, media_id: Union[ObjectId, str]) -> int:
+        """Returns the size of an asset in the storage, without reading its binary
+
+        The default implementation uses the ``length`` of the file returned from :meth:`get`
+
+        :param media_id: The ID of the asset
+        :return: The size of the binary, in bytes
+        :rtype: int
+        :raises sams_client.errors.SamsAssetErrors.AssetNotFound: If the asset does not exist
+        """
+
+        binary = self.get(media_id)
+        try:
+            return binary.length
+        finally:
+            binary.close()
+
+    def read_head(self, media_id: Union[ObjectId, str], size: int) -> bytes:
+        """Reads the start of an asset from the storage, without reading the rest of its binary
+
+        The default implementation reads from the file returned from :meth:`get`
+
+        :param media_id: The ID of the asset
+        :param int size: The number of bytes to read
+        :return: Up to ``size`` bytes from the start of the binary
+        :rtype: bytes
+        :raises sams_client.errors.SamsAssetErrors.AssetNotFound: If the asset does not exist
+        """
+
+        binary = self.get(media_id)
+        try:
+            return binary.read(size)
+        finally:
+            binary.close()
+
     def delete(self, media_id: Union[ObjectId, str]):
         """Delete as asset from the storage
 
@@ -115,6 +196,137 @@ class SamsBaseStorageProvider(object):
 
         raise NotImplementedError()
 
+    def download(self, media_id: Union[ObjectId, str], file: BinaryIO):
+        """Write an asset from the storage into a file
+
+        The default implementation copies the stream returned from :meth:`get`.
+        Providers that support concurrent ranged downloads (i.e. Amazon S3) override this
+
+        :param media_id: The ID of the asset
+        :param file: A writable file-like object to copy the asset into
+        """
+
+        binary = self.get(media_id)
+        try:
+            shutil.copyfileobj(binary, file)
+        finally:
+            binary.close()
+
+    def get_download_url(
+        self,
+        media_id: Union[ObjectId, str],
+        mimetype: str,
+        content_disposition: str
+    ) -> Optional[str]:
+        """Returns a URL the client can download the asset from directly, bypassing SAMS
+
+        The default implementation returns ``None``, so the binary is streamed through SAMS
+
+        :param media_id: The ID of the asset
+        :param str mimetype: The mimetype of the asset
+        :param str content_disposition: The ``Content-Disposition`` header to respond with
+        :return: The URL, or ``None`` if not supported or enabled for this storage destination
+        :rtype: str
+        """
+
+        return None
+
+    def create_upload(
+        self,
+        filename: str,
+        mimetype: Optional[str],
+        length: int,
+        expires: int
+    ) -> Optional[DirectUpload]:
+        """Prepare a direct upload of a binary to the storage destination
+
+        The default implementation returns ``None``, as direct uploads are not supported
+
+        :param str filename: The filename
+        :param str mimetype: The declared mimetype of the binary
+        :param int length: The declared size of the binary, in bytes
+        :param int expires: Seconds before the upload target expires
+        :return: The upload target, or ``None`` if direct uploads are not supported
+        :rtype: DirectUpload
+        """
+
+        return None
+
+    def upload_chunk(self, media_id: Union[ObjectId, str], index: int, content: bytes):
+        """Store a chunk of a binary being uploaded in chunks
+
+        Only required if :meth:`create_upload` returns a ``chunk_size``.
+        Uploading the same chunk again replaces it
+
+        :param media_id: The ID of the binary, from :meth:`create_upload`
+        :param int index: The zero based index of the chunk
+        :param bytes content: The content of the chunk
+        :raises NotImplementedError: If not defined in derived class
+        """
+
+        raise NotImplementedError()
+
+    def complete_upload(self, media_id: Union[ObjectId, str], filename: str, length: int, chunk_size: Optional[int]):
+        """Complete a direct upload, once the client has uploaded the binary
+
+        The default implementation does nothing
+
+        :param media_id: The ID of the binary, from :meth:`create_upload`
+        :param str filename: The filename
+        :param int length: The declared size of the binary, in bytes
+        :param int chunk_size: The size of each chunk (if uploaded in chunks)
+        :raises sams_client.errors.SamsAssetErrors.BinaryNotSupplied: If the binary has not been uploaded
+        """
+
+        pass
+
+    def abort_upload(self, media_id: Union[ObjectId, str]):
+        """Discard a direct upload that was not completed
+
+        Only required if :meth:`create_upload` returns ``parts`` that are kept by the
+        storage destination until the upload is completed. The default implementation does nothing
+
+        :param media_id: The ID of the binary, from :meth:`create_upload`
+        """
+
+        pass
+
+    def get_many(self, media_ids: Iterable[Union[ObjectId, str]]) -> List[SuperdeskFile]:
+        """Get multiple assets from the storage
+
+        The default implementation calls :meth:`get` for each file concurrently,
+        using the shared :data:`~sams.storage.executor.storage_executor`.
+        If any of the files cannot be retrieved, the others are closed and the error is raised
+
+        :param media_ids: The IDs of the assets
+        :return: A file-like object for each of the ``media_ids``, in the same order
+        :rtype: list[SuperdeskFile]
+        """
+
+        futures = [storage_executor.submit(self.get, media_id) for media_id in media_ids]
+        errors = [future.exception() for future in futures]
+        error = next((error for error in errors if error is not None), None)
+
+        if error is not None:
+            for future, future_error in zip(futures, errors):
+                if future_error is None and future.result() is not None:
+                    future.result().close()
+            raise error
+
+        return [future.result() for future in futures]
+
+    def delete_many(self, media_ids: Iterable[Union[ObjectId, str]]):
+        """Delete multiple assets from the storage
+
+        The default implementation calls :meth:`delete` for each file concurrently,
+        using the shared :data:`~sams.storage.executor.storage_executor`.
+        All files are attempted before the first error (if any) is raised
+
+        :param media_ids: The IDs of the assets
+        """
+
+        storage_executor.map(self.delete, media_ids)
+
     def drop(self):
         """Deletes all assets from the storage
 
@@ -124,3 +336,23 @@ class SamsBaseStorageProvider(object):
         """
 
         raise NotImplementedError()
+
+    def is_healthy(self) -> bool:
+        """Checks if the connection to the storage destination is usable
+
+        Derived classes should override this to perform a cheap round trip to the
+        storage destination. The default implementation always returns ``True``
+
+        :return: ``True`` if the storage destination is reachable, ``False`` otherwise
+        :rtype: bool
+        """
+
+        return True
+
+    def close(self):
+        """Releases any connections held by this provider instance
+
+        Derived classes should override this if they hold on to network connections
+        """
+
+        pass
@@ -24,35 +24,45 @@ This will then allow destinations to be configured for Sets to use. For example:
     STORAGE_DESTINATION_1 = 'MongoGridFS,Default,mongodb://localhost/sams'
 """
 
-from typing import BinaryIO, Union
+from typing import BinaryIO, Union, Iterable, Optional
+from threading import Lock
+from os import SEEK_SET
+from io import BytesIO
 
 from pymongo import MongoClient
+from pymongo.errors import PyMongoError
 from gridfs import GridFS
 from gridfs.errors import NoFile
-from gridfs.grid_file import GridOut, EMPTY
-from bson import ObjectId
+from gridfs.grid_file import GridOut
+from bson import ObjectId, Binary
 
 from superdesk.storage.superdesk_file import SuperdeskFile
+from superdesk.utc import utcnow
 
-from .base import SamsBaseStorageProvider
+from .base import SamsBaseStorageProvider, StoredBinary, DirectUpload
 from sams_client.errors import SamsAssetErrors
+from sams.utils import get_binary_stream_hash
+
+#: The size of each chunk of a direct upload, stored as a single GridFS chunk
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
 
 
 class GridfsFileWrapper(SuperdeskFile):
-    """SuperdeskFile implementation for GridFS files"""
+    """SuperdeskFile implementation for GridFS files
+
+    The binary is not copied into memory. Instead, reads are delegated to the underlying
+    :class:`gridfs.grid_file.GridOut`, which only fetches the chunks from ``fs.chunks``
+    that are needed to satisfy each read. Seeking moves straight to the chunk containing
+    the requested offset.
+    """
 
     def __init__(self, gridfs_file: GridOut):
         super().__init__()
 
-        blocksize = 65636
-        buf = gridfs_file.read(blocksize)
-        while buf != EMPTY:
-            self.write(buf)
-            buf = gridfs_file.read(blocksize)
-
-        self.seek(0)
+        self._gridfs_file = gridfs_file
         self.content_type = gridfs_file.content_type
         self.length = gridfs_file.length
+        self.chunk_size = gridfs_file.chunk_size
         self._name = gridfs_file.name
         self.filename = gridfs_file.filename
         self.metadata = gridfs_file.metadata
@@ -60,6 +70,61 @@ class GridfsFileWrapper(SuperdeskFile):
         self.md5 = gridfs_file.md5
         self._id = gridfs_file._id
 
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes, fetching only the chunks required
+
+        :param int size: The number of bytes to read (``-1`` or ``None`` to read until the end)
+        :return: The bytes read
+        :rtype: bytes
+        """
+
+        if size is None or size < 0:
+            size = -1
+        return self._gridfs_file.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, pos: int, whence: int = SEEK_SET) -> int:
+        """Move the read position, without fetching any chunks
+
+        :param int pos: The offset to seek to
+        :param int whence: One of ``os.SEEK_SET``, ``os.SEEK_CUR`` or ``os.SEEK_END``
+        :return: The new read position
+        :rtype: int
+        """
+
+        self._gridfs_file.seek(pos, whence)
+        return self.tell()
+
+    def tell(self) -> int:
+        return self._gridfs_file.tell()
+
+    def getvalue(self) -> bytes:
+        """Returns the entire binary, preserving the current read position"""
+
+        position = self.tell()
+        try:
+            self.seek(0)
+            return self.read()
+        finally:
+            self.seek(position)
+
+    def close(self):
+        self._gridfs_file.close()
+        super().close()
+
 
 class MongoGridFSProvider(SamsBaseStorageProvider):
     """Provides storage to/from MongoDB GridFS
@@ -71,25 +136,58 @@ class MongoGridFSProvider(SamsBaseStorageProvider):
 
     type_name = 'MongoGridFS'
 
-    def __init__(self, config_string: str):
-        super(MongoGridFSProvider, self).__init__(config_string)
+    def __init__(self, config_string: str, max_pool_size: int = None):
+        super(MongoGridFSProvider, self).__init__(config_string, max_pool_size)
 
         self._client: MongoClient = None
         self._fs: GridFS = None
+        self._connect_lock = Lock()
 
     def fs(self) -> GridFS:
         """Returns the underlying GridFS client handle
 
+        The connection is created on first use, and shared between threads afterwards
+
         :return: A GridFS client to the configured database/collection
         :rtype: gridfs.GridFS
         """
 
         if self._fs is None:
-            self._client = MongoClient(self.config_string)
-            self._fs = GridFS(self._client.get_database())
+            with self._connect_lock:
+                if self._fs is None:
+                    kwargs = {}
+                    if self.max_pool_size:
+                        kwargs['maxPoolSize'] = self.max_pool_size
+
+                    self._client = MongoClient(self.config_string, **kwargs)
+                    self._fs = GridFS(self._client.get_database())
 
         return self._fs
 
+    def is_healthy(self) -> bool:
+        """Pings the MongoDB server used by this provider
+
+        :return: ``True`` if the server responded, ``False`` otherwise
+        :rtype: bool
+        """
+
+        try:
+            self.fs()
+            self._client.admin.command('ping')
+            return True
+        except PyMongoError:
+            return False
+
+    def close(self):
+        """Closes the connection pool of the underlying MongoClient"""
+
+        with self._connect_lock:
+            if self._client is not None:
+                self._client.close()
+
+            self._client = None
+            self._fs = None
+
     def exists(self, media_id: Union[ObjectId, str]) -> bool:
         """Checks if a file exists in the storage destination
 
@@ -103,7 +201,7 @@ class MongoGridFSProvider(SamsBaseStorageProvider):
 
         return self.fs().exists(media_id)
 
-    def put(self, content: Union[BinaryIO, bytes], filename: str, mimetype: str = None) -> str:
+    def put(self, content: Union[BinaryIO, bytes], filename: str, mimetype: str = None) -> StoredBinary:
         """Upload a file to the storage destination
 
         `content` must be an instance of :class:`bytes` or a file-like object
@@ -112,22 +210,36 @@ class MongoGridFSProvider(SamsBaseStorageProvider):
         :param bytes content: The data to be uploaded
         :param str filename: The filename
         :param str mimetype: The mimetype of the content (not used here)
-        :return: The ``"id"`` of the created file
-        :rtype: str
+        :return: The metadata of the created file, with the GridFS ``md5`` as the ``etag``
+        :rtype: StoredBinary
         """
 
-        media_id = self.fs().put(
-            content,
-            filename=filename
+        if isinstance(content, bytes):
+            content = BytesIO(content)
+
+        grid_in = self.fs().new_file(filename=filename)
+        try:
+            grid_in.write(content)
+        finally:
+            grid_in.close()
+
+        # Hashed after the upload, so streams that hash themselves as they are read are only read once
+        content_hash = get_binary_stream_hash(content)
+        media_id = str(grid_in._id)
+        return StoredBinary(
+            media_id=media_id,
+            length=grid_in.length,
+            hash=content_hash,
+            key=media_id,
+            etag=grid_in.md5
         )
-        return str(media_id)
 
     def get(self, media_id: Union[ObjectId, str]) -> GridfsFileWrapper:
         """Get an asset from the storage
 
         :param bson.objectid.ObjectId media_id: The ID of the asset
-        :return: A file-like object providing a :meth:`read` method
-        :rtype: io.BytesIO
+        :return: A file-like object providing a :meth:`read` method, that streams the chunks from GridFS
+        :rtype: GridfsFileWrapper
         """
 
         if isinstance(media_id, str):
@@ -151,6 +263,96 @@ class MongoGridFSProvider(SamsBaseStorageProvider):
 
         self.fs().delete(media_id)
 
+    def delete_many(self, media_ids: Iterable[Union[ObjectId, str]]):
+        """Delete multiple assets from the storage
+
+        Removes the files and their chunks using one ``delete_many`` per GridFS collection
+
+        :param media_ids: The IDs of the assets
+        """
+
+        ids = [ObjectId(media_id) if isinstance(media_id, str) else media_id for media_id in media_ids]
+        if not ids:
+            return
+
+        self.fs()
+        db = self._client.get_database()
+
+        # Remove the files first, so partially deleted files are no longer found
+        db['fs.files'].delete_many({'_id': {'$in': ids}})
+        db['fs.chunks'].delete_many({'files_id': {'$in': ids}})
+
+    def create_upload(self, filename: str, mimetype: Optional[str], length: int, expires: int) -> DirectUpload:
+        """Prepare a direct upload, where the client uploads the binary in chunks
+
+        Each chunk is stored as a GridFS chunk as it is received, so the binary is never held in memory
+
+        :param str filename: The filename
+        :param str mimetype: The declared mimetype of the binary (not used here)
+        :param int length: The declared size of the binary, in bytes (not used here)
+        :param int expires: Seconds before the upload target expires (not used here)
+        :return: The upload target, without a URL, as the chunks are uploaded through SAMS
+        :rtype: DirectUpload
+        """
+
+        return DirectUpload(
+            media_id=str(ObjectId()),
+            method='PUT',
+            url=None,
+            fields={},
+            chunk_size=UPLOAD_CHUNK_SIZE
+        )
+
+    def upload_chunk(self, media_id: Union[ObjectId, str], index: int, content: bytes):
+        """Store a chunk of a binary being uploaded in chunks
+
+        :param bson.objectid.ObjectId media_id: The ID of the binary
+        :param int index: The zero based index of the chunk
+        :param bytes content: The content of the chunk
+        """
+
+        if isinstance(media_id, str):
+            media_id = ObjectId(media_id)
+
+        self.fs()
+        self._client.get_database()['fs.chunks'].replace_one(
+            {'files_id': media_id, 'n': index},
+            {'files_id': media_id, 'n': index, 'data': Binary(content)},
+            upsert=True
+        )
+
+    def complete_upload(self, media_id: Union[ObjectId, str], filename: str, length: int, chunk_size: Optional[int]):
+        """Add the GridFS file for the uploaded chunks
+
+        :param bson.objectid.ObjectId media_id: The ID of the binary
+        :param str filename: The filename
+        :param int length: The declared size of the binary, in bytes
+        :param int chunk_size: The size of each chunk
+        :raises sams_client.errors.SamsAssetErrors.BinaryNotSupplied: If any of the chunks have not been uploaded
+        """
+
+        if isinstance(media_id, str):
+            media_id = ObjectId(media_id)
+
+        self.fs()
+        db = self._client.get_database()
+        num_chunks = -(-length // chunk_size)
+
+        if db['fs.chunks'].count_documents({'files_id': media_id}) != num_chunks:
+            raise SamsAssetErrors.BinaryNotSupplied()
+
+        db['fs.files'].replace_one(
+            {'_id': media_id},
+            {
+                '_id': media_id,
+                'length': length,
+                'chunkSize': chunk_size,
+                'uploadDate': utcnow(),
+                'filename': filename
+            },
+            upsert=True
+        )
+
     def drop(self):
         """Deletes all assets from the storage"""
 
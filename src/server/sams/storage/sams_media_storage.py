@@ -1,20 +1,142 @@
+from typing import Optional
+from tempfile import SpooledTemporaryFile
+
 from eve.io.media import MediaStorage
-from flask import g
-from uuid import uuid4
+from flask import Request, current_app as app, g, request
+from werkzeug.datastructures import FileStorage
+
+from sams.utils import get_binary_stream_size
+from sams_client.errors import SamsAssetErrors
+
+#: Bytes allowed in an upload request on top of the binary itself, for the multipart encoding and metadata fields
+UPLOAD_FORM_ALLOWANCE = 1024 * 1024
+
 
+class SpooledUpload(SpooledTemporaryFile):
+    """Temporary file the binary of a multipart upload is written to, while the request is parsed
 
-def get_request_id():
+    The binary is kept in memory up to ``max_size`` bytes, and rolled over to a temporary file on disk
+    once it grows beyond that. The number of bytes written is tracked as the ``size`` attribute,
+    so the size of the upload is known without seeking through the file.
     """
-    Returns request id for media cache
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size=max_size)
+        self.size = 0
+
+    def write(self, s: bytes) -> int:
+        written = super().write(s)
+        self.size = max(self.size, self.tell())
+        return written
+
+
+class SamsRequest(Request):
+    """Request class that writes uploaded files to a :class:`SpooledUpload`
+
+    The in memory threshold is configured with ``UPLOAD_SPOOL_MAX_SIZE``
     """
-    if not getattr(g, 'request_id', None):
-        g.request_id = uuid4()
-    return g.request_id
 
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledUpload(max_size=app.config.get('UPLOAD_SPOOL_MAX_SIZE') or 0)
 
-class SamsMediaStorage(MediaStorage):
-    cache = {}
 
+class UploadSizeLimitedStream:
+    """Wraps the ``wsgi.input`` stream, counting the bytes read from it
+
+    Raises :class:`~sams_client.errors.SamsAssetErrors.AssetExceedsMaximumSizeForSet` as soon as more than
+    ``limit`` bytes have been read, for requests that do not send a ``Content-Length`` (or send the wrong one)
+    """
+
+    def __init__(self, stream, limit: int, max_size: int):
+        self._stream = stream
+        self._limit = limit
+        self._max_size = max_size
+        self.bytes_read = 0
+
+    def _count(self, data: bytes) -> bytes:
+        self.bytes_read += len(data)
+
+        if self.bytes_read > self._limit:
+            raise SamsAssetErrors.AssetExceedsMaximumSizeForSet(self.bytes_read, self._max_size)
+
+        return data
+
+    def read(self, *args) -> bytes:
+        return self._count(self._stream.read(*args))
+
+    def readline(self, *args) -> bytes:
+        return self._count(self._stream.readline(*args))
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def limit_upload_size(max_size: int):
+    """Rejects the current request if its body is too big for a binary of ``max_size`` bytes
+
+    Must be called before the request body is read (i.e. from a ``before_request`` handler).
+    Requests whose ``Content-Length`` is too big are rejected straight away, otherwise the body is
+    counted as it is read. :data:`UPLOAD_FORM_ALLOWANCE` bytes are allowed on top of ``max_size``,
+    the exact size of the binary is validated once it has been received.
+
+    :param int max_size: The maximum size of the binary, in bytes (``0`` for no limit)
+    :raises sams_client.errors.SamsAssetErrors.AssetExceedsMaximumSizeForSet: If the body is too big
+    """
+
+    if not max_size:
+        return
+
+    limit = max_size + UPLOAD_FORM_ALLOWANCE
+
+    if request.content_length and request.content_length > limit:
+        raise SamsAssetErrors.AssetExceedsMaximumSizeForSet(request.content_length, max_size)
+
+    request.environ['wsgi.input'] = UploadSizeLimitedStream(request.environ['wsgi.input'], limit, max_size)
+
+
+class UploadHandle:
+    """Handle to the binary uploaded with the current request
+
+    Only lives for the duration of the request, see :func:`get_upload`
+
+    :var werkzeug.datastructures.FileStorage content: The uploaded file
+    """
+
+    def __init__(self, content: FileStorage):
+        self.content = content
+
+    @property
+    def size(self) -> int:
+        """The size of the uploaded binary, in bytes"""
+
+        return get_binary_stream_size(self.content.stream)
+
+    def close(self):
+        self.content.close()
+
+
+def get_upload() -> Optional[UploadHandle]:
+    """Returns the binary uploaded with the current request, if any"""
+
+    return g.get('sams_upload')
+
+
+def release_upload(exception: Optional[BaseException] = None):
+    """Closes the binary uploaded with the current request, releasing its memory or temporary file
+
+    Registered as a ``teardown_request`` handler, so it runs however the request ends
+    """
+
+    upload = g.pop('sams_upload', None)
+
+    if upload is not None:
+        upload.close()
+
+
+class SamsMediaStorage(MediaStorage):
     def get(self, _id, resource=None):
         pass
 
@@ -23,8 +145,8 @@ class SamsMediaStorage(MediaStorage):
 
     def put(self, content, **kwargs):
         """
-        Uploads binary while creating or updating asset
+        Keeps the binary uploaded while creating or updating asset, until the end of the request
         """
-        request_id = get_request_id()
-        # store binary in cache
-        self.cache[request_id] = content
+
+        release_upload()
+        g.sams_upload = UploadHandle(content)
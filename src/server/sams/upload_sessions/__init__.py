@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Upload Session service, used to upload binaries directly to the StorageDestination.
+
+Instead of sending the binary to SAMS, the client:
+
+    1. Creates an Upload Session, with the Asset metadata and the size of the binary
+    2. Uploads the binary to the returned upload target (see :class:`sams_client.schemas.upload_sessions.IUploadTarget`)
+    3. Finalizes the Upload Session, which validates the binary and creates the Asset
+
+For Amazon S3 destinations the binary is uploaded using a presigned ``POST`` (or presigned part URLs
+of a multipart upload for binaries larger than 5GB), so it never passes through SAMS.
+For MongoGridFS destinations the binary is uploaded to SAMS in chunks, each stored in GridFS as it is received,
+so SAMS never holds more than one chunk in memory.
+
+Finalizing a session does not download the binary from the StorageDestination. Instead, the ``hash`` of
+the binary is calculated in the background by the rendition worker
+(see :class:`sams.commands.rendition_worker.RenditionWorker`).
+
+Sessions are stored in the ``upload_sessions`` MongoDB collection, and expire after ``UPLOAD_SESSION_EXPIRES``
+seconds. Expired sessions (and any binaries uploaded to them) are removed by the ``app:purge_upload_sessions``
+command (see :class:`sams.commands.purge_upload_sessions.PurgeUploadSessions`).
+
+Usage
+-----
+The Upload Session service instance can be found under :data:`sams.upload_sessions.get_service` and used::
+
+    from sams.upload_sessions import get_service
+
+    def upload(set_id, filename, length):
+        session = get_service().create_session({
+            'set_id': set_id,
+            'filename': filename,
+            'length': length,
+            'metadata': {'name': filename},
+        })
+
+        # Once the client has uploaded the binary to ``session['upload']``
+        asset_id = get_service().finalize(session['_id'])
+
+This service instance can only be used after the application has bootstrapped.
+"""
+
+from superdesk import get_backend
+from sams.factory.app import SamsApp
+from .resource import UploadSessionsResource
+from .service import UploadSessionsService
+
+_service: UploadSessionsService
+
+
+def get_service() -> UploadSessionsService:
+    return _service
+
+
+def init_app(app: SamsApp):
+    global _service
+
+    _service = UploadSessionsService(
+        UploadSessionsResource.endpoint_name,
+        backend=get_backend()
+    )
+    UploadSessionsResource(
+        endpoint_name=UploadSessionsResource.endpoint_name,
+        app=app,
+        service=_service
+    )
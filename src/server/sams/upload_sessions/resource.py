@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from superdesk.resource import Resource
+from sams_client.schemas import UPLOAD_SESSION_SCHEMA
+
+
+class UploadSessionsResource(Resource):
+    endpoint_name = resource_title = 'upload_sessions'
+    url = '/internal/upload_sessions'
+    internal_resource = True
+    schema = UPLOAD_SESSION_SCHEMA
+
+    datasource = {
+        'source': 'upload_sessions'
+    }
+    mongo_indexes = {
+        'state_expires': [('state', 1), ('expires', 1)]
+    }
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; -*-
+#
+# This file is part of SAMS.
+#
+# Copyright 2020 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from typing import Any, Dict, Union
+from datetime import timedelta
+
+from bson import ObjectId
+from flask import current_app as app
+from eve.utils import config
+from pymongo import ReturnDocument
+
+from superdesk.utc import utcnow
+
+from sams.factory.service import SamsService
+from sams.assets import get_service as get_asset_service
+from sams.sets import get_service as get_set_service
+from sams.storage.ingest import BinaryIngest, HEAD_SIZE
+from sams.logger import logger
+
+from sams_client.schemas import SET_STATES, UPLOAD_SESSION_STATES
+from sams_client.schemas.upload_sessions import IUploadSession, IUploadTarget
+from sams_client.errors import SamsException, SamsAssetErrors
+
+
+class UploadSessionsService(SamsService):
+    def create_session(self, doc: Dict[str, Any]) -> IUploadSession:
+        """Creates an Upload Session, and the target the client uploads the binary to
+
+        The Asset metadata and size are validated now, so the client does not upload
+        a binary that would then be rejected.
+
+        :param dict doc: The ``set_id``, ``filename``, ``length``, optional ``mimetype`` and Asset ``metadata``
+        :return: The new Upload Session, with the ``upload`` target
+        :rtype: IUploadSession
+        :raises sams_client.errors.SamsAssetErrors.AssetUploadToInactiveSet: If the Set is not usable
+        :raises sams_client.errors.SamsAssetErrors.AssetExceedsMaximumSizeForSet: If the binary is too big
+        :raises sams_client.errors.SamsAssetErrors.DirectUploadNotSupported: If the StorageDestination does
+            not support direct uploads
+        """
+
+        set_service = get_set_service()
+        set_id = ObjectId(doc.get('set_id'))
+        destination = set_service.get_destination(set_id)
+
+        if set_service.get_by_id(set_id).get('state') in [SET_STATES.DRAFT, SET_STATES.DISABLED]:
+            raise SamsAssetErrors.AssetUploadToInactiveSet()
+
+        session = IUploadSession(
+            set_id=set_id,
+            filename=doc.get('filename'),
+            mimetype=doc.get('mimetype'),
+            length=doc.get('length'),
+            metadata=doc.get('metadata') or {},
+            state=UPLOAD_SESSION_STATES.PENDING,
+            expires=utcnow() + timedelta(seconds=app.config['UPLOAD_SESSION_EXPIRES'])
+        )
+        self.validate_post(session)
+        get_asset_service().validate_post(self._get_asset(session))
+
+        max_size = set_service.get_max_asset_size(set_id)
+        if max_size and session['length'] > max_size:
+            raise SamsAssetErrors.AssetExceedsMaximumSizeForSet(session['length'], max_size)
+
+        target = destination.provider_instance().create_upload(
+            session['filename'],
+            session['mimetype'],
+            session['length'],
+            app.config['UPLOAD_SESSION_EXPIRES']
+        )
+        if target is None:
+            raise SamsAssetErrors.DirectUploadNotSupported(destination.name)
+
+        session['_media_id'] = target.media_id
+        session['upload'] = IUploadTarget(
+            method=target.method,
+            url=target.url,
+            fields=target.fields,
+            chunk_size=target.chunk_size,
+            parts=target.parts
+        )
+        self.post([session])
+        return session
+
+    def get_pending_session(self, session_id: Union[ObjectId, str]) -> IUploadSession:
+        """Returns an Upload Session that the client can upload to
+
+        :param session_id: The ID of the Upload Session
+        :return: The Upload Session
+        :rtype: IUploadSession
+        :raises sams_client.errors.SamsAssetErrors.UploadSessionNotFound: If not found or expired
+        :raises sams_client.errors.SamsAssetErrors.UploadSessionNotPending: If already finalized
+        """
+
+        session = self.get_by_id(ObjectId(session_id)) if ObjectId.is_valid(session_id) else None
+
+        if not session or session['expires'] <= utcnow():
+            raise SamsAssetErrors.UploadSessionNotFound(session_id)
+        elif session['state'] != UPLOAD_SESSION_STATES.PENDING:
+            raise SamsAssetErrors.UploadSessionNotPending(session_id, session['state'])
+
+        return session
+
+    def get_chunk_size(self, session: IUploadSession) -> int:
+        """Returns the size of the chunks uploaded to SAMS for the Upload Session
+
+        :param dict session: The Upload Session
+        :return: The size of each chunk, in bytes
+        :rtype: int
+        :raises sams_client.errors.SamsAssetErrors.DirectUploadNotSupported: If the binary is not uploaded
+            in chunks through SAMS (i.e. the parts are uploaded directly to the StorageDestination)
+        """
+
+        chunk_size = session['upload'].get('chunk_size')
+
+        if not chunk_size or session['upload'].get('parts'):
+            destination = get_set_service().get_destination(session['set_id'])
+            raise SamsAssetErrors.DirectUploadNotSupported(destination.name, 'chunked')
+
+        return chunk_size
+
+    def upload_chunk(self, session_id: Union[ObjectId, str], index: int, content: bytes):
+        """Stores a chunk of the binary, for Upload Sessions that upload the binary in chunks
+
+        Every chunk must be ``chunk_size`` bytes, except for the last chunk which has the remaining bytes
+
+        :param session_id: The ID of the Upload Session
+        :param int index: The zero based index of the chunk
+        :param bytes content: The content of the chunk
+        :raises sams_client.errors.SamsAssetErrors.UploadSizeMismatch: If the chunk is not the expected size
+        """
+
+        session = self.get_pending_session(session_id)
+        chunk_size = self.get_chunk_size(session)
+
+        expected_size = max(0, min(chunk_size, session['length'] - index * chunk_size)) if index >= 0 else 0
+        if not expected_size or len(content) != expected_size:
+            raise SamsAssetErrors.UploadSizeMismatch(len(content), expected_size)
+
+        provider = get_set_service().get_provider_instance(session['set_id'])
+        provider.upload_chunk(session['_media_id'], index, content)
+
+    def finalize(self, session_id: Union[ObjectId, str]) -> ObjectId:
+        """Validates the uploaded binary, and creates the Asset
+
+        The binary is not downloaded: its size is read from the StorageDestination, and its mimetype
+        and image dimensions are detected from the start of the binary. The hash of the binary is calculated
+        in the background by the rendition worker (see :meth:`sams.assets.service.AssetsService.post_uploaded`).
+        If the binary has not been uploaded yet, the session stays pending so the client can try again.
+        If the binary fails validation, it is deleted and the session is marked as failed.
+
+        :param session_id: The ID of the Upload Session
+        :return: The ID of the new Asset
+        :rtype: bson.objectid.ObjectId
+        :raises sams_client.errors.SamsAssetErrors.BinaryNotSupplied: If the binary has not been uploaded
+        :raises sams_client.errors.SamsAssetErrors.UploadSizeMismatch: If the size does not match ``length``
+        :raises sams_client.errors.SamsAssetErrors.UploadMimetypeMismatch: If the media type of the binary does
+            not match the declared ``mimetype``
+        """
+
+        session = self._claim_session(session_id)
+        provider = get_set_service().get_provider_instance(session['set_id'])
+
+        try:
+            provider.complete_upload(
+                session['_media_id'],
+                session['filename'],
+                session['length'],
+                session['upload'].get('chunk_size')
+            )
+            length = provider.get_length(session['_media_id'])
+        except (SamsAssetErrors.BinaryNotSupplied, SamsAssetErrors.AssetNotFound):
+            self._set_state(session, UPLOAD_SESSION_STATES.PENDING)
+            raise SamsAssetErrors.BinaryNotSupplied()
+        except (Exception, SamsException):
+            # The StorageDestination failed, so the client can try again
+            self._set_state(session, UPLOAD_SESSION_STATES.PENDING)
+            raise
+
+        try:
+            if length != session['length']:
+                raise SamsAssetErrors.UploadSizeMismatch(length, session['length'])
+
+            with BinaryIngest(provider.read_head(session['_media_id'], min(length, HEAD_SIZE))) as ingest:
+                head = ingest.read_head()
+                image_size = ingest.image_size
+
+            # Detection from the content is not always precise (i.e. ``text/plain`` for JSON),
+            # so only the media type of a declared mimetype has to match the binary
+            asset_service = get_asset_service()
+            mimetype = asset_service._get_mimetype(head, session['filename'])
+            if session.get('mimetype'):
+                if mimetype.split('/')[0] != session['mimetype'].split('/')[0]:
+                    raise SamsAssetErrors.UploadMimetypeMismatch(mimetype, session['mimetype'])
+                mimetype = session['mimetype']
+
+            if not image_size and length > HEAD_SIZE and mimetype.startswith('image/'):
+                # The image header is not within the start of the binary (i.e. large embedded metadata),
+                # so parse it from the stream, which only reads the binary up to the end of the header
+                with BinaryIngest(provider.get(session['_media_id'])) as ingest:
+                    image_size = ingest.image_size
+
+            asset = self._get_asset(session)
+            asset.update({
+                '_media_id': session['_media_id'],
+                'mimetype': mimetype,
+            })
+            asset_id = asset_service.post_uploaded(asset, image_size)
+        except (Exception, SamsException) as error:
+            logger.warning('Failed to finalize Upload Session "{}": {}'.format(session_id, error))
+            provider.delete(session['_media_id'])
+            self._set_state(session, UPLOAD_SESSION_STATES.FAILED, error=str(error))
+            raise
+
+        self._set_state(session, UPLOAD_SESSION_STATES.COMPLETED, asset_id=asset_id)
+        return asset_id
+
+    def purge_expired(self) -> int:
+        """Removes expired Upload Sessions, and deletes binaries uploaded to sessions that were not finalized
+
+        Sessions still finalizing are only removed once they have not been updated for the duration of
+        ``UPLOAD_SESSION_EXPIRES``, and their binary is kept, as it may already be used by a new Asset.
+        Multipart uploads of pending sessions are aborted, so the StorageDestination discards the uploaded parts.
+
+        :return: The number of sessions removed
+        :rtype: int
+        """
+
+        now = utcnow()
+        collection = app.data.get_mongo_collection(self.datasource)
+        sessions = list(collection.find({
+            '$or': [
+                {'state': {'$ne': UPLOAD_SESSION_STATES.FINALIZING}, 'expires': {'$lt': now}},
+                {
+                    'state': UPLOAD_SESSION_STATES.FINALIZING,
+                    config.LAST_UPDATED: {
+                        '$lt': now - timedelta(seconds=app.config['UPLOAD_SESSION_EXPIRES'])
+                    }
+                }
+            ]
+        }))
+
+        media_ids_by_set: Dict[ObjectId, list] = {}
+        uploads_by_set: Dict[ObjectId, list] = {}
+        for session in sessions:
+            if session['state'] == UPLOAD_SESSION_STATES.PENDING and session.get('_media_id'):
+                media_ids_by_set.setdefault(session['set_id'], []).append(session['_media_id'])
+
+                if (session.get('upload') or {}).get('parts'):
+                    uploads_by_set.setdefault(session['set_id'], []).append(session['_media_id'])
+
+        set_service = get_set_service()
+        for set_id, media_ids in media_ids_by_set.items():
+            try:
+                provider = set_service.get_provider_instance(set_id)
+                for media_id in uploads_by_set.get(set_id) or []:
+                    provider.abort_upload(media_id)
+                provider.delete_many(media_ids)
+            except (Exception, SamsException):
+                logger.exception('Failed to delete binaries of expired Upload Sessions for Set "{}"'.format(set_id))
+
+        if sessions:
+            collection.delete_many({config.ID_FIELD: {'$in': [session[config.ID_FIELD] for session in sessions]}})
+
+        return len(sessions)
+
+    def _get_asset(self, session: IUploadSession) -> Dict[str, Any]:
+        asset = dict(session.get('metadata') or {})
+        asset.update({
+            'set_id': session['set_id'],
+            'filename': session['filename'],
+            'length': session['length'],
+        })
+
+        if session.get('mimetype'):
+            asset['mimetype'] = session['mimetype']
+
+        return asset
+
+    def _claim_session(self, session_id: Union[ObjectId, str]) -> IUploadSession:
+        """Atomically marks a pending Upload Session as finalizing, so it can only be finalized once"""
+
+        session = self.get_pending_session(session_id)
+        claimed = app.data.get_mongo_collection(self.datasource).find_one_and_update(
+            {
+                config.ID_FIELD: session[config.ID_FIELD],
+                'state': UPLOAD_SESSION_STATES.PENDING
+            },
+            {
+                '$set': {
+                    'state': UPLOAD_SESSION_STATES.FINALIZING,
+                    config.LAST_UPDATED: utcnow()
+                }
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+        if not claimed:
+            raise SamsAssetErrors.UploadSessionNotPending(session_id, UPLOAD_SESSION_STATES.FINALIZING)
+
+        return claimed
+
+    def _set_state(self, session: IUploadSession, state: str, **updates):
+        updates.update({
+            'state': state,
+            config.LAST_UPDATED: utcnow()
+        })
+        app.data.get_mongo_collection(self.datasource).update_one(
+            {config.ID_FIELD: session[config.ID_FIELD]},
+            {'$set': updates}
+        )
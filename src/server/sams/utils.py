@@ -9,12 +9,16 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from typing import BinaryIO, Dict, Any
+from typing import BinaryIO, Dict, Any, Optional, List, Tuple, Iterator, Iterable, NamedTuple
+from datetime import datetime
 
+from io import RawIOBase
 from os import SEEK_END
+from uuid import uuid4
 import hashlib
+import zipfile
 
-from flask import request, current_app as app, Response
+from flask import request, current_app as app, Response, redirect
 from werkzeug.wsgi import wrap_file
 
 from superdesk.storage.superdesk_file import SuperdeskFile
@@ -25,23 +29,236 @@ from sams.default_settings import strtobool
 def get_binary_stream_size(content: BinaryIO) -> int:
     """Gets the size in bytes of the binary stream
 
+    Streams that track their own size (i.e. :class:`sams.storage.sams_media_storage.SpooledUpload`)
+    are not seeked through to the end
+
     :param io.BytesIO content: The binary stream to inspect
     :return: The size in bytes of the stream
     :rtype: int
     """
 
-    content.seek(0, SEEK_END)
-    content_size = content.tell()
+    content_size = getattr(content, 'size', None)
+
+    if not isinstance(content_size, int):
+        content.seek(0, SEEK_END)
+        content_size = content.tell()
+
     content.seek(0)
     return content_size
 
 
+def get_binary_stream_hash(content: BinaryIO, buffer_size: int = None) -> str:
+    """Gets the SHA-1 hex digest of the binary stream
+
+    The stream is read in blocks of ``buffer_size`` and is then seeked back to the beginning.
+    Streams that calculate their hash as they are read (i.e. :class:`sams.storage.ingest.BinaryIngest`)
+    provide the hash from a :meth:`hexdigest` method instead, without being read again.
+
+    :param io.BytesIO content: The binary stream to inspect
+    :param int buffer_size: The size of each block to read (defaults to 256KB)
+    :return: The SHA-1 hex digest of the stream
+    :rtype: str
+    """
+
+    if callable(getattr(content, 'hexdigest', None)):
+        return content.hexdigest()
+
+    if buffer_size is None:
+        buffer_size = 1024 * 256
+
+    h = hashlib.sha1()
+    content.seek(0)
+    for chunk in iter(lambda: content.read(buffer_size), b''):
+        h.update(chunk)
+    content.seek(0)
+    return h.hexdigest()
+
+
+def _set_cache_headers(response: Response, etag: str, cache_for: int):
+    response.set_etag(etag)
+    response.cache_control.max_age = cache_for
+    response.cache_control.s_max_age = cache_for
+    response.cache_control.public = True
+
+
+def construct_asset_not_modified_response(asset: Dict[str, Any], cache_for: int = None) -> Optional[Response]:
+    """Returns a ``304 Not Modified`` response if the client already has this binary
+
+    Uses the ``hash`` stored with the Asset (or Rendition), so the binary does not need
+    to be retrieved from the StorageProvider.
+
+    :param dict asset: The Asset (or Rendition) metadata
+    :param int cache_for: Number of seconds the client can cache the binary
+    :return: A ``304`` response if ``If-None-Match`` matches, otherwise ``None``
+    :rtype: flask.Response
+    """
+
+    etag = asset.get('hash')
+    if not etag or not request.if_none_match.contains(etag):
+        return None
+
+    if cache_for is None:
+        cache_for = 3600 * 24 * 30  # 30d cache
+
+    response = app.response_class(status=304)
+    _set_cache_headers(response, etag, cache_for)
+    return response
+
+
+#: The maximum number of ranges accepted in a single ``Range`` header
+MAX_BYTE_RANGES = 20
+
+
+def _is_if_range_satisfied(etag: str, last_modified: datetime) -> bool:
+    if 'If-Range' not in request.headers:
+        return True
+
+    if_range = request.if_range
+    if if_range.etag:
+        return if_range.etag == etag
+    elif if_range.date and last_modified:
+        return last_modified.replace(tzinfo=None, microsecond=0) <= if_range.date.replace(tzinfo=None)
+
+    return False
+
+
+def get_requested_byte_ranges(length: int, etag: str, last_modified: datetime) -> Optional[List[Tuple[int, int]]]:
+    """Returns the byte ranges requested using the ``Range`` header
+
+    The ``Range`` header is ignored if it is invalid, uses a unit other than ``bytes``,
+    requests too many ranges, or if the ``If-Range`` header does not match the binary.
+
+    :param int length: The complete length of the binary
+    :param str etag: The ETag of the binary, used to validate ``If-Range``
+    :param datetime.datetime last_modified: The last modified date, used to validate ``If-Range``
+    :return: A list of ``(start, stop)`` tuples (``stop`` is exclusive), or ``None`` if the full binary is to be sent.
+        The list is empty if none of the requested ranges can be satisfied
+    :rtype: list[tuple[int, int]]
+    """
+
+    byte_range = request.range
+    if byte_range is None or byte_range.units != 'bytes' or not byte_range.ranges:
+        return None
+    elif len(byte_range.ranges) > MAX_BYTE_RANGES or not _is_if_range_satisfied(etag, last_modified):
+        return None
+
+    ranges = []
+    for start, stop in byte_range.ranges:
+        if start < 0:
+            # Suffix range, i.e. ``bytes=-500`` for the last 500 bytes
+            start = max(length + start, 0)
+            stop = length
+        elif stop is None or stop > length:
+            stop = length
+
+        if start < stop:
+            ranges.append((start, stop))
+
+    return ranges
+
+
+def iter_binary_range(file: BinaryIO, start: int, stop: int, buffer_size: int) -> Iterator[bytes]:
+    """Yields the bytes between ``start`` and ``stop`` of the binary stream
+
+    The stream is seeked to ``start``, and told to stop at ``stop`` if it supports it (``set_read_end``),
+    which the StorageProvider file implementations use to only request the required bytes
+    from the storage destination.
+
+    :param io.BytesIO file: The binary stream
+    :param int start: The first byte to read
+    :param int stop: The byte to stop reading at (exclusive)
+    :param int buffer_size: The maximum size of each block to yield
+    """
+
+    file.seek(start)
+    if hasattr(file, 'set_read_end'):
+        file.set_read_end(stop)
+
+    remaining = stop - start
+    while remaining > 0:
+        chunk = file.read(min(buffer_size, remaining))
+        if not chunk:
+            break
+
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _make_partial_response(
+    response: Response,
+    file: SuperdeskFile,
+    byte_ranges: List[Tuple[int, int]],
+    mimetype: str,
+    length: int,
+    buffer_size: int
+):
+    if not byte_ranges:
+        response.status_code = 416
+        response.response = []
+        response.content_length = 0
+        response.headers['Content-Range'] = 'bytes */{}'.format(length)
+        return
+
+    response.status_code = 206
+
+    if len(byte_ranges) == 1:
+        start, stop = byte_ranges[0]
+        response.response = iter_binary_range(file, start, stop, buffer_size)
+        response.content_length = stop - start
+        response.headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, stop - 1, length)
+        return
+
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '--{boundary}\r\nContent-Type: {mimetype}\r\nContent-Range: bytes {start}-{end}/{length}\r\n\r\n'.format(
+                boundary=boundary,
+                mimetype=mimetype,
+                start=start,
+                end=stop - 1,
+                length=length
+            ).encode('ascii'),
+            start,
+            stop
+        )
+        for start, stop in byte_ranges
+    ]
+    closing = '--{}--\r\n'.format(boundary).encode('ascii')
+
+    def generate():
+        for part_header, start, stop in part_headers:
+            yield part_header
+            yield from iter_binary_range(file, start, stop, buffer_size)
+            yield b'\r\n'
+        yield closing
+
+    response.response = generate()
+    response.content_length = sum(
+        len(part_header) + (stop - start) + 2
+        for part_header, start, stop in part_headers
+    ) + len(closing)
+    response.headers['Content-Type'] = 'multipart/byteranges; boundary={}'.format(boundary)
+
+
 def construct_asset_download_response(
     asset: Dict[str, Any],
     file: SuperdeskFile,
     cache_for: int = None,
     buffer_size: int = None
 ) -> Response:
+    """Constructs the response used to download an Asset or Rendition binary
+
+    Supports conditional requests (``If-None-Match``, ``If-Modified-Since``) and
+    partial content requests using the ``Range`` header (including multiple ranges)
+
+    :param dict asset: The Asset (or Rendition) metadata
+    :param superdesk.storage.superdesk_file.SuperdeskFile file: The binary stream from the StorageProvider
+    :param int cache_for: Number of seconds the client can cache the binary (defaults to 30 days)
+    :param int buffer_size: The size of each block sent to the client (defaults to 256KB)
+    :return: The response to send to the client
+    :rtype: flask.Response
+    """
+
     if buffer_size is None:
         buffer_size = 1024 * 256
 
@@ -56,23 +273,172 @@ def construct_asset_download_response(
     )
     response.content_length = asset['length']
     response.last_modified = asset['_updated']
-    h = hashlib.sha1()
-    h.update(file.read())
-    file.seek(0)
-    response.set_etag(h.hexdigest())
-    response.cache_control.max_age = cache_for
-    response.cache_control.s_max_age = cache_for
-    response.cache_control.public = True
+
+    # Assets uploaded before the hash was stored with the metadata
+    # need to have the hash calculated from the binary
+    etag = asset.get('hash') or get_binary_stream_hash(file, buffer_size)
+    _set_cache_headers(response, etag, cache_for)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.call_on_close(file.close)
     response.make_conditional(request)
 
-    if strtobool(request.args.get('download', 'False')):
-        response.headers['Content-Disposition'] = 'Attachment; filename={}'.format(asset['filename'])
-    else:
-        response.headers['Content-Disposition'] = 'Inline; filename={}'.format(asset['filename'])
+    if response.status_code == 200:
+        byte_ranges = get_requested_byte_ranges(asset['length'], etag, asset['_updated'])
+        if byte_ranges is not None:
+            _make_partial_response(
+                response,
+                file,
+                byte_ranges,
+                asset['mimetype'],
+                asset['length'],
+                buffer_size
+            )
+
+    response.headers['Content-Disposition'] = get_content_disposition(
+        asset['filename'],
+        strtobool(request.args.get('download', 'False'))
+    )
+
+    return response
+
+
+def get_content_disposition(filename: str, attachment: bool = False) -> str:
+    """Returns the ``Content-Disposition`` header used to download an Asset or Rendition binary
+
+    :param str filename: The filename of the binary
+    :param bool attachment: If ``True``, the client is asked to save the binary instead of displaying it
+    :return: The ``Content-Disposition`` header value
+    :rtype: str
+    """
+
+    return '{}; filename={}'.format('Attachment' if attachment else 'Inline', filename)
+
 
+def construct_asset_redirect_response(url: str) -> Response:
+    """Constructs the response used to redirect the client to download a binary from the StorageProvider
+
+    The URL is short-lived, so the redirect itself must not be cached
+
+    :param str url: The URL to download the binary from
+    :return: A ``302 Found`` response
+    :rtype: flask.Response
+    """
+
+    response = redirect(url, 302)
+    response.cache_control.no_store = True
     return response
 
 
+#: Mimetypes (or mimetype prefixes) of binaries that are already compressed,
+#: which are added to ZIP archives without compressing them again
+COMPRESSED_MIMETYPES = (
+    'image/jpeg',
+    'image/png',
+    'image/gif',
+    'image/webp',
+    'video/',
+    'audio/',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-bzip2',
+    'application/x-7z-compressed',
+    'application/x-rar-compressed',
+)
+
+
+def is_compressed_mimetype(mimetype: Optional[str]) -> bool:
+    """Returns ``True`` if binaries of this mimetype are already compressed
+
+    :param str mimetype: The mimetype of the binary
+    :rtype: bool
+    """
+
+    return bool(mimetype) and mimetype.lower().startswith(COMPRESSED_MIMETYPES)
+
+
+class ZipStreamEntry(NamedTuple):
+    """A file to add to a streamed ZIP archive
+
+    :var str filename: The name of the file inside the archive
+    :var io.BytesIO file: The binary stream of the file, closed once it has been added
+    :var datetime date_time: The modification date/time of the file
+    :var bool compress: If ``True`` the file is deflated, otherwise it is stored as is
+    """
+
+    filename: str
+    file: BinaryIO
+    date_time: datetime
+    compress: bool
+
+
+class _ZipStreamBuffer(RawIOBase):
+    """Unseekable output for :class:`zipfile.ZipFile`, holding the bytes written since the last :meth:`pop`
+
+    As the output cannot be seeked, ``zipfile`` writes the sizes and CRC of each entry in a data descriptor
+    after the entry's data, instead of going back to update the local file header.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip_stream(entries: Iterable[ZipStreamEntry], buffer_size: int = None) -> Iterator[bytes]:
+    """Generates a ZIP archive, yielding its bytes as each entry is read
+
+    The archive is never held in memory, and entries are only read when the archive is consumed.
+    ZIP64 extensions are always used, so there is no limit on the size of an entry.
+
+    :param entries: The files to add to the archive
+    :param int buffer_size: The size of each block read from the entries (defaults to 256KB)
+    :return: An iterator of the archive's bytes
+    """
+
+    if buffer_size is None:
+        buffer_size = 1024 * 256
+
+    output = _ZipStreamBuffer()
+    with zipfile.ZipFile(output, mode='w', allowZip64=True) as archive:
+        for entry in entries:
+            # ZIP archives cannot store dates before 1980
+            date_time = max(entry.date_time.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+            info = zipfile.ZipInfo(entry.filename, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED if entry.compress else zipfile.ZIP_STORED
+            info.external_attr = 0o644 << 16
+
+            try:
+                with archive.open(info, mode='w', force_zip64=True) as archive_file:
+                    for chunk in iter(lambda: entry.file.read(buffer_size), b''):
+                        archive_file.write(chunk)
+
+                        data = output.pop()
+                        if data:
+                            yield data
+            finally:
+                entry.file.close()
+
+            # The data descriptor, written when the entry is closed
+            data = output.pop()
+            if data:
+                yield data
+
+    # The central directory, written when the archive is closed
+    yield output.pop()
+
+
 def get_external_user_id() -> str:
     try:
         return request.args.get('external_user_id')
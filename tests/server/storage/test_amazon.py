@@ -1,8 +1,15 @@
 import pytest
+import requests
+from io import BytesIO
 from typing import Dict
+from unittest import mock
 
-from sams.storage.providers.amazon import AmazonS3Provider, AmazonS3Config
-from sams_client.errors import SamsAmazonS3Errors
+from botocore.exceptions import ClientError
+
+from sams.storage.providers import amazon
+from sams.storage.providers.amazon import AmazonS3Provider, AmazonS3Config, AmazonObjectWrapper
+from sams.utils import iter_binary_range
+from sams_client.errors import SamsAmazonS3Errors, SamsAssetErrors
 from tests.server.utils import get_test_db_host, get_test_storage_destinations, create_test_config
 
 db_host = get_test_db_host()
@@ -67,6 +74,139 @@ def test_amazon_missing_config():
         AmazonS3Config('foo,bar')
 
 
+def test_amazon_transfer_config():
+    config = AmazonS3Config(create_test_config(dict(
+        access='minioadmin',
+        secret='minioadmin',
+        region='minio',
+        bucket='test',
+    )))
+    assert config.multipart_threshold == amazon.MULTIPART_THRESHOLD
+    assert config.max_concurrency == amazon.MAX_CONCURRENCY
+    assert config.use_threads is True
+
+    config = AmazonS3Config(create_test_config(dict(
+        access='minioadmin',
+        secret='minioadmin',
+        region='minio',
+        bucket='test',
+        multipart_threshold=str(64 * 1024 * 1024),
+        multipart_chunksize=str(16 * 1024 * 1024),
+        max_concurrency='4',
+        use_threads='false',
+    )))
+    transfer_config = config.get_transfer_config()
+    assert transfer_config.multipart_threshold == 64 * 1024 * 1024
+    assert transfer_config.multipart_chunksize == 16 * 1024 * 1024
+    assert transfer_config.max_concurrency == 4
+    assert transfer_config.use_threads is False
+
+    with pytest.raises(SamsAmazonS3Errors.InvalidAmazonDestinationConfig):
+        AmazonS3Config(create_test_config(dict(
+            access='minioadmin',
+            secret='minioadmin',
+            region='minio',
+            bucket='test',
+            max_concurrency='many',
+        )))
+
+
+def test_amazon_download_url():
+    provider = AmazonS3Provider(get_test_storage_destinations(True)[0])
+    assert provider.get_download_url('test-file', 'image/jpeg', 'Inline; filename=test.jpg') is None
+
+    provider._config.download_redirect = True
+    provider._config.redirect_expires = 60
+    url = provider.get_download_url('test-file', 'image/jpeg', 'Attachment; filename=test.jpg')
+
+    assert '/test/test-file?' in url
+    assert 'response-content-type=image%2Fjpeg' in url
+    assert 'response-content-disposition=Attachment%3B%20filename%3Dtest.jpg' in url
+    assert 'X-Amz-Expires=60' in url
+
+
+def test_amazon_object_wrapper_bounded_ranges():
+    content = bytes(range(256)) * 4
+    requests = []
+
+    def get_object(media_id, start=None, end=None):
+        requests.append((start, end))
+        return {'Body': BytesIO(content[start:None if end is None else end + 1])}
+
+    provider = mock.Mock(get_object=mock.Mock(side_effect=get_object))
+    s3_object = {
+        'Body': BytesIO(content),
+        'ContentType': 'application/octet-stream',
+        'ContentLength': len(content),
+        'LastModified': None,
+        'ETag': '"abc"',
+    }
+
+    # Each range only requests its own bytes from S3
+    file = AmazonObjectWrapper(provider, 'test-file', s3_object)
+    assert b''.join(iter_binary_range(file, 100, 200, 16)) == content[100:200]
+    assert b''.join(iter_binary_range(file, 500, 600, 16)) == content[500:600]
+    assert requests == [(100, 199), (500, 599)]
+
+    # Reading past the end of the range requests the rest of the object
+    assert file.read(50) == content[600:650]
+    assert requests[-1] == (600, None)
+    file.close()
+
+
+def test_amazon_direct_multipart_upload(monkeypatch):
+    provider = AmazonS3Provider(get_test_storage_destinations(True)[0])
+    provider._config.bucket = 'test-multipart-upload'
+    provider._config.multipart_chunksize = amazon.MIN_PART_SIZE
+    monkeypatch.setattr(amazon, 'MAX_POST_SIZE', 0)
+    content = b'a' * amazon.MIN_PART_SIZE + b'b' * 10
+
+    try:
+        provider.create_bucket()
+        upload = provider.create_upload('large.bin', 'application/octet-stream', len(content), 60)
+        assert upload.method == 'PUT'
+        assert upload.url is None
+        assert upload.chunk_size == amazon.MIN_PART_SIZE
+        assert len(upload.parts) == 2
+
+        # The upload cannot be completed until all parts are uploaded
+        assert requests.put(upload.parts[0], data=content[:upload.chunk_size]).status_code == 200
+        with pytest.raises(SamsAssetErrors.BinaryNotSupplied):
+            provider.complete_upload(upload.media_id, 'large.bin', len(content), upload.chunk_size)
+
+        assert requests.put(upload.parts[1], data=content[upload.chunk_size:]).status_code == 200
+        provider.complete_upload(upload.media_id, 'large.bin', len(content), upload.chunk_size)
+        assert provider.get_length(upload.media_id) == len(content)
+        assert provider.read_head(upload.media_id, 4) == b'aaaa'
+
+        # Completing an upload again does nothing
+        provider.complete_upload(upload.media_id, 'large.bin', len(content), upload.chunk_size)
+
+        # Uploads that are not completed can be aborted
+        upload = provider.create_upload('large.bin', 'application/octet-stream', len(content), 60)
+        assert provider._get_multipart_upload_ids(provider._get_key(upload.media_id))
+        provider.abort_upload(upload.media_id)
+        assert not provider._get_multipart_upload_ids(provider._get_key(upload.media_id))
+    finally:
+        monkeypatch.undo()
+        provider.drop()
+
+    # Binaries too large for the maximum number of parts are not supported
+    monkeypatch.setattr(amazon, 'MAX_POST_SIZE', 0)
+    assert provider.create_upload('huge.bin', None, amazon.MAX_PART_SIZE * amazon.MAX_UPLOAD_PARTS + 1, 60) is None
+
+
+def test_amazon_download_raises_unconverted_errors():
+    provider = AmazonS3Provider(get_test_storage_destinations(True)[0])
+    error = ClientError({}, 'GetObject')
+
+    # A ``ClientError`` without an error code is not converted to a SAMS error, but is still raised
+    with mock.patch.object(provider, '_client') as client:
+        client.download_fileobj.side_effect = error
+        with pytest.raises(ClientError):
+            provider.download('test-file', BytesIO())
+
+
 def test_invalid_endpoint():
     config = create_test_config(dict(
         access='minioadmin',
@@ -131,3 +271,49 @@ def test_bucket_not_found():
 
     with pytest.raises(SamsAmazonS3Errors.BucketNotFound):
         provider.get('test-file')
+
+
+def test_amazon_delete_many(monkeypatch):
+    provider = AmazonS3Provider(get_test_storage_destinations(True)[0])
+    provider._config.bucket = 'test-delete-many'
+
+    try:
+        provider.create_bucket()
+        media_ids = [
+            provider.put('content {}'.format(index).encode(), 'file{}.txt'.format(index)).media_id
+            for index in range(5)
+        ]
+
+        # Delete using multiple batches
+        monkeypatch.setattr(amazon, 'MAX_KEYS', 2)
+        delete_objects_calls = []
+        delete_objects = provider._client.delete_objects
+
+        def delete_objects_spy(**kwargs):
+            delete_objects_calls.append(kwargs)
+            return delete_objects(**kwargs)
+
+        monkeypatch.setattr(provider._client, 'delete_objects', delete_objects_spy)
+
+        provider.delete_many(media_ids[:4])
+        assert [len(call['Delete']['Objects']) for call in delete_objects_calls] == [2, 2]
+        assert [provider.exists(media_id) for media_id in media_ids] == [False, False, False, False, True]
+    finally:
+        monkeypatch.undo()
+        provider.drop()
+
+
+def test_amazon_delete_many_continues_after_failed_batch(monkeypatch):
+    provider = AmazonS3Provider(get_test_storage_destinations(True)[0])
+    monkeypatch.setattr(amazon, 'MAX_KEYS', 1)
+    error = ClientError({}, 'DeleteObjects')
+
+    with mock.patch.object(provider, '_client') as client:
+        client.delete_objects.side_effect = [{}, error, {'Errors': [{'Key': 'c'}]}]
+
+        # The remaining batches are still attempted, then the exception of the failed batch is raised
+        with pytest.raises(ClientError) as raised:
+            provider.delete_many(['a', 'b', 'c'])
+
+        assert raised.value is error
+        assert client.delete_objects.call_count == 3
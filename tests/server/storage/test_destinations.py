@@ -1,12 +1,17 @@
 import pytest
+from importlib import import_module
+from time import monotonic
 
-from sams.storage.destinations import Destination, destinations
+from sams.storage.destinations import Destination, destinations, provider_instances
 from sams.storage.providers import providers, Provider
 from sams_client.errors import SamsStorageProviderErrors, SamsStorageDestinationErrors
 
 from tests.fixtures import STORAGE_DESTINATIONS, MONGO_STORAGE_PROVIDER
 from tests.server.utils import get_test_db_host
 
+# ``sams.storage.destinations`` resolves to the instance re-exported by ``sams.storage``
+destinations_module = import_module('sams.storage.destinations')
+
 
 def test_destination_class():
     db_host = get_test_db_host()
@@ -47,3 +52,89 @@ def test_get_destination(init_app):
 def test_exists(init_app):
     assert destinations.exists('internal')
     assert not destinations.exists('mock')
+
+
+def test_provider_instance_is_cached(init_app):
+    destination = destinations.get('internal')
+    instance = destination.provider_instance()
+
+    assert destination.provider_instance() is instance
+
+    new_instance = destination.reset_provider_instance()
+    assert new_instance is not instance
+    assert destination.provider_instance() is new_instance
+
+
+def test_provider_instance_recreated_after_fork(init_app, monkeypatch):
+    destination = destinations.get('internal')
+    instance = destination.provider_instance()
+
+    monkeypatch.setattr(destinations_module, 'getpid', lambda: -1)
+    assert destination.provider_instance() is not instance
+
+
+def test_provider_instance_recreated_when_unhealthy(init_app, monkeypatch):
+    destination = destinations.get('internal')
+    instance = destination.provider_instance()
+
+    monkeypatch.setattr(provider_instances, 'health_check_interval', 1)
+    monkeypatch.setattr(destinations_module, 'monotonic', lambda: float('inf'))
+    monkeypatch.setattr(instance, 'is_healthy', lambda: False)
+    assert destination.provider_instance() is not instance
+
+
+def test_health_check_keeps_replaced_instance(init_app, monkeypatch):
+    destination = destinations.get('internal')
+    instance = destination.provider_instance()
+    replaced = []
+
+    def is_healthy():
+        # Another thread replaces the instance while it is being checked
+        replaced.append(destination.reset_provider_instance())
+        return True
+
+    monkeypatch.setattr(provider_instances, 'health_check_interval', 1)
+    monkeypatch.setattr(destinations_module, 'monotonic', lambda: float('inf'))
+    monkeypatch.setattr(instance, 'is_healthy', is_healthy)
+    destination.provider_instance()
+
+    monkeypatch.setattr(provider_instances, 'health_check_interval', 0)
+    assert destination.provider_instance() is replaced[0]
+
+
+def test_health_check_runs_in_one_thread(init_app, monkeypatch):
+    destination = destinations.get('internal')
+    instance = destination.provider_instance()
+    checked = []
+
+    def is_healthy():
+        # Other requests keep using the instance while it is being checked, without checking it again
+        checked.append(destination.provider_instance())
+        return True
+
+    monkeypatch.setattr(provider_instances, 'health_check_interval', 1)
+    monkeypatch.setattr(destinations_module, 'monotonic', lambda: float('inf'))
+    monkeypatch.setattr(instance, 'is_healthy', is_healthy)
+
+    assert destination.provider_instance() is instance
+    assert checked == [instance]
+
+
+def test_replaced_instance_closed_after_delay(init_app, monkeypatch):
+    destination = destinations.get('internal')
+    instance = destination.provider_instance()
+    closed = []
+    now = monotonic()
+
+    monkeypatch.setattr(instance, 'close', lambda: closed.append(instance))
+    monkeypatch.setattr(provider_instances, 'close_delay', 60)
+    monkeypatch.setattr(destinations_module, 'monotonic', lambda: now)
+    new_instance = destination.reset_provider_instance()
+
+    # Requests may still be using the replaced instance
+    assert destination.provider_instance() is new_instance
+    assert closed == []
+
+    monkeypatch.setattr(destinations_module, 'monotonic', lambda: now + 60)
+    destination.provider_instance()
+    assert closed == [instance]
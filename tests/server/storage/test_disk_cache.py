@@ -0,0 +1,91 @@
+from os import path, utime
+from unittest import mock
+
+from superdesk.storage.superdesk_file import SuperdeskFile
+
+from sams.logger import logger
+from sams.storage.disk_cache import DiskCache, CachedFile
+
+
+def get_provider(binaries):
+    provider = mock.Mock()
+    provider.get.side_effect = lambda media_id: SuperdeskFile(binaries[media_id])
+    provider.download.side_effect = lambda media_id, file: file.write(binaries[media_id])
+    return provider
+
+
+def test_disk_cache_get_file(tmp_path):
+    provider = get_provider({'abc': b'0123456789'})
+    cache = DiskCache()
+    cache.configure(str(tmp_path), max_size=1024, max_file_size=100)
+
+    file = cache.get_file(provider, 'abc', 'hash1', 10)
+    assert isinstance(file, CachedFile)
+    assert file.read() == b'0123456789'
+    assert file.fileno() > 0
+    file.close()
+    assert path.exists(cache.get_path('abc', 'hash1'))
+
+    file = cache.get_file(provider, 'abc', 'hash1', 10)
+    file.seek(5)
+    assert file.read(2) == b'56'
+    file.close()
+
+    assert provider.download.call_count == 1
+    assert provider.get.call_count == 0
+    assert cache.get_stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5, 'size': 10}
+
+    # The stats are logged every ``stats_log_interval`` requests
+    cache.stats_log_interval = 3
+    with mock.patch.object(logger, 'info') as log_info:
+        cache.get_file(provider, 'abc', 'hash1', 10).close()
+
+    log_info.assert_called_once_with('Disk cache: 2 hits, 1 misses, 66.7% hit ratio, 10 bytes')
+
+
+def test_disk_cache_bypass(tmp_path):
+    provider = get_provider({'abc': b'0123456789'})
+    cache = DiskCache()
+
+    # Disabled
+    assert not isinstance(cache.get_file(provider, 'abc', 'hash1', 10), CachedFile)
+
+    # Larger than ``max_file_size``, or without a hash
+    cache.configure(str(tmp_path), max_size=1024, max_file_size=5)
+    assert not isinstance(cache.get_file(provider, 'abc', 'hash1', 10), CachedFile)
+    assert not isinstance(cache.get_file(provider, 'abc', None, 10), CachedFile)
+    assert cache.get_stats()['misses'] == 0
+
+
+def test_disk_cache_skips_truncated_download(tmp_path):
+    provider = get_provider({'abc': b'01234'})
+    cache = DiskCache()
+    cache.configure(str(tmp_path), max_size=1024, max_file_size=100)
+
+    # The downloaded binary is smaller than its ``length``, so it is read from the provider instead
+    file = cache.get_file(provider, 'abc', 'hash1', 10)
+    assert not isinstance(file, CachedFile)
+    assert provider.get.call_count == 1
+    assert not path.exists(cache.get_path('abc', 'hash1'))
+    assert not list(tmp_path.glob('*/*'))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    binaries = {str(i): bytes([i]) * 40 for i in range(3)}
+    provider = get_provider(binaries)
+    cache = DiskCache()
+    cache.configure(str(tmp_path), max_size=100, max_file_size=100)
+
+    cache.get_file(provider, '0', 'hash', 40).close()
+    cache.get_file(provider, '1', 'hash', 40).close()
+
+    # Make ``1`` the least recently used file, as reading ``0`` marks it as recently used
+    utime(cache.get_path('0', 'hash'), (1000, 1000))
+    utime(cache.get_path('1', 'hash'), (2000, 2000))
+    cache.get_file(provider, '0', 'hash', 40).close()
+    cache.get_file(provider, '2', 'hash', 40).close()
+
+    assert path.exists(cache.get_path('0', 'hash'))
+    assert not path.exists(cache.get_path('1', 'hash'))
+    assert path.exists(cache.get_path('2', 'hash'))
+    assert cache.get_stats()['size'] == 80
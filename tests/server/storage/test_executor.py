@@ -0,0 +1,45 @@
+import pytest
+from threading import get_ident
+
+from sams.storage.executor import StorageExecutor
+
+
+def test_executor_map():
+    executor = StorageExecutor()
+    executor.configure(max_workers=4)
+
+    assert executor.map(lambda value: value * 2, [1, 2, 3]) == [2, 4, 6]
+    assert len(set(executor.map(lambda _value: get_ident(), range(20)))) > 1
+
+    def fail(value):
+        if value == 2:
+            raise ValueError(value)
+        return value
+
+    with pytest.raises(ValueError):
+        executor.map(fail, [1, 2, 3])
+
+    executor.shutdown()
+
+
+def test_executor_nested_tasks_run_inline():
+    executor = StorageExecutor()
+    executor.configure(max_workers=2)
+
+    # Each task waits on nested tasks, which would deadlock if they were queued in the saturated pool
+    def outer(value):
+        thread = get_ident()
+        return executor.map(lambda nested: (nested, get_ident() == thread), range(value))
+
+    results = executor.map(outer, [3, 3, 3, 3])
+    assert all(inline for result in results for _nested, inline in result)
+
+    executor.shutdown()
+
+
+def test_executor_disabled():
+    executor = StorageExecutor()
+    executor.configure(max_workers=0)
+
+    thread = get_ident()
+    assert executor.map(lambda _value: get_ident(), [1, 2]) == [thread, thread]
@@ -0,0 +1,76 @@
+import hashlib
+from io import BytesIO
+from os import urandom
+
+from PIL import Image
+
+from sams.storage import ingest
+from sams.storage.ingest import BinaryIngest
+from sams.utils import get_binary_stream_hash, get_binary_stream_size
+
+
+class CountingStream(BytesIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_ingest_single_pass(monkeypatch):
+    monkeypatch.setattr(ingest, 'HEAD_SIZE', 1024)
+    content = urandom(1024 * 10 + 7)
+    stream = CountingStream(content)
+    binary = BinaryIngest(stream)
+
+    assert get_binary_stream_size(binary) == len(content)
+    assert binary.read_head().getvalue() == content[:1024]
+    assert binary.tell() == 0
+
+    # The Storage Provider reads the binary
+    for chunk in iter(lambda: binary.read(4096), b''):
+        pass
+
+    assert get_binary_stream_hash(binary) == hashlib.sha1(content).hexdigest()
+    assert binary.size == len(content)
+    assert stream.bytes_read == len(content)
+
+
+def test_ingest_completes_partial_reads():
+    content = urandom(1024 * 10)
+
+    binary = BinaryIngest(content)
+    binary.read(100)
+    assert binary.hexdigest() == hashlib.sha1(content).hexdigest()
+    assert binary.tell() == 100
+
+    # Skipping part of the binary restarts the hash
+    binary = BinaryIngest(content)
+    binary.seek(500)
+    binary.read(100)
+    assert binary.hexdigest() == hashlib.sha1(content).hexdigest()
+
+
+def test_ingest_read_head_after_skip(monkeypatch):
+    monkeypatch.setattr(ingest, 'HEAD_SIZE', 1024)
+    content = urandom(1024 * 10)
+
+    binary = BinaryIngest(content)
+    binary.read(100)
+    binary.seek(2048)
+    binary.read(100)
+    assert binary.read_head().getvalue() == content[:1024]
+    assert binary.tell() == 2148
+    assert binary.read(10) == content[2148:2158]
+    assert binary.hexdigest() == hashlib.sha1(content).hexdigest()
+
+
+def test_ingest_image_size():
+    image = BytesIO()
+    Image.new('RGB', (120, 80)).save(image, 'JPEG')
+    binary = BinaryIngest(image.getvalue())
+
+    assert binary.image_size == (120, 80)
+    assert binary.tell() == 0
+    assert BinaryIngest(b'not an image').image_size is None
@@ -0,0 +1,47 @@
+from io import BytesIO
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from sams.storage.sams_media_storage import SpooledUpload, UploadSizeLimitedStream, get_upload
+from sams_client.errors import SamsAssetErrors
+
+
+def test_upload_spooled_to_disk():
+    upload = SpooledUpload(max_size=4)
+    upload.write(b'abc')
+    assert upload.size == 3
+    assert not upload._rolled
+
+    upload.write(b'defg')
+    assert upload.size == 7
+    assert upload._rolled
+
+    upload.seek(0)
+    assert upload.read() == b'abcdefg'
+    upload.close()
+
+
+def test_upload_released_on_teardown(init_app, app):
+    stream = SpooledUpload(max_size=1024)
+    stream.write(b'binary')
+    stream.seek(0)
+
+    with app.test_request_context():
+        app.media.put(FileStorage(stream, filename='test.txt'))
+        assert get_upload().size == 6
+        assert get_upload().content.read() == b'binary'
+
+    assert stream.closed
+
+    with app.test_request_context():
+        assert get_upload() is None
+
+
+def test_upload_size_limited_stream():
+    stream = UploadSizeLimitedStream(BytesIO(b'line 1\nline 2\nline 3'), limit=10, max_size=5)
+    assert stream.readline() == b'line 1\n'
+    assert stream.bytes_read == 7
+
+    with pytest.raises(SamsAssetErrors.AssetExceedsMaximumSizeForSet):
+        stream.read(4)
@@ -1,3 +1,4 @@
+import hashlib
 import pytest
 
 from sams.storage.providers.mongo import MongoGridFSProvider
@@ -11,7 +12,11 @@ def test_mongo_upload(init_app, app):
         original_bytes = f.read()
         original_size = f.tell()
 
-    item_id = provider.put(original_bytes, 'file_example-jpg.jpg')
+    stored_binary = provider.put(original_bytes, 'file_example-jpg.jpg')
+    item_id = stored_binary.media_id
+    assert stored_binary.length == original_size
+    assert stored_binary.hash == hashlib.sha1(original_bytes).hexdigest()
+    assert stored_binary.etag == hashlib.md5(original_bytes).hexdigest()
 
     assert provider.exists(item_id)
     item = provider.get(item_id)
@@ -28,14 +33,32 @@ def test_mongo_upload(init_app, app):
     provider.delete(item_id)
 
 
+def test_mongo_batch_operations(init_app, app):
+    provider = MongoGridFSProvider(app.config.get('STORAGE_DESTINATION_1'))
+
+    media_ids = [
+        provider.put('content {}'.format(index).encode(), 'file{}.txt'.format(index)).media_id
+        for index in range(3)
+    ]
+
+    assert [provider.exists(media_id) for media_id in media_ids] == [True, True, True]
+    assert [item.read() for item in provider.get_many(media_ids)] == [b'content 0', b'content 1', b'content 2']
+
+    provider.delete_many(media_ids[:2])
+    assert [provider.exists(media_id) for media_id in media_ids] == [False, False, True]
+
+    with pytest.raises(SamsAssetErrors.AssetNotFound):
+        provider.get_many(media_ids)
+
+
 def test_drop(init_app, app):
     provider = MongoGridFSProvider(app.config.get('STORAGE_DESTINATION_1'))
 
     with open('tests/fixtures/file_example-jpg.jpg', 'rb') as f:
-        jpeg_id = provider.put(f, 'file_example-jpg.jpg')
+        jpeg_id = provider.put(f, 'file_example-jpg.jpg').media_id
 
     with open('tests/fixtures/file_example-docx.docx', 'rb') as f:
-        docx_id = provider.put(f, 'file_example-docx.docx')
+        docx_id = provider.put(f, 'file_example-docx.docx').media_id
 
     assert provider.exists(jpeg_id)
     assert provider.exists(docx_id)
@@ -44,3 +67,23 @@ def test_drop(init_app, app):
 
     assert not provider.exists(jpeg_id)
     assert not provider.exists(docx_id)
+
+
+def test_mongo_streaming_read(init_app, app):
+    provider = MongoGridFSProvider(app.config.get('STORAGE_DESTINATION_1'))
+
+    with open('tests/fixtures/file_example-jpg.jpg', 'rb') as f:
+        original_bytes = f.read()
+
+    item_id = provider.put(original_bytes, 'file_example-jpg.jpg').media_id
+    item = provider.get(item_id)
+
+    assert item.read(100) == original_bytes[:100]
+    assert item.tell() == 100
+
+    assert item.seek(5000) == 5000
+    assert item.read(100) == original_bytes[5000:5100]
+
+    item.seek(0)
+    assert item.read() == original_bytes
+    assert item.getvalue() == original_bytes
@@ -1,5 +1,10 @@
 from flask import json
 
+from sams.apps.file_server.app import get_app as get_file_server_app
+from sams.assets import get_service as get_asset_service
+
+from tests.server.conftest import get_test_config
+
 
 def test_bootstrap_app(init_app, client):
     resp = client.get('/')
@@ -8,3 +13,10 @@ def test_bootstrap_app(init_app, client):
 
     assert '_links' in data
     assert 'child' in data['_links']
+
+
+def test_bootstrap_file_server_app():
+    # The File Server app caches the Asset download metadata by default
+    app = get_file_server_app(import_name='sams_test', config=get_test_config())
+    assert app.config['ASSETS_DOWNLOAD_CACHE_ENABLED']
+    assert get_asset_service().download_cache.name == 'asset_downloads'
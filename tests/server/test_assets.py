@@ -1,11 +1,19 @@
 import pytest
+import hashlib
 from copy import deepcopy
+from io import BytesIO
+from base64 import b64encode
+from threading import Thread
+
+from PIL import Image
 
 from superdesk import get_resource_service, json
 from eve.utils import ParsedRequest
 
 from sams.assets import get_service as get_asset_service
 from sams.sets import get_service as get_set_service
+from sams.cache import create_cache
+from sams.commands.add_hashes_to_existing_assets import AddAssetHashes
 from sams_client.errors import SamsAssetErrors
 
 from tests.fixtures import test_sets
@@ -49,6 +57,7 @@ def test_asset_upload(init_app, app):
     asset = asset_service.get_by_id(asset_id)
     assert asset['length'] == original_size
     assert asset['mimetype'] == 'image/jpeg'
+    assert asset['hash'] == hashlib.sha1(original_bytes).hexdigest()
     assert provider.exists(asset['_media_id'])
 
     asset_binary = asset_service.download_binary(asset_id)
@@ -121,6 +130,384 @@ def test_delete(init_app, app):
     assert not provider.exists(media_id)
 
 
+def test_delete_many(init_app, app, monkeypatch):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+
+        original_bytes, _ = load_file('tests/fixtures/file_example-jpg.jpg')
+
+        asset_ids = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example {}'.format(index),
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        } for index in range(3)])
+
+        asset_service.get_or_create_rendition(asset_service.get_by_id(asset_ids[0]), width=10)
+
+    media_ids = set()
+    for asset_id in asset_ids:
+        asset = asset_service.get_by_id(asset_id)
+        media_ids.update(rendition['_media_id'] for rendition in asset['renditions'])
+    assert len(media_ids) > len(asset_ids)
+    assert all(provider.exists(media_id) for media_id in media_ids)
+
+    # All Binaries of the Set are deleted with a single batch, not one by one
+    delete_many_calls = []
+    original_delete_many = type(provider).delete_many
+
+    def delete_many(self, ids):
+        delete_many_calls.append(list(ids))
+        original_delete_many(self, ids)
+
+    def delete(self, media_id):
+        pytest.fail('Binary "{}" deleted individually'.format(media_id))
+
+    monkeypatch.setattr(type(provider), 'delete_many', delete_many)
+    monkeypatch.setattr(type(provider), 'delete', delete)
+
+    asset_service.delete_action({'set_id': set_id})
+    assert len(delete_many_calls) == 1
+    assert sorted(delete_many_calls[0]) == sorted(media_ids)
+    assert not any(provider.exists(media_id) for media_id in media_ids)
+
+
+def test_download_redirect(init_app, app, client, monkeypatch):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+        original_bytes, _ = load_file('tests/fixtures/file_example-jpg.jpg')
+
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example',
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        }])[0]
+
+    # Binaries are streamed through SAMS by default
+    response = client.get('/consume/assets/binary/{}'.format(asset_id))
+    assert response.status_code == 200
+    assert response.get_data() == original_bytes
+
+    download_urls = []
+
+    def get_download_url(self, media_id, mimetype, content_disposition):
+        download_urls.append((media_id, mimetype, content_disposition))
+        return 'https://storage.example.com/{}?signature=abc'.format(media_id)
+
+    monkeypatch.setattr(type(provider), 'get_download_url', get_download_url)
+
+    response = client.get('/consume/assets/binary/{}?download=true'.format(asset_id))
+    asset = asset_service.get_by_id(asset_id)
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'https://storage.example.com/{}?signature=abc'.format(
+        asset['_media_id']
+    )
+    assert 'no-store' in response.headers['Cache-Control']
+    assert download_urls == [(asset['_media_id'], 'image/jpeg', 'Attachment; filename=file_example-jpg.jpg')]
+
+
+def test_download_not_modified(init_app, app, client):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+        original_bytes, _ = load_file('tests/fixtures/file_example-jpg.jpg')
+
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example',
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        }])[0]
+
+    etag = hashlib.sha1(original_bytes).hexdigest()
+    response = client.get('/consume/assets/binary/{}'.format(asset_id))
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"{}"'.format(etag)
+
+    # A matching ``If-None-Match`` responds without the binary
+    response = client.get('/consume/assets/binary/{}'.format(asset_id), headers={'If-None-Match': '"{}"'.format(etag)})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == '"{}"'.format(etag)
+    assert response.get_data() == b''
+
+    # Any other ETag responds with the binary
+    response = client.get('/consume/assets/binary/{}'.format(asset_id), headers={'If-None-Match': '"abc"'})
+    assert response.status_code == 200
+    assert response.get_data() == original_bytes
+
+    # As do renditions, using the hash of the rendition
+    response = client.get('/consume/assets/images/{}?width=100'.format(asset_id))
+    assert response.status_code == 200
+    rendition_etag = response.headers['ETag']
+    assert rendition_etag == '"{}"'.format(hashlib.sha1(response.get_data()).hexdigest())
+
+    response = client.get(
+        '/consume/assets/images/{}?width=100'.format(asset_id),
+        headers={'If-None-Match': rendition_etag}
+    )
+    assert response.status_code == 304
+
+
+def test_add_asset_hashes_command(init_app, app):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+        original_bytes, _ = load_file('tests/fixtures/file_example-jpg.jpg')
+
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example',
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        }])[0]
+        asset_service.download_rendition(asset_id, width=100)
+        asset = asset_service.get_by_id(asset_id)
+        hashes = [asset['hash']] + [rendition['hash'] for rendition in asset['renditions']]
+        assert len(asset['renditions']) == 2
+        assert all(hashes)
+
+        # Remove the hashes, as if the Asset was uploaded before hashes were stored
+        app.data.get_mongo_collection('assets').update_one(
+            {'_id': asset_id},
+            {'$unset': {'hash': 1, 'renditions.$[].hash': 1}}
+        )
+        asset = asset_service.get_by_id(asset_id)
+        assert not asset.get('hash')
+        assert not any(rendition.get('hash') for rendition in asset['renditions'])
+
+        AddAssetHashes.add_asset_hashes()
+
+        asset = asset_service.get_by_id(asset_id)
+        assert asset['hash'] == hashlib.sha1(original_bytes).hexdigest()
+        assert [asset['hash']] + [rendition['hash'] for rendition in asset['renditions']] == hashes
+
+
+def test_upload_rejected_before_binary_received(init_app, app, client, monkeypatch):
+    with app.test_request_context():
+        test_set = deepcopy(test_sets[0])
+        test_set.update({'state': 'usable', 'maximum_asset_size': 1024})
+        set_id, provider = add_set(test_set)
+
+    def put(*args, **kwargs):
+        raise AssertionError('Binary should not have been stored')
+
+    monkeypatch.setattr(type(provider), 'put', put)
+
+    response = client.post(
+        '/produce/assets?set_id={}'.format(set_id),
+        data={
+            'set_id': str(set_id),
+            'filename': 'large.bin',
+            'name': 'Large binary',
+            'binary': (BytesIO(b'0' * 2 * 1024 * 1024), 'large.bin'),
+        },
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert response.get_json()['error'] == '08004'
+
+    # The Set is not loaded for unauthorised requests
+    monkeypatch.setattr(app.auth, 'authorized', lambda *args, **kwargs: False)
+    monkeypatch.setattr(get_set_service(), 'get_by_id', put)
+    response = client.post(
+        '/produce/assets?set_id={}'.format(set_id),
+        data={'set_id': str(set_id), 'binary': (BytesIO(b'0'), 'small.bin')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 401
+
+
+def test_bulk_upload(init_app, app, client):
+    with app.test_request_context():
+        test_set = deepcopy(test_sets[0])
+        test_set['state'] = 'usable'
+        set_id, provider = add_set(test_set)
+
+    original_bytes, original_size = load_file('tests/fixtures/file_example-jpg.jpg')
+    items = [{
+        'set_id': str(set_id),
+        'filename': 'file_example-jpg.jpg',
+        'name': 'Jpeg Example',
+        'binary': 'image',
+    }, {
+        'set_id': str(set_id),
+        'filename': 'missing.txt',
+        'name': 'Missing binary',
+        'binary': 'missing',
+    }, {
+        'set_id': '5f16394239d0077e02b09d85',
+        'filename': 'text.txt',
+        'name': 'Unknown Set',
+        'binary': 'text',
+    }]
+
+    response = client.post(
+        '/produce/assets/bulk',
+        data={
+            'items': json.dumps(items),
+            'image': (BytesIO(original_bytes), 'file_example-jpg.jpg'),
+            'text': (BytesIO(b'text'), 'text.txt'),
+        },
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 207
+    results = response.get_json()['_items']
+    assert [result['_status'] for result in results] == ['OK', 'ERR', 'ERR']
+    assert results[1]['_error']['error'] == '08001'
+    assert results[2]['_error']['error'] == '07006'
+
+    asset = get_asset_service().get_by_id(results[0]['_id'])
+    assert asset['length'] == original_size
+    assert asset['hash'] == hashlib.sha1(original_bytes).hexdigest()
+    assert asset['renditions'][0]['name'] == 'original'
+    assert provider.get(asset['_media_id']).read() == original_bytes
+
+    # Items can also be sent as newline delimited JSON, with base64 encoded binaries
+    response = client.post(
+        '/produce/assets/bulk',
+        data='\n'.join(
+            json.dumps({
+                'set_id': str(set_id),
+                'filename': 'text-{}.txt'.format(index),
+                'name': 'Text {}'.format(index),
+                'binary': b64encode('text {}'.format(index).encode()).decode(),
+            })
+            for index in range(3)
+        ),
+        content_type='application/x-ndjson'
+    )
+    assert response.status_code == 201
+    results = response.get_json()['_items']
+    assert len(results) == 3
+
+    for index, result in enumerate(results):
+        asset = get_asset_service().get_by_id(result['_id'])
+        assert asset['name'] == 'Text {}'.format(index)
+        assert asset['mimetype'] == 'text/plain'
+        assert provider.get(asset['_media_id']).read() == 'text {}'.format(index).encode()
+
+    # Two items cannot use the same file field, as its stream can only be read once
+    response = client.post(
+        '/produce/assets/bulk',
+        data={
+            'items': json.dumps([items[0], dict(items[0], name='Jpeg Copy')]),
+            'image': (BytesIO(original_bytes), 'file_example-jpg.jpg'),
+        },
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert response.get_json()['error'] == '08016'
+
+    response = client.post(
+        '/produce/assets/bulk',
+        data={'items': json.dumps([dict(items[0], binary=['image'])])},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert response.get_json()['error'] == '08016'
+
+
+def test_bulk_update(init_app, app, client):
+    app.config['ASSETS_BULK_BATCH_SIZE'] = 2
+
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        usable_set = deepcopy(test_sets[0])
+        usable_set['state'] = 'usable'
+        set_id, provider = add_set(usable_set)
+        draft_set_id, draft_provider = add_set(deepcopy(test_sets[1]))
+
+        asset_ids = [
+            asset_service.post([{
+                'set_id': asset_set_id,
+                'filename': 'text.txt',
+                'name': 'Text {}'.format(index),
+                'binary': b'text',
+            }])[0]
+            for index, asset_set_id in enumerate([set_id, set_id, set_id, draft_set_id])
+        ]
+
+    response = client.patch(
+        '/produce/assets/bulk',
+        json={'ids': [str(asset_id) for asset_id in asset_ids], 'updates': {'state': 'public'}}
+    )
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['total'] == 4
+    assert result['updated'] == 3
+    assert result['_errors'] == [{
+        '_id': str(asset_ids[3]),
+        '_error': dict(SamsAssetErrors.AssetUploadToInactiveSet().to_dict(), code=400),
+    }]
+
+    assets = [asset_service.get_by_id(asset_id) for asset_id in asset_ids]
+    assert [asset['state'] for asset in assets] == ['public', 'public', 'public', 'draft']
+    assert len(set(asset['_etag'] for asset in assets)) == 4
+
+    # Assets can also be selected with a query, and the progress streamed after each batch
+    response = client.patch(
+        '/produce/assets/bulk',
+        json={'query': {'set_id': str(set_id), 'state': 'public'}, 'updates': {'description': 'Bulk'}},
+        headers={'Accept': 'application/x-ndjson'}
+    )
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line.get('processed') for line in lines] == [2, 3, None]
+    assert lines[-1]['updated'] == 3
+    assert all(asset_service.get_by_id(asset_id)['description'] == 'Bulk' for asset_id in asset_ids[:3])
+
+    # The binary cannot be changed with a bulk update
+    response = client.patch('/produce/assets/bulk', json={'ids': [str(asset_ids[0])], 'updates': {'hash': 'abc'}})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == '08017'
+
+
+def test_unlock_by_user_session(init_app, app, client):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+
+        asset_ids = asset_service.post([
+            {
+                'set_id': set_id,
+                'filename': 'text.txt',
+                'name': 'Text {}'.format(index),
+                'binary': b'text',
+                'lock_action': 'edit',
+                'lock_user': 'user1',
+                'lock_session': session,
+            }
+            for index, session in enumerate(['session1', 'session1', 'session2'])
+        ])
+
+    response = client.patch('/produce/assets/unlock_user_session?external_user_id=user1')
+    assert response.status_code == 400
+
+    response = client.patch(
+        '/produce/assets/unlock_user_session?external_user_id=user1&external_session_id=session1'
+    )
+    assert response.status_code == 200
+    assert response.get_json() == {'unlocked': 2}
+
+    assets = [asset_service.get_by_id(asset_id) for asset_id in asset_ids]
+    assert [asset['lock_session'] for asset in assets] == [None, None, 'session2']
+    assert assets[0]['version_creator'] == 'user1'
+
+    # Each unlocked Asset has its own etag
+    assert assets[0]['_etag'] != assets[1]['_etag']
+
+    # The unlocked Assets are re-indexed in Elasticsearch
+    req = ParsedRequest()
+    req.args = {'source': json.dumps({'query': {'term': {'lock_user': 'user1'}}})}
+    assert [asset['_id'] for asset in asset_service.get(req=req, lookup=None)] == [asset_ids[2]]
+
+
 def test_binary_undefined(init_app, app):
     with app.test_request_context():
         asset_service = get_asset_service()
@@ -165,6 +552,157 @@ def test_upload_using_stream(init_app, app):
             assert asset_binary.read() == original_bytes
 
 
+def test_rendition_generated_once(init_app, app):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+
+        original_bytes, original_size = load_file('tests/fixtures/file_example-jpg.jpg')
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example',
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        }])[0]
+
+    renditions = []
+
+    def download_rendition():
+        with app.test_request_context():
+            renditions.append(asset_service.download_rendition(asset_id, width=100)[1])
+
+    threads = [Thread(target=download_rendition) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # All requests share the one generated rendition
+    assert len(renditions) == 5
+    assert len({rendition['_media_id'] for rendition in renditions}) == 1
+
+    with app.test_request_context():
+        asset = asset_service.get_by_id(asset_id)
+        assert len(asset['renditions']) == 2
+        assert provider.exists(renditions[0]['_media_id'])
+
+        # Adding a matching rendition returns the existing one, and deletes the new binary
+        rendition = asset_service.add_rendition(asset, 100)
+        assert rendition['_media_id'] == renditions[0]['_media_id']
+        assert len(asset_service.get_by_id(asset_id)['renditions']) == 2
+
+
+def test_rendition_presets_generated_on_upload(init_app, app):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_item = deepcopy(test_sets[0])
+        set_item['rendition_presets'] = [
+            {'name': 'thumbnail', 'width': 220},
+            {'name': 'viewImage', 'width': 640},
+        ]
+        set_id, provider = add_set(set_item)
+
+        original_bytes, original_size = load_file('tests/fixtures/file_example-jpg.jpg')
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example',
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        }])[0]
+
+        asset = asset_service.get_by_id(asset_id)
+        assert [rendition['name'] for rendition in asset['renditions']] == ['original', 'viewImage', 'thumbnail']
+        assert asset['renditions'][1]['width'] == 640
+        assert asset['renditions'][2]['width'] == 220
+
+        for rendition in asset['renditions']:
+            assert provider.exists(rendition['_media_id'])
+
+
+def test_rendition_generated_from_nearest_larger_rendition(init_app, app, monkeypatch):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        set_item = deepcopy(test_sets[0])
+        set_item['rendition_presets'] = [{'name': 'viewImage', 'width': 640}]
+        set_id, provider = add_set(set_item)
+
+        original_bytes = BytesIO()
+        Image.new('RGB', (2000, 1000), (200, 100, 50)).save(original_bytes, 'JPEG')
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'large.jpg',
+            'name': 'Large Jpeg',
+            'description': 'Large Jpeg file asset',
+            'binary': original_bytes.getvalue(),
+        }])[0]
+        asset = asset_service.get_by_id(asset_id)
+        view_image = asset['renditions'][1]
+
+        downloaded = []
+        provider_get = type(provider).get
+
+        def get(self, media_id):
+            downloaded.append(str(media_id))
+            return provider_get(self, media_id)
+
+        monkeypatch.setattr(type(provider), 'get', get)
+
+        rendition = asset_service.download_rendition(asset_id, width=100)[1]
+        assert rendition['width'] == 100
+        assert downloaded[0] == str(view_image['_media_id'])
+
+        # The original is used if no rendition is large enough
+        downloaded.clear()
+        asset_service.download_rendition(asset_id, width=400)
+        assert downloaded[0] == str(asset['_media_id'])
+
+
+def test_download_metadata_cached(init_app, app):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        asset_service.download_cache = create_cache(app, 'test_asset_downloads', ttl=60, max_size=10, negative_ttl=60)
+        set_id, provider = add_set(deepcopy(test_sets[0]))
+
+        original_bytes, original_size = load_file('tests/fixtures/file_example-jpg.jpg')
+        asset_id = asset_service.post([{
+            'set_id': set_id,
+            'filename': 'file_example-jpg.jpg',
+            'name': 'Jpeg Example',
+            'description': 'Jpeg file asset example',
+            'binary': original_bytes,
+        }])[0]
+
+        metadata = asset_service.get_download_metadata(asset_id)
+        assert set(metadata.keys()) == {
+            '_id', 'set_id', 'state', '_media_id', 'mimetype', 'length', 'hash', '_updated', 'filename'
+        }
+        assert metadata['length'] == original_size
+        assert asset_service.get_download_metadata(asset_id) == metadata
+        assert asset_service.download_cache.get_stats()['hits'] == 1
+
+        binary = asset_service.download_binary(asset_id, metadata)
+        assert binary.read() == original_bytes
+
+        # Adding a rendition removes it from the cache
+        asset_service.get_or_create_rendition(asset_service.get_by_id(asset_id), width=100)
+        misses = asset_service.download_cache.misses
+        asset_service.get_download_metadata(asset_id)
+        assert asset_service.download_cache.misses == misses + 1
+
+        # Updating the Asset removes it from the cache
+        asset_service.patch(asset_id, {'filename': 'updated.jpg'})
+        assert asset_service.get_download_metadata(asset_id)['filename'] == 'updated.jpg'
+
+        # Missing Assets are cached too
+        asset_service.delete_action({'_id': asset_id})
+        assert asset_service.get_download_metadata(asset_id) is None
+        misses = asset_service.download_cache.misses
+        assert asset_service.get_download_metadata(asset_id) is None
+        assert asset_service.download_cache.misses == misses
+
+
 def test_search_elastic(init_app, app):
     with app.test_request_context():
         asset_service = get_asset_service()
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from sams.cache import LocalCache, ReadThroughCache, MISSING, create_cache
+
+
+def test_local_cache_lru():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    # ``b`` is the least recently used value
+    cache.set('c', 3)
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_local_cache_ttl():
+    cache = LocalCache(max_size=2, ttl=60)
+
+    with mock.patch('sams.cache.time.monotonic', return_value=1000):
+        cache.set('a', 1)
+
+    with mock.patch('sams.cache.time.monotonic', return_value=1059):
+        assert cache.get('a') == 1
+
+    with mock.patch('sams.cache.time.monotonic', return_value=1060):
+        assert cache.get('a') is MISSING
+        assert len(cache) == 0
+
+
+def test_read_through_cache():
+    cache = ReadThroughCache('test', LocalCache(max_size=10, ttl=60))
+    load = mock.Mock(return_value={'name': 'foo'})
+
+    value = cache.get('a', load)
+    assert value == {'name': 'foo'}
+    value['name'] = 'bar'
+
+    # Returns a copy of the cached value
+    assert cache.get('a', load) == {'name': 'foo'}
+    assert load.call_count == 1
+    assert cache.get_stats() == {'name': 'test', 'hits': 1, 'misses': 1, 'size': 1}
+
+    cache.invalidate('a')
+    assert cache.get('a', load) == {'name': 'foo'}
+    assert load.call_count == 2
+
+    # ``None`` is never cached
+    assert cache.get('b', lambda: None) is None
+    assert cache.local.get('b') is MISSING
+
+
+def test_create_cache_limits_local_ttl():
+    app = mock.Mock(config={'CACHE_LOCAL_MAX_TTL': 5})
+
+    cache = create_cache(app, 'test_local_ttl', ttl=60, max_size=10, negative_ttl=30)
+    assert cache.local.ttl == 5
+    assert cache.negative_ttl == 5
+
+    app.config['CACHE_LOCAL_MAX_TTL'] = 0
+    cache = create_cache(app, 'test_local_ttl', ttl=60, max_size=10, negative_ttl=30)
+    assert cache.local.ttl == 60
+    assert cache.negative_ttl == 30
@@ -0,0 +1,101 @@
+from io import BytesIO
+
+from PIL import Image
+
+from sams.assets.images import (
+    RenditionSource,
+    get_rendition_size,
+    get_encoder_settings,
+    get_nearest_larger_rendition,
+)
+
+
+def get_jpeg(width, height):
+    content = BytesIO()
+    Image.new('RGB', (width, height), (200, 100, 50)).save(content, 'JPEG')
+    content.seek(0)
+    return content
+
+
+def test_get_rendition_size():
+    assert get_rendition_size((1000, 500), 200) == (200, 100)
+    assert get_rendition_size((1000, 500), None, 100) == (200, 100)
+    assert get_rendition_size((1000, 500), 200, 200) == (200, 100)
+    assert get_rendition_size((1000, 500), 200, 200, False) == (200, 200)
+    assert get_rendition_size((1000, 500), 200, None, False) == (200, 500)
+
+
+def test_get_encoder_settings():
+    assert get_encoder_settings('jpeg')['quality'] == 85
+    assert get_encoder_settings('JPEG', {'JPEG': {'quality': 70}}) == {
+        'quality': 70,
+        'optimize': True,
+        'progressive': True
+    }
+    assert get_encoder_settings('BMP') == {}
+
+
+def test_rendition_source_decodes_once_and_cascades():
+    source = RenditionSource.open(
+        get_jpeg(4000, 2000),
+        renditions=[(800, None, True), (200, None, True), (300, 300, False)]
+    )
+
+    # JPEG is decoded at a reduced scale, still large enough for the largest rendition
+    assert source.original_size == (4000, 2000)
+    assert 1600 <= source._images[0].width < 4000
+
+    content, width, height = source.resize(800)
+    assert (width, height) == (800, 400)
+    assert Image.open(content).size == (800, 400)
+
+    # The smaller rendition is generated from the previous one
+    assert source.get_source_image((200, 100)).size == (800, 400)
+    content, width, height = source.resize(200)
+    assert Image.open(content).size == (200, 100)
+
+    content, width, height = source.resize(300, 300, False)
+    assert Image.open(content).size == (300, 300)
+    assert [image.size for image in source._images[1:]] == [(800, 400), (200, 100)]
+
+
+def test_rendition_source_min_scale():
+    renditions = [(800, None, True), (200, None, True)]
+
+    # JPEG is decoded at a reduced scale that is at least ``min_scale`` times the largest rendition
+    source = RenditionSource.open(get_jpeg(4000, 2000), renditions=renditions, min_scale=1)
+    assert source.min_scale == 1
+    assert 800 <= source._images[0].width < 1600
+
+    source = RenditionSource.open(get_jpeg(4000, 2000), renditions=renditions, min_scale=4)
+    assert source._images[0].width >= 3200
+
+    # Without a scale, the full image is decoded, and renditions are always generated from it
+    source = RenditionSource.open(get_jpeg(4000, 2000), renditions=renditions, min_scale=0)
+    assert source._images[0].size == (4000, 2000)
+    source.resize(800)
+    assert source.get_source_image((200, 100)).size == (4000, 2000)
+    content, width, height = source.resize(200)
+    assert Image.open(content).size == (200, 100)
+
+
+def test_rendition_source_from_existing_rendition():
+    source = RenditionSource.open(get_jpeg(1000, 500), original_size=(4000, 2000), renditions=[(200, None, True)])
+
+    content, width, height = source.resize(200)
+    assert (width, height) == (200, 100)
+    assert Image.open(content).size == (200, 100)
+
+
+def test_get_nearest_larger_rendition():
+    renditions = [
+        {'name': 'original', '_media_id': 'original', 'width': 4000, 'height': 2000},
+        {'name': 'viewImage', '_media_id': 'view', 'width': 640, 'height': 320, 'params': {'keep_proportions': True}},
+        {'name': 'square', '_media_id': 'square', 'width': 600, 'height': 600, 'params': {'keep_proportions': False}},
+        {'name': 'thumbnail', '_media_id': 'thumb', 'width': 220, 'height': 110},
+    ]
+
+    assert get_nearest_larger_rendition(renditions, (300, 150))['_media_id'] == 'view'
+    assert get_nearest_larger_rendition(renditions, (100, 50))['_media_id'] == 'thumb'
+    assert get_nearest_larger_rendition(renditions, (1000, 500))['_media_id'] == 'original'
+    assert get_nearest_larger_rendition(renditions, (3000, 1500)) is None
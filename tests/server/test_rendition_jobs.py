@@ -0,0 +1,110 @@
+from copy import deepcopy
+from datetime import timedelta
+
+from superdesk.utc import utcnow
+
+from sams.assets import get_service as get_asset_service
+from sams.sets import get_service as get_set_service
+from sams.rendition_jobs import get_service as get_rendition_jobs_service
+from sams.commands.rendition_worker import process_rendition_jobs
+from sams_client.schemas import RENDITION_JOB_STATES
+
+from tests.fixtures import test_sets
+from tests.server.utils import load_file
+
+
+def add_image_asset():
+    set_id = get_set_service().post([deepcopy(test_sets[0])])[0]
+    original_bytes, original_size = load_file('tests/fixtures/file_example-jpg.jpg')
+
+    return get_asset_service().post([{
+        'set_id': set_id,
+        'filename': 'file_example-jpg.jpg',
+        'name': 'Jpeg Example',
+        'description': 'Jpeg file asset example',
+        'binary': original_bytes,
+    }])[0]
+
+
+def test_rendition_job_queue(init_app, app):
+    with app.test_request_context():
+        asset_service = get_asset_service()
+        jobs_service = get_rendition_jobs_service()
+
+        asset_id = add_image_asset()
+        asset = asset_service.get_by_id(asset_id)
+
+        job = jobs_service.queue_job(asset, width=100, name='thumbnail')
+        assert job['state'] == RENDITION_JOB_STATES.QUEUED
+
+        # Queueing the same rendition again returns the existing job
+        assert jobs_service.queue_job(asset, width=100)['_id'] == job['_id']
+
+        process_rendition_jobs(poll_interval=0, once=True)
+
+        job = jobs_service.get_by_id(job['_id'])
+        assert job['state'] == RENDITION_JOB_STATES.COMPLETED
+        assert job['attempts'] == 1
+        assert job['worker'] is None
+        assert job['rendition']['name'] == 'thumbnail'
+
+        asset = asset_service.get_by_id(asset_id)
+        assert len(asset['renditions']) == 2
+        assert asset['renditions'][1]['_media_id'] == job['rendition']['_media_id']
+
+        # Once the job is completed, a new job is queued
+        assert jobs_service.queue_job(asset, width=100)['_id'] != job['_id']
+
+
+def test_rendition_job_expired_lease(init_app, app):
+    with app.test_request_context():
+        jobs_service = get_rendition_jobs_service()
+        asset = get_asset_service().get_by_id(add_image_asset())
+        collection = app.data.get_mongo_collection('rendition_jobs')
+        expired = utcnow() - timedelta(seconds=1)
+
+        # A job whose worker died is claimed by another worker
+        job = jobs_service.queue_job(asset, width=100)
+        collection.update_one(
+            {'_id': job['_id']},
+            {'$set': {'state': RENDITION_JOB_STATES.RUNNING, 'lease_expire': expired, 'attempts': 1}}
+        )
+        claimed = jobs_service.claim_next_job('worker-2')
+        assert claimed['_id'] == job['_id']
+        assert claimed['worker'] == 'worker-2'
+        assert claimed['attempts'] == 2
+
+        # Once all attempts are used, the job fails instead of being claimed again
+        collection.update_one(
+            {'_id': job['_id']},
+            {'$set': {'lease_expire': expired, 'attempts': app.config['RENDITION_JOB_MAX_ATTEMPTS']}}
+        )
+        assert jobs_service.claim_next_job('worker-3') is None
+
+        job = jobs_service.get_by_id(job['_id'])
+        assert job['state'] == RENDITION_JOB_STATES.FAILED
+        assert job['active_key'] is None
+        assert jobs_service.queue_job(asset, width=100)['_id'] != job['_id']
+
+
+def test_generate_rendition_async(init_app, app, client):
+    with app.test_request_context():
+        asset_id = add_image_asset()
+
+    response = client.post('/produce/assets/images/{}?width=100&async=true'.format(asset_id))
+    assert response.status_code == 202
+    job_id = response.get_json()['_id']
+    assert response.headers['Location'].endswith('/produce/assets/images/jobs/{}'.format(job_id))
+
+    response = client.get('/produce/assets/images/jobs/{}'.format(job_id))
+    assert response.status_code == 200
+    assert response.get_json()['state'] == RENDITION_JOB_STATES.QUEUED
+
+    with app.test_request_context():
+        process_rendition_jobs(poll_interval=0, once=True)
+
+    response = client.get('/produce/assets/images/jobs/{}'.format(job_id))
+    assert response.get_json()['state'] == RENDITION_JOB_STATES.COMPLETED
+
+    response = client.get('/produce/assets/images/jobs/5f16394239d0077e02b09d85')
+    assert response.status_code == 404
@@ -117,6 +117,28 @@ def test_validate_destination_name(init_app, app):
         _test_patch()
 
 
+def test_validate_rendition_presets(init_app, app):
+    sets_service = get_service()
+
+    with app.test_request_context():
+        item = deepcopy(test_sets[0])
+        item['rendition_presets'] = [{'name': 'thumbnail'}]
+
+        with pytest.raises(SamsSetErrors.RenditionPresetDimensionsNotProvided) as error:
+            sets_service.post([item])
+        assert error.value.description == 'Rendition preset "thumbnail" requires a width and/or height'
+
+        item['rendition_presets'] = [{'name': 'thumbnail', 'width': 220}]
+        item_id = sets_service.post([item])[0]
+        presets = sets_service.get_rendition_presets(item_id)
+        assert len(presets) == 1
+        assert presets[0]['name'] == 'thumbnail'
+        assert presets[0]['width'] == 220
+
+        with pytest.raises(SamsSetErrors.RenditionPresetDimensionsNotProvided):
+            sets_service.patch(item_id, {'rendition_presets': [{'name': 'viewImage', 'height': None}]})
+
+
 def test_update_destination_config(init_app, app):
     with app.test_request_context():
         sets_service = get_service()
@@ -175,3 +197,35 @@ def test_get_provider_instance(init_app, app):
         provider = sets_service.get_provider_instance(item_id)
 
     assert isinstance(provider, MongoGridFSProvider)
+
+
+def test_app_boots_with_sets_cache(app):
+    # The Sets cache is enabled by default
+    assert app.config['SETS_CACHE_ENABLED']
+
+    cache = get_service().cache
+    assert cache is not None
+    assert cache.name == 'sets'
+    assert cache.local.max_size == app.config['SETS_CACHE_MAX_SIZE']
+
+
+def test_get_by_id_cached(init_app, app):
+    sets_service = get_service()
+    assert sets_service.cache is not None
+
+    with app.test_request_context():
+        item_id = sets_service.post(deepcopy(test_sets))[0]
+
+        assert sets_service.get_by_id(item_id)['state'] == SET_STATES.DRAFT
+        misses = sets_service.cache.misses
+        assert sets_service.get_by_id(item_id)['state'] == SET_STATES.DRAFT
+        assert sets_service.cache.misses == misses
+
+        # Updating the Set removes it from the cache
+        sets_service.patch(item_id, {'state': SET_STATES.USABLE})
+        assert sets_service.get_by_id(item_id)['state'] == SET_STATES.USABLE
+        assert sets_service.cache.misses == misses + 1
+
+        sets_service.patch(item_id, {'state': SET_STATES.DISABLED})
+        sets_service.delete_action({'_id': item_id})
+        assert sets_service.get_by_id(item_id) is None
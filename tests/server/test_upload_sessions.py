@@ -0,0 +1,120 @@
+from copy import deepcopy
+import hashlib
+
+from sams.assets import get_service as get_asset_service
+from sams.sets import get_service as get_set_service
+from sams.commands.rendition_worker import process_rendition_jobs
+from sams.storage.providers import mongo
+from sams_client.schemas import UPLOAD_SESSION_STATES
+
+from tests.fixtures import test_sets
+from tests.server.utils import load_file
+
+
+def add_usable_set(app):
+    with app.test_request_context():
+        test_set = deepcopy(test_sets[0])
+        test_set['state'] = 'usable'
+        return get_set_service().post([test_set])[0]
+
+
+def create_session(client, set_id, length, **kwargs):
+    doc = {
+        'set_id': str(set_id),
+        'filename': 'file_example-jpg.jpg',
+        'length': length,
+        'metadata': {'name': 'Jpeg Example'},
+    }
+    doc.update(kwargs)
+
+    return client.post('/produce/assets/upload_sessions', json=doc)
+
+
+def test_upload_session_chunks(init_app, app, client, monkeypatch):
+    monkeypatch.setattr(mongo, 'UPLOAD_CHUNK_SIZE', 1024 * 10)
+    set_id = add_usable_set(app)
+    content, size = load_file('tests/fixtures/file_example-jpg.jpg')
+
+    response = create_session(client, set_id, size, mimetype='image/jpeg')
+    assert response.status_code == 201
+    session = response.get_json()
+    assert session['state'] == UPLOAD_SESSION_STATES.PENDING
+    assert session['upload']['method'] == 'PUT'
+    assert session['upload']['chunk_size'] == 1024 * 10
+
+    chunk_size = session['upload']['chunk_size']
+    chunk_url = session['upload']['url']
+    assert chunk_url == '/produce/assets/upload_sessions/{}/chunks/{{index}}'.format(session['_id'])
+
+    # Finalizing before all chunks are uploaded keeps the session pending
+    response = client.put(chunk_url.format(index=0), data=content[:chunk_size])
+    assert response.status_code == 204
+    response = client.post('/produce/assets/upload_sessions/{}/finalize'.format(session['_id']))
+    assert response.status_code == 400
+    assert client.get('/produce/assets/upload_sessions/{}'.format(session['_id'])).get_json()['state'] == \
+        UPLOAD_SESSION_STATES.PENDING
+
+    # Chunks must be the expected size
+    response = client.put(chunk_url.format(index=1), data=content[:chunk_size - 1])
+    assert response.status_code == 400
+
+    for index in range(1, (size + chunk_size - 1) // chunk_size):
+        response = client.put(
+            chunk_url.format(index=index),
+            data=content[index * chunk_size:(index + 1) * chunk_size]
+        )
+        assert response.status_code == 204
+
+    response = client.post('/produce/assets/upload_sessions/{}/finalize'.format(session['_id']))
+    assert response.status_code == 201
+    asset = response.get_json()
+    assert asset['name'] == 'Jpeg Example'
+    assert asset['length'] == size
+    assert asset['mimetype'] == 'image/jpeg'
+    assert asset['renditions'][0]['name'] == 'original'
+
+    response = client.get('/consume/assets/binary/{}'.format(asset['_id']))
+    assert response.status_code == 200
+    assert response.get_data() == content
+
+    # The hash is calculated in the background, instead of downloading the binary when finalizing
+    assert not asset.get('hash')
+    with app.test_request_context():
+        process_rendition_jobs(poll_interval=0, once=True)
+        stored = get_asset_service().get_by_id(asset['_id'])
+
+    assert stored['hash'] == hashlib.sha1(content).hexdigest()
+    assert stored['renditions'][0]['hash'] == stored['hash']
+
+    session = client.get('/produce/assets/upload_sessions/{}'.format(session['_id'])).get_json()
+    assert session['state'] == UPLOAD_SESSION_STATES.COMPLETED
+    assert session['asset_id'] == asset['_id']
+
+    # A session can only be finalized once
+    response = client.post('/produce/assets/upload_sessions/{}/finalize'.format(session['_id']))
+    assert response.status_code == 409
+
+
+def test_upload_session_validation(init_app, app, client):
+    set_id = add_usable_set(app)
+    content, size = load_file('tests/fixtures/file_example-jpg.jpg')
+
+    app.config['MAX_ASSET_SIZE'] = size - 1
+    response = create_session(client, set_id, size)
+    assert response.status_code == 400
+    app.config['MAX_ASSET_SIZE'] = 0
+
+    response = client.get('/produce/assets/upload_sessions/5f16394239d0077e02b09d85')
+    assert response.status_code == 404
+
+    # The uploaded binary does not match the declared mimetype
+    session = create_session(client, set_id, size, mimetype='application/pdf').get_json()
+    response = client.put(session['upload']['url'].format(index=0), data=content)
+    assert response.status_code == 204
+
+    response = client.post('/produce/assets/upload_sessions/{}/finalize'.format(session['_id']))
+    assert response.status_code == 400
+
+    session = client.get('/produce/assets/upload_sessions/{}'.format(session['_id'])).get_json()
+    assert session['state'] == UPLOAD_SESSION_STATES.FAILED
+    assert session['error']
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from hashlib import sha1
+from io import BytesIO
+import zipfile
+
+from superdesk.storage.superdesk_file import SuperdeskFile
+
+from sams.utils import construct_asset_download_response, iter_zip_stream, is_compressed_mimetype, ZipStreamEntry
+
+CONTENT = b'0123456789abcdefghij'
+UPDATED = datetime(2020, 6, 1, 12, 0, 0)
+
+
+def get_asset():
+    return {
+        'mimetype': 'text/plain',
+        'length': len(CONTENT),
+        '_updated': UPDATED,
+        'filename': 'file.txt',
+        'hash': sha1(CONTENT).hexdigest()
+    }
+
+
+def get_response(app, headers=None):
+    with app.test_request_context(headers=headers or {}):
+        response = construct_asset_download_response(get_asset(), SuperdeskFile(CONTENT))
+        return response, b''.join(response.response)
+
+
+def test_download_full_binary(app):
+    response, data = get_response(app)
+    assert response.status_code == 200
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert data == CONTENT
+
+
+def test_download_single_byte_range(app):
+    response, data = get_response(app, {'Range': 'bytes=5-9'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == 'bytes 5-9/20'
+    assert response.content_length == 5
+    assert data == b'56789'
+
+    response, data = get_response(app, {'Range': 'bytes=-4'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == 'bytes 16-19/20'
+    assert data == b'ghij'
+
+    response, data = get_response(app, {'Range': 'bytes=15-'})
+    assert response.status_code == 206
+    assert data == b'fghij'
+
+
+def test_download_multiple_byte_ranges(app):
+    response, data = get_response(app, {'Range': 'bytes=0-1,10-11'})
+    assert response.status_code == 206
+    assert response.mimetype == 'multipart/byteranges'
+    assert response.content_length == len(data)
+
+    boundary = response.mimetype_params['boundary']
+    parts = data.split('--{}'.format(boundary).encode())
+    assert parts[0] == b''
+    assert parts[-1] == b'--\r\n'
+    assert parts[1].endswith(b'Content-Range: bytes 0-1/20\r\n\r\n01\r\n')
+    assert parts[2].endswith(b'Content-Range: bytes 10-11/20\r\n\r\nab\r\n')
+
+
+def test_download_unsatisfiable_byte_range(app):
+    response, data = get_response(app, {'Range': 'bytes=50-60'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == 'bytes */20'
+    assert data == b''
+
+
+def test_download_byte_range_with_if_range(app):
+    asset = get_asset()
+
+    response, data = get_response(app, {'Range': 'bytes=0-1', 'If-Range': '"{}"'.format(asset['hash'])})
+    assert response.status_code == 206
+    assert data == b'01'
+
+    # If the binary has changed, the entire binary is sent
+    response, data = get_response(app, {'Range': 'bytes=0-1', 'If-Range': '"outdated"'})
+    assert response.status_code == 200
+    assert data == CONTENT
+
+    modified_since = (UPDATED - timedelta(days=1)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+    response, data = get_response(app, {'Range': 'bytes=0-1', 'If-Range': modified_since})
+    assert response.status_code == 200
+    assert data == CONTENT
+
+
+def test_iter_zip_stream():
+    large = bytes(range(256)) * 4096
+    files = [BytesIO(CONTENT), BytesIO(large)]
+    entries = [
+        ZipStreamEntry('file.txt', files[0], UPDATED, compress=True),
+        ZipStreamEntry('image.jpg', files[1], datetime(1970, 1, 1), compress=False),
+    ]
+
+    chunks = list(iter_zip_stream(entries, buffer_size=1024 * 64))
+    assert len(chunks) > 2
+    assert all(file.closed for file in files)
+
+    archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+    assert archive.testzip() is None
+    assert archive.getinfo('file.txt').compress_type == zipfile.ZIP_DEFLATED
+    assert archive.getinfo('image.jpg').compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo('image.jpg').date_time == (1980, 1, 1, 0, 0, 0)
+    assert archive.read('file.txt') == CONTENT
+    assert archive.read('image.jpg') == large
+
+
+def test_is_compressed_mimetype():
+    assert is_compressed_mimetype('image/jpeg')
+    assert is_compressed_mimetype('video/mp4')
+    assert not is_compressed_mimetype('text/plain')
+    assert not is_compressed_mimetype('image/bmp')
+    assert not is_compressed_mimetype(None)